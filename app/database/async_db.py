@@ -0,0 +1,217 @@
+"""
+Async database access layer (psycopg 3)
+Route handlers use this pool so queries no longer block the event loop
+"""
+
+import asyncio
+from decouple import config
+from fastapi import HTTPException
+from psycopg import AsyncConnection, OperationalError
+from psycopg.pq import TransactionStatus
+from psycopg_pool import AsyncConnectionPool, PoolTimeout
+from typing import Any, Dict, Optional
+from app.database.db_config import (
+    DB_CONFIG,
+    DB_POOL_MIN_SIZE,
+    DB_POOL_MAX_SIZE,
+    DB_POOL_CHECKOUT_TIMEOUT,
+)
+
+ASYNC_DB_POOL_MIN_SIZE = config("ASYNC_DB_POOL_MIN_SIZE", default=DB_POOL_MIN_SIZE, cast=int)
+ASYNC_DB_POOL_MAX_SIZE = config("ASYNC_DB_POOL_MAX_SIZE", default=DB_POOL_MAX_SIZE, cast=int)
+
+
+class AsyncDatabase:
+    """
+    Lazily opened psycopg AsyncConnectionPool
+    The pool is bound to the event loop that opened it, so a new pool is created
+    if the running loop changes (e.g. separate TestClient instances)
+    """
+
+    def __init__(self, min_size: int = ASYNC_DB_POOL_MIN_SIZE, max_size: int = ASYNC_DB_POOL_MAX_SIZE,
+                 timeout: float = DB_POOL_CHECKOUT_TIMEOUT):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self._pool: Optional[AsyncConnectionPool] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def get_pool(self) -> AsyncConnectionPool:
+        loop = asyncio.get_running_loop()
+        if self._pool is None or self._loop is not loop:
+            self._pool = AsyncConnectionPool(
+                kwargs=DB_CONFIG,
+                min_size=self.min_size,
+                max_size=self.max_size,
+                timeout=self.timeout,
+                # Cheap round trip on checkout; a connection the server closed is replaced, not handed out
+                check=AsyncConnectionPool.check_connection,
+                name="cbc-async-pool",
+                open=False,
+            )
+            self._loop = loop
+        pool = self._pool
+        if pool.closed:
+            await pool.open()  # Safe to call concurrently, opening is idempotent
+        return pool
+
+    async def close(self):
+        if self._pool is not None and self._loop is asyncio.get_running_loop():
+            await self._pool.close()
+        self._pool = None
+        self._loop = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Connections in use, requests waiting and mean checkout latency (empty until the pool is opened)"""
+        if self._pool is None:
+            return {}
+        # psycopg_pool leaves counters out of get_stats() until they are non-zero
+        raw = self._pool.get_stats()
+        checkouts = raw.get("requests_num", 0)
+        return {
+            "pool_size": raw.get("pool_size", 0),
+            "max_size": raw.get("pool_max", self.max_size),
+            "in_use": raw.get("pool_size", 0) - raw.get("pool_available", 0),
+            "available": raw.get("pool_available", 0),
+            "waiting": raw.get("requests_waiting", 0),
+            "checkouts": checkouts,
+            "avg_checkout_ms": raw.get("requests_wait_ms", 0) / checkouts if checkouts else 0.0,
+            "checkout_timeouts": raw.get("requests_errors", 0),
+            "connections_lost": raw.get("connections_lost", 0),  # includes connections failing the checkout check
+        }
+
+
+# Global async database instance
+async_db = AsyncDatabase()
+
+
+async def get_async_db():
+    """FastAPI dependency yielding a pooled async connection"""
+    try:
+        pool = await async_db.get_pool()
+        conn = await pool.getconn()
+    except PoolTimeout as e:
+        raise HTTPException(status_code=503, detail=f"Database busy: {str(e)}")
+    except OperationalError as e:
+        raise HTTPException(status_code=500, detail=f"Database connection failed: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+
+    try:
+        yield conn
+    finally:
+        # Don't hand a connection with an open read-only transaction back to the pool
+        if not conn.closed and conn.info.transaction_status != TransactionStatus.IDLE:
+            try:
+                await conn.rollback()
+            except Exception:
+                pass
+        await pool.putconn(conn)
+
+
+async def create_user(db: AsyncConnection, email: str, password_hash: str, first_name: str, last_name: str,
+                      privacy_accepted: bool = True, auth_method: str = 'email', theme: str = 'dark'):
+    """Create a new user with email/password authentication"""
+    try:
+        cursor = db.cursor()
+
+        # Set privacy_accepted_at only if privacy is accepted
+        if privacy_accepted:
+            await cursor.execute("""
+                INSERT INTO users (email, password_hash, first_name, last_name, privacy_accepted,
+                                 privacy_accepted_at, auth_method, theme)
+                VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP, %s, %s) RETURNING id
+            """, (email, password_hash, first_name, last_name, privacy_accepted, auth_method, theme))
+        else:
+            await cursor.execute("""
+                INSERT INTO users (email, password_hash, first_name, last_name, privacy_accepted,
+                                 auth_method, theme)
+                VALUES (%s, %s, %s, %s, %s, %s, %s) RETURNING id
+            """, (email, password_hash, first_name, last_name, privacy_accepted, auth_method, theme))
+
+        user_id = (await cursor.fetchone())[0]
+        await db.commit()
+        await cursor.close()
+        return user_id
+    except OperationalError as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Database error during user creation: {str(e)}")
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Unexpected error during user creation: {str(e)}")
+
+
+async def create_google_user(db: AsyncConnection, email: str, google_id: str, first_name: str, last_name: str,
+                             profile_picture: str = None, privacy_accepted: bool = False):
+    """Create a new user from Google OAuth (without privacy acceptance initially)"""
+    try:
+        cursor = db.cursor()
+        if privacy_accepted:
+            await cursor.execute("""
+                INSERT INTO users (email, google_id, first_name, last_name, auth_method, profile_picture, privacy_accepted, privacy_accepted_at)
+                VALUES (%s, %s, %s, %s, 'google', %s, TRUE, CURRENT_TIMESTAMP) RETURNING id
+            """, (email, google_id, first_name, last_name, profile_picture))
+        else:
+            await cursor.execute("""
+                INSERT INTO users (email, google_id, first_name, last_name, auth_method, profile_picture, privacy_accepted)
+                VALUES (%s, %s, %s, %s, 'google', %s, FALSE) RETURNING id
+            """, (email, google_id, first_name, last_name, profile_picture))
+        user_id = (await cursor.fetchone())[0]
+        await db.commit()
+        await cursor.close()
+        return user_id
+    except OperationalError as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Database error during Google user creation: {str(e)}")
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Unexpected error during Google user creation: {str(e)}")
+
+
+async def get_user_by_google_id(db: AsyncConnection, google_id: str):
+    """Get user by their Google ID"""
+    try:
+        cursor = db.cursor()
+        await cursor.execute("SELECT * FROM users WHERE google_id = %s", (google_id,))
+        user = await cursor.fetchone()
+        await cursor.close()
+        return user
+    except OperationalError as e:
+        raise HTTPException(status_code=500, detail=f"Database error when fetching user by Google ID: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Unexpected error when fetching user by Google ID: {str(e)}")
+
+
+async def get_user_by_email(db: AsyncConnection, email: str):
+    try:
+        cursor = db.cursor()
+        await cursor.execute("""
+            SELECT id, password_hash, first_name, last_name, theme, auth_method, google_id, profile_picture, privacy_accepted
+            FROM users WHERE email = %s
+        """, (email,))
+        user = await cursor.fetchone()
+        await cursor.close()
+        return user
+    except OperationalError as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve user: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Unexpected error during user retrieval: {str(e)}")
+
+
+async def accept_privacy_terms(db: AsyncConnection, user_id: int):
+    """Accept privacy terms for a user"""
+    try:
+        cursor = db.cursor()
+        await cursor.execute("""
+            UPDATE users
+            SET privacy_accepted = TRUE, privacy_accepted_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+        """, (user_id,))
+        await db.commit()
+        await cursor.close()
+    except OperationalError as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Database error during privacy acceptance: {str(e)}")
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Unexpected error during privacy acceptance: {str(e)}")
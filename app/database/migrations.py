@@ -0,0 +1,289 @@
+"""
+Versioned schema migrations
+Each migration runs once, in version order, in its own transaction; applied versions
+are recorded in schema_migrations so start-up only does work for new migrations.
+An advisory lock keeps several workers starting at once from applying the same migration
+Usage: python -m app.database.migrations [--status]
+"""
+
+import argparse
+import sys
+import psycopg2
+from psycopg2.errors import UndefinedTable
+from psycopg2.extensions import connection as Connection
+from typing import List, NamedTuple, Sequence, Set
+from app.database.db_config import DB_CONFIG
+
+# Arbitrary application-wide key for pg_advisory_xact_lock
+MIGRATION_LOCK_ID = 72_410_001
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    statements: Sequence[str]
+
+
+MIGRATIONS: List[Migration] = [
+    # The tables the application used to create with CREATE TABLE IF NOT EXISTS at start-up;
+    # IF NOT EXISTS stays so databases created before migrations just get version 1 recorded
+    Migration(1, "baseline schema", [
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id SERIAL PRIMARY KEY,
+            email VARCHAR(255) UNIQUE NOT NULL,
+            password_hash VARCHAR(255),
+            first_name VARCHAR(100) NOT NULL,
+            last_name VARCHAR(100) NOT NULL,
+            theme VARCHAR(10) DEFAULT 'dark',
+            auth_method VARCHAR(20) DEFAULT 'email',
+            google_id VARCHAR(255) UNIQUE,
+            profile_picture VARCHAR(500),
+            privacy_accepted BOOLEAN DEFAULT FALSE,
+            privacy_accepted_at TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_login TIMESTAMP,
+            reset_token VARCHAR(255),
+            reset_token_expires TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS documents (
+            id SERIAL PRIMARY KEY,
+            user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+            title VARCHAR(255) NOT NULL,
+            content TEXT NOT NULL,
+            created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+            last_updated TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS training_data (
+            id SERIAL PRIMARY KEY,
+            original_text TEXT NOT NULL,
+            teacher_correction TEXT NOT NULL,
+            cbc_feedback TEXT NOT NULL,
+            submitted_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS correction_cache (
+            cache_key CHAR(64) PRIMARY KEY,
+            correction TEXT NOT NULL,
+            feedback TEXT NOT NULL,
+            created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS translation_memory (
+            id SERIAL PRIMARY KEY,
+            src_lang VARCHAR(16) NOT NULL,
+            tgt_lang VARCHAR(16) NOT NULL,
+            source_hash CHAR(64) NOT NULL,
+            source_text TEXT NOT NULL,
+            translation TEXT NOT NULL,
+            created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_translation_memory_lookup
+        ON translation_memory (src_lang, tgt_lang, source_hash)
+        """,
+    ]),
+    Migration(2, "document lookup and reset token indexes", [
+        # Titles duplicated by the old check-then-insert race: the oldest copy keeps its name,
+        # later ones get the first free copy number the way uploads pick one (copy_title):
+        # "essay.TXT" -> "essay (2).TXT", with the stem shortened to fit VARCHAR(255)
+        """
+        DO $$
+        DECLARE
+            duplicate RECORD;
+            stem TEXT;
+            extension TEXT;
+            suffix TEXT;
+            copy_number INTEGER;
+            new_title TEXT;
+        BEGIN
+            FOR duplicate IN
+                SELECT id, user_id, title FROM (
+                    SELECT id, user_id, title,
+                           ROW_NUMBER() OVER (PARTITION BY user_id, title ORDER BY id) AS copy_rank
+                    FROM documents
+                ) numbered
+                WHERE copy_rank > 1
+                ORDER BY id
+            LOOP
+                extension := COALESCE(substring(duplicate.title FROM '\\.[tT][xX][tT]$'), '');
+                stem := regexp_replace(duplicate.title, '( \\([0-9]+\\))?\\.txt$', '', 'i');
+                copy_number := 2;
+                LOOP
+                    suffix := ' (' || copy_number || ')' || extension;
+                    new_title := left(stem, 255 - length(suffix)) || suffix;
+                    EXIT WHEN NOT EXISTS (
+                        SELECT 1 FROM documents
+                        WHERE user_id IS NOT DISTINCT FROM duplicate.user_id AND title = new_title
+                    );
+                    copy_number := copy_number + 1;
+                END LOOP;
+                UPDATE documents SET title = new_title WHERE id = duplicate.id;
+            END LOOP;
+        END
+        $$
+        """,
+        # Serves filename checks, upload / rename conflicts and (as a prefix) every user_id filter
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_documents_user_title
+        ON documents (user_id, title)
+        """,
+        # /documents/list: a user's documents, newest first
+        """
+        CREATE INDEX IF NOT EXISTS idx_documents_user_created
+        ON documents (user_id, created_at DESC, id DESC)
+        """,
+        # Password reset looks users up by token; only the few rows with a pending reset are indexed
+        """
+        CREATE INDEX IF NOT EXISTS idx_users_reset_token
+        ON users (reset_token) WHERE reset_token IS NOT NULL
+        """,
+    ]),
+    # Byte size kept by the database, so listings don't have to fetch the content to report it
+    Migration(3, "document content size column", [
+        """
+        ALTER TABLE documents
+        ADD COLUMN IF NOT EXISTS content_size INTEGER GENERATED ALWAYS AS (octet_length(content)) STORED
+        """,
+    ]),
+    # Revision counter behind document ETags; every write to title or content increments it
+    Migration(4, "document version counter", [
+        """
+        ALTER TABLE documents ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1
+        """,
+    ]),
+    # Next "Untitled N.txt" number per user, so handing one out doesn't scan the user's titles.
+    # Numbers are reserved by incrementing the counter; the trigger keeps it above any
+    # "Untitled N.txt" that is uploaded or renamed into place. Longer numbers (the client's
+    # timestamp fallback names) are ignored
+    Migration(5, "untitled document counter", [
+        """
+        CREATE TABLE IF NOT EXISTS untitled_counters (
+            user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+            next_number INTEGER NOT NULL
+        )
+        """,
+        """
+        INSERT INTO untitled_counters (user_id, next_number)
+        SELECT user_id, MAX(substring(title FROM '^Untitled ([0-9]{1,9})\\.txt$')::integer) + 1
+        FROM documents
+        WHERE user_id IS NOT NULL AND title ~ '^Untitled [0-9]{1,9}\\.txt$'
+        GROUP BY user_id
+        ON CONFLICT (user_id) DO NOTHING
+        """,
+        """
+        CREATE OR REPLACE FUNCTION track_untitled_number() RETURNS trigger AS $$
+        DECLARE
+            untitled INTEGER := substring(NEW.title FROM '^Untitled ([0-9]{1,9})\\.txt$')::integer;
+        BEGIN
+            IF untitled IS NOT NULL AND NEW.user_id IS NOT NULL THEN
+                INSERT INTO untitled_counters (user_id, next_number) VALUES (NEW.user_id, untitled + 1)
+                ON CONFLICT (user_id) DO UPDATE
+                SET next_number = GREATEST(untitled_counters.next_number, EXCLUDED.next_number);
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        DROP TRIGGER IF EXISTS documents_untitled_number ON documents
+        """,
+        """
+        CREATE TRIGGER documents_untitled_number
+        AFTER INSERT OR UPDATE OF title ON documents
+        FOR EACH ROW EXECUTE FUNCTION track_untitled_number()
+        """,
+    ]),
+]
+
+
+def check_migrations(migrations: Sequence[Migration]):
+    """Versions must be unique and listed in ascending order"""
+    versions = [migration.version for migration in migrations]
+    if versions != sorted(set(versions)):
+        raise ValueError(f"Migration versions must be unique and ascending, got {versions}")
+
+
+def applied_versions(conn: Connection) -> Set[int]:
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT version FROM schema_migrations")
+        return {row[0] for row in cursor.fetchall()}
+
+
+def migrate(conn: Connection, migrations: Sequence[Migration] = MIGRATIONS) -> List[int]:
+    """
+    Apply the migrations not yet recorded in schema_migrations, one transaction each
+    A failing migration is rolled back and its error propagates; earlier ones stay applied
+    Returns the versions applied by this call
+    """
+    check_migrations(migrations)
+    with conn:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INTEGER PRIMARY KEY,
+                    name VARCHAR(255) NOT NULL,
+                    applied_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+    applied = []
+    for migration in migrations:
+        with conn:  # commits on success, rolls back on error
+            with conn.cursor() as cursor:
+                # Re-read under the lock: another worker may have applied it meanwhile
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+                if migration.version in applied_versions(conn):
+                    continue
+                for statement in migration.statements:
+                    cursor.execute(statement)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                    (migration.version, migration.name)
+                )
+        applied.append(migration.version)
+    return applied
+
+
+def run_migrations() -> List[int]:
+    """Bring the database schema up to date over one dedicated connection (run once at startup)"""
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        return migrate(conn)
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply pending database schema migrations")
+    parser.add_argument("--status", action="store_true", help="Only list applied and pending migrations")
+    args = parser.parse_args()
+
+    if not args.status:
+        applied = run_migrations()
+        print(f"Applied migrations: {applied}" if applied else "Database schema is up to date")
+        return 0
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        with conn:
+            done = applied_versions(conn)
+    except UndefinedTable:
+        done = set()
+    finally:
+        conn.close()
+    for migration in MIGRATIONS:
+        state = "applied" if migration.version in done else "pending"
+        print(f"{migration.version:>4}  {state:<8} {migration.name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,24 @@
-from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.middleware.gzip import GZipMiddleware
-from app.database.db_config import create_users_table, create_documents_table, create_training_data_table
+from app.database.migrations import run_migrations
+from app.database.async_db import async_db
 from app.routes.auth import router as auth_router
 from app.routes.documents import router as documents_router
 from app.routes.google_oauth import router as google_oauth_router
+from app.routes.health import router as health_router
 from app.utils.websocket_manager import websocket_manager
+from app.utils.chunking_pool import chunking_executor
+from app.utils.ai_services import ai_services
+from app.utils.correction_jobs import correction_job_manager
 from app.utils.jwt_utils import verify_token
+from app.utils.readiness import readiness
+from app.utils.warmup import start_warm_up
+from contextlib import asynccontextmanager
+import asyncio
 import json
 import uvicorn
 import os
@@ -19,9 +28,27 @@ import secrets
 # Load environment variables
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Startup: apply pending schema migrations, then warm up spaCy, the database
+    pools and (optionally) the AI endpoints in the background, so the server accepts
+    connections right away and /readyz reports when it is warm
+    Shutdown: flush buffered writes and close pooled resources
+    """
+    await readiness.run("database_schema", lambda: asyncio.to_thread(run_migrations))
+    warm_up = start_warm_up(readiness)
+    yield
+    warm_up.cancel()
+    await asyncio.gather(warm_up, return_exceptions=True)
+    await close_pools()
+
+
 app = FastAPI(
     title="CBC English Proficiency Coach MVP", 
     version="0.1.3",
+    lifespan=lifespan,
     docs_url="/docs" if os.getenv("ENVIRONMENT") != "production" else None,
     redoc_url="/redoc" if os.getenv("ENVIRONMENT") != "production" else None
 )
@@ -48,17 +75,19 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 app.include_router(auth_router, prefix="/auth", tags=["auth"])
 app.include_router(google_oauth_router, prefix="/auth", tags=["auth"])
 app.include_router(documents_router, prefix="/documents", tags=["documents"])
+app.include_router(health_router, tags=["health"])
 
 # Templates configuration
 templates = Jinja2Templates(directory="templates")
 
-# Create tables on startup
-try:
-    create_users_table()
-    create_documents_table()
-    create_training_data_table()
-except (HTTPException, Exception):
-    pass  # Tables may already exist
+
+async def close_pools():
+    """Close pooled database and HTTP connections on shutdown"""
+    # Write buffered auto-saves while the database pool is still open
+    await websocket_manager.autosave_buffer.close()
+    await ai_services.aclose()
+    chunking_executor.shutdown()
+    await async_db.close()
 
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
@@ -98,6 +127,8 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
         return
     
     await websocket_manager.connect(websocket, user_id)
+    # Catch the client up on correction jobs that progressed while it was away
+    await correction_job_manager.replay(user_id)
     try:
         while True:
             # Receive message from client
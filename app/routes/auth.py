@@ -3,9 +3,8 @@ from app.schemas.user import UserCreate, UserLogin, UserThemeUpdate, ForgotPassw
 from app.utils.auth_utils import hash_password, verify_password
 from app.utils.jwt_utils import create_access_token, SECRET_KEY
 from app.utils.email_utils import send_password_reset_email, send_password_reset_success_email
-from app.database.db_config import get_db_connection, create_user, get_user_by_email
-from psycopg2.extensions import connection as Connection
-from psycopg2 import Error as Psycopg2Error
+from app.database.async_db import get_async_db, create_user, get_user_by_email
+from psycopg import AsyncConnection, Error as PsycopgError
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
 import secrets
@@ -14,19 +13,11 @@ import traceback
 router = APIRouter()
 
 
-def get_db():
-    conn = get_db_connection()
-    try:
-        yield conn
-    finally:
-        conn.close()
-
-
 @router.post("/signup")
-async def signup(user: UserCreate, db: Connection = Depends(get_db)):
+async def signup(user: UserCreate, db: AsyncConnection = Depends(get_async_db)):
     try:
         # Check if email already exists
-        existing_user = get_user_by_email(db, user.email)
+        existing_user = await get_user_by_email(db, user.email)
         if existing_user:
             raise HTTPException(status_code=400, detail="Email already registered")
 
@@ -36,7 +27,7 @@ async def signup(user: UserCreate, db: Connection = Depends(get_db)):
 
         # Hash password and create user with all fields
         password_hash = hash_password(user.password)
-        user_id = create_user(
+        user_id = await create_user(
             db=db,
             email=user.email,
             password_hash=password_hash,
@@ -50,7 +41,7 @@ async def signup(user: UserCreate, db: Connection = Depends(get_db)):
         return {"message": "User created successfully", "user_id": user_id}
     except HTTPException as e:
         raise
-    except Psycopg2Error as e:
+    except PsycopgError as e:
         error_detail = f"Database error during signup: {str(e)}\n{traceback.format_exc()}"
         raise HTTPException(status_code=500, detail=error_detail)
     except Exception as e:
@@ -59,9 +50,9 @@ async def signup(user: UserCreate, db: Connection = Depends(get_db)):
 
 
 @router.post("/login")
-async def login(user: UserLogin, db: Connection = Depends(get_db)):
+async def login(user: UserLogin, db: AsyncConnection = Depends(get_async_db)):
     try:
-        db_user = get_user_by_email(db, user.email)
+        db_user = await get_user_by_email(db, user.email)
         
         # Check if account exists
         if not db_user:
@@ -79,9 +70,9 @@ async def login(user: UserLogin, db: Connection = Depends(get_db)):
 
         # Update last login timestamp
         cursor = db.cursor()
-        cursor.execute("UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE email = %s", (user.email,))
-        db.commit()
-        cursor.close()
+        await cursor.execute("UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE email = %s", (user.email,))
+        await db.commit()
+        await cursor.close()
 
         # Create access token
         token_data = {
@@ -100,7 +91,7 @@ async def login(user: UserLogin, db: Connection = Depends(get_db)):
         }
     except HTTPException as e:
         raise
-    except Psycopg2Error as e:
+    except PsycopgError as e:
         error_detail = f"Database error during login: {str(e)}\n{traceback.format_exc()}"
         raise HTTPException(status_code=500, detail=error_detail)
     except Exception as e:
@@ -111,7 +102,7 @@ async def login(user: UserLogin, db: Connection = Depends(get_db)):
 @router.get("/user-data")
 async def get_user_data(
     request: Request,
-    db: Connection = Depends(get_db)
+    db: AsyncConnection = Depends(get_async_db)
 ):
     """Get current user data from database using JWT token"""
     try:
@@ -134,7 +125,7 @@ async def get_user_data(
             raise HTTPException(status_code=401, detail="Invalid or expired token")
         
         # Get user data from database
-        db_user = get_user_by_email(db, user_email)
+        db_user = await get_user_by_email(db, user_email)
         if not db_user:
             raise HTTPException(status_code=404, detail="User not found")
         
@@ -155,11 +146,11 @@ async def get_user_data(
 
 
 @router.post("/forgot-password")
-async def forgot_password(request: ForgotPasswordRequest, db: Connection = Depends(get_db)):
+async def forgot_password(request: ForgotPasswordRequest, db: AsyncConnection = Depends(get_async_db)):
     """Send password reset email to user"""
     try:
         # Check if user exists
-        db_user = get_user_by_email(db, request.email)
+        db_user = await get_user_by_email(db, request.email)
         if not db_user:
             # For security, don't reveal if email exists
             return {"message": "If an account exists with this email, a password reset link has been sent."}
@@ -170,12 +161,12 @@ async def forgot_password(request: ForgotPasswordRequest, db: Connection = Depen
         
         # Store reset token in database
         cursor = db.cursor()
-        cursor.execute(
+        await cursor.execute(
             "UPDATE users SET reset_token = %s, reset_token_expires = %s WHERE email = %s",
             (reset_token, token_expires, request.email)
         )
-        db.commit()
-        cursor.close()
+        await db.commit()
+        await cursor.close()
         
         # Send password reset email
         user_name = db_user[2]  # first_name
@@ -198,7 +189,7 @@ async def forgot_password(request: ForgotPasswordRequest, db: Connection = Depen
 
 
 @router.post("/reset-password")
-async def reset_password(request: ResetPasswordRequest, db: Connection = Depends(get_db)):
+async def reset_password(request: ResetPasswordRequest, db: AsyncConnection = Depends(get_async_db)):
     """Reset user password using reset token"""
     try:
         # Validate password
@@ -210,7 +201,7 @@ async def reset_password(request: ResetPasswordRequest, db: Connection = Depends
         
         # Find user by reset token
         cursor = db.cursor()
-        cursor.execute(
+        await cursor.execute(
             """
             SELECT id, email, first_name, reset_token_expires 
             FROM users 
@@ -218,7 +209,7 @@ async def reset_password(request: ResetPasswordRequest, db: Connection = Depends
             """,
             (request.token,)
         )
-        user = cursor.fetchone()
+        user = await cursor.fetchone()
         
         if not user:
             raise HTTPException(
@@ -230,12 +221,12 @@ async def reset_password(request: ResetPasswordRequest, db: Connection = Depends
         expires_at = user[3]
         if datetime.utcnow() > expires_at:
             # Clear expired token
-            cursor.execute(
+            await cursor.execute(
                 "UPDATE users SET reset_token = NULL, reset_token_expires = NULL WHERE id = %s",
                 (user[0],)
             )
-            db.commit()
-            cursor.close()
+            await db.commit()
+            await cursor.close()
             
             raise HTTPException(
                 status_code=400,
@@ -244,7 +235,7 @@ async def reset_password(request: ResetPasswordRequest, db: Connection = Depends
         
         # Hash new password and update
         password_hash = hash_password(request.new_password)
-        cursor.execute(
+        await cursor.execute(
             """
             UPDATE users 
             SET password_hash = %s, reset_token = NULL, reset_token_expires = NULL 
@@ -252,8 +243,8 @@ async def reset_password(request: ResetPasswordRequest, db: Connection = Depends
             """,
             (password_hash, user[0])
         )
-        db.commit()
-        cursor.close()
+        await db.commit()
+        await cursor.close()
         
         # Send confirmation email
         user_email = user[1]
@@ -275,7 +266,7 @@ async def reset_password(request: ResetPasswordRequest, db: Connection = Depends
 async def update_user_theme(
     theme_data: UserThemeUpdate,
     request: Request,
-    db: Connection = Depends(get_db)
+    db: AsyncConnection = Depends(get_async_db)
 ):
     """Update user's theme preference"""
     try:
@@ -302,19 +293,19 @@ async def update_user_theme(
         cursor = db.cursor()
         try:
             # Update user's theme
-            cursor.execute(
+            await cursor.execute(
                 "UPDATE users SET theme = %s WHERE id = %s",
                 (theme_data.theme, user_id)
             )
-            db.commit()
+            await db.commit()
             
             return {"message": "Theme updated successfully", "theme": theme_data.theme}
             
-        except Psycopg2Error as e:
-            db.rollback()
+        except PsycopgError as e:
+            await db.rollback()
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
         finally:
-            cursor.close()
+            await cursor.close()
         
     except HTTPException as e:
         raise
@@ -326,7 +317,7 @@ async def update_user_theme(
 async def update_user_profile(
     profile_data: UserProfileUpdate,
     request: Request,
-    db: Connection = Depends(get_db)
+    db: AsyncConnection = Depends(get_async_db)
 ):
     """Update user's profile (first_name and last_name only)"""
     try:
@@ -352,11 +343,11 @@ async def update_user_profile(
         # Update profile in database
         cursor = db.cursor()
         try:
-            cursor.execute(
+            await cursor.execute(
                 "UPDATE users SET first_name = %s, last_name = %s WHERE id = %s",
                 (profile_data.first_name, profile_data.last_name, user_id)
             )
-            db.commit()
+            await db.commit()
             
             return {
                 "message": "Profile updated successfully",
@@ -364,11 +355,11 @@ async def update_user_profile(
                 "last_name": profile_data.last_name
             }
             
-        except Psycopg2Error as e:
-            db.rollback()
+        except PsycopgError as e:
+            await db.rollback()
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
         finally:
-            cursor.close()
+            await cursor.close()
         
     except HTTPException as e:
         raise
@@ -1,24 +1,142 @@
-from fastapi import APIRouter, HTTPException, Depends, File, UploadFile, Request
+from fastapi import APIRouter, HTTPException, Depends, File, Query, UploadFile, Request, Response
 from fastapi.responses import JSONResponse
-from app.database.db_config import get_db_connection
+from app.database.async_db import async_db, get_async_db
 from app.dependencies.jwt_current_user import get_current_user
 from app.utils.ai_services import ai_services
-from psycopg2.extensions import connection as Connection
+from app.utils.correction_jobs import correction_job_manager
+from app.utils.text_processor import html_to_text
+from app.utils.upload_utils import (
+    BULK_UPLOAD_INSERT_BATCH_BYTES, BULK_UPLOAD_MAX_ARCHIVE_BYTES, BULK_UPLOAD_MAX_FILES, ImportedFile,
+    UploadError, check_txt_name, copy_stem_prefix, insert_batches, read_text_upload, read_zip_texts,
+    resolve_titles, title_stem
+)
+from app.utils.websocket_manager import websocket_manager
+from psycopg import AsyncConnection
+from psycopg.errors import UniqueViolation
+from datetime import datetime
+from decouple import config
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import base64
+import binascii
+import hashlib
 
 router = APIRouter()
 
-def get_db():
-    conn = get_db_connection()
+DOCUMENT_PAGE_SIZE = config("DOCUMENT_PAGE_SIZE", default=100, cast=int)
+DOCUMENT_PAGE_MAX_SIZE = 500
+# Browsers keep the response but check the ETag before reusing it, so unchanged documents come back as 304
+REVALIDATE = "private, no-cache"
+
+
+def duplicate_title_error(title: str) -> HTTPException:
+    return HTTPException(
+        status_code=400,
+        detail=f"A document with the name '{title}' already exists. Please choose a different name."
+    )
+
+
+def encode_cursor(created_at: datetime, doc_id: int) -> str:
+    """Opaque /list cursor: position of the last document on a page"""
+    raw = f"{created_at.isoformat()}|{doc_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
     try:
-        yield conn
-    finally:
-        conn.close()
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, doc_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(doc_id)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def document_etag(doc_id: int, version: int) -> str:
+    return f'"{doc_id}-{version}"'
+
+
+def etag_matches(header: Optional[str], etag: str, weak: bool = True) -> bool:
+    """
+    Whether an If-None-Match (weak comparison) or If-Match (strong comparison) header
+    lists etag; "*" matches any current representation
+    """
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            if not weak:
+                continue
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": REVALIDATE})
+
+
+async def check_if_match(cursor, request: Request, doc_id: int, user_id: int) -> Optional[int]:
+    """
+    404 for a document the user doesn't own, 412 when If-Match doesn't name its current version
+    Returns the version the write has to find (None without If-Match, i.e. last write wins)
+    """
+    await cursor.execute(
+        "SELECT version FROM documents WHERE id = %s AND user_id = %s",
+        (doc_id, user_id)
+    )
+    row = await cursor.fetchone()
+    if not row:
+        await cursor.close()
+        raise HTTPException(
+            status_code=404,
+            detail="Document not found or access denied"
+        )
+    if_match = request.headers.get("If-Match")
+    if if_match is None:
+        return None
+    if not etag_matches(if_match, document_etag(doc_id, row[0]), weak=False):
+        await cursor.close()
+        raise document_modified_error()
+    return row[0]
+
+
+def version_condition(expected_version: Optional[int]) -> str:
+    """Extra UPDATE condition that makes an If-Match write lose cleanly to a concurrent one"""
+    return "" if expected_version is None else "AND version = %s"
+
+
+def version_params(expected_version: Optional[int]) -> Tuple[int, ...]:
+    return () if expected_version is None else (expected_version,)
+
+
+def document_modified_error() -> HTTPException:
+    return HTTPException(
+        status_code=412,
+        detail="Document was modified since it was loaded. Reload it before saving."
+    )
+
+
+def escape_like(text: str) -> str:
+    """Match text literally inside a LIKE / ILIKE pattern"""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def copies_pattern(name: str) -> str:
+    """LIKE pattern for the "<stem> (N).txt" copies resolve_titles may pick for name, shortened stems included"""
+    extension = name[-4:]
+    prefix, whole = copy_stem_prefix(title_stem(name), extension)
+    return f"{escape_like(prefix)}{'' if whole else '%'} (%){extension}"
+
 
 @router.post("/upload")
 async def upload_document(
     request: Request,  # Add this parameter
     file: UploadFile = File(...),
-    db: Connection = Depends(get_db),
+    db: AsyncConnection = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
     try:
@@ -36,48 +154,29 @@ async def upload_document(
                 detail="Only .txt files are allowed"
             )
 
-        # Check if filename already exists for this user
-        cursor = db.cursor()
-        cursor.execute(
-            "SELECT id FROM documents WHERE title = %s AND user_id = %s",
-            (file.filename, current_user["user_id"])
-        )
-        if cursor.fetchone():
-            cursor.close()
-            raise HTTPException(
-                status_code=400,
-                detail=f"A document with the name '{file.filename}' already exists. Please choose a different name."
-            )
-        cursor.close()
-
-        # Read and validate content
-        content = await file.read()
-        
-        # Check file size (1MB)
-        if len(content) > 1024 * 1024:
-            raise HTTPException(
-                status_code=400, 
-                detail="File size exceeds 1MB limit"
-            )
-            
+        # Read in blocks, stopping at the first one past 1MB and checking UTF-8 as it arrives
         try:
-            # Verify content is valid UTF-8 text
-            text_content = content.decode('utf-8')
-        except UnicodeDecodeError:
+            text_content = await read_text_upload(file)
+        except UploadError as e:
             raise HTTPException(
                 status_code=400, 
-                detail="File must be a valid UTF-8 text file"
+                detail=str(e)
             )
 
-        # Store in database
+        # Store in database; the unique (user_id, title) index rejects duplicate names atomically
         cursor = db.cursor()
-        cursor.execute(
-            "INSERT INTO documents (user_id, title, content) VALUES (%s, %s, %s) RETURNING id",
-            (current_user["user_id"], file.filename, text_content)
-        )
-        doc_id = cursor.fetchone()[0]
-        db.commit()
-        cursor.close()
+        try:
+            await cursor.execute(
+                "INSERT INTO documents (user_id, title, content) VALUES (%s, %s, %s) RETURNING id",
+                (current_user["user_id"], file.filename, text_content)
+            )
+        except UniqueViolation:
+            await cursor.close()
+            await db.rollback()
+            raise duplicate_title_error(file.filename)
+        doc_id = (await cursor.fetchone())[0]
+        await db.commit()
+        await cursor.close()
         
         return JSONResponse(
             status_code=201,
@@ -95,41 +194,158 @@ async def upload_document(
             detail=f"Error processing upload: {str(e)}"
         )
 
-@router.get("/get-next-untitled-number")
+@router.post("/bulk-upload")
+async def bulk_upload_documents(
+    files: List[UploadFile] = File(...),
+    db: AsyncConnection = Depends(get_async_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Import several .txt files and/or ZIP archives of .txt files in one request
+    Every file is validated like /upload; colliding names get a " (N)" suffix instead of
+    failing, and all accepted documents are inserted in one transaction (batched INSERTs).
+    Responds with a result per file (201 if anything was imported)
+    """
+    if len(files) > BULK_UPLOAD_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {BULK_UPLOAD_MAX_FILES} files can be imported at once"
+        )
+
+    imported: List[ImportedFile] = []
+    for upload in files:
+        filename = upload.filename or ""
+        if filename.lower().endswith(".zip"):
+            if upload.size is not None and upload.size > BULK_UPLOAD_MAX_ARCHIVE_BYTES:
+                imported.append(ImportedFile(filename, error="Archive exceeds the size limit"))
+                continue
+            try:
+                # zipfile is blocking; decompress off the event loop
+                imported.extend(await asyncio.to_thread(
+                    read_zip_texts, upload.file, BULK_UPLOAD_MAX_FILES - len(imported)
+                ))
+            except UploadError as e:
+                imported.append(ImportedFile(filename, error=str(e)))
+            continue
+
+        error = check_txt_name(filename)
+        if error is None and upload.content_type != "text/plain":
+            error = "Only plain text (text/plain) files are allowed"
+        if error is None:
+            try:
+                imported.append(ImportedFile(filename, text=await read_text_upload(upload)))
+                continue
+            except UploadError as e:
+                error = str(e)
+        imported.append(ImportedFile(filename, error=error))
+
+    if len(imported) > BULK_UPLOAD_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {BULK_UPLOAD_MAX_FILES} files can be imported at once"
+        )
+
+    accepted = [file for file in imported if file.text is not None]
+    created: Dict[str, int] = {}
+    titles: List[str] = []
+    if accepted:
+        try:
+            titles, created = await insert_documents(db, current_user["user_id"], accepted)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error importing documents: {str(e)}"
+            )
+
+    results = []
+    titles_left = iter(titles)
+    for file in imported:
+        if file.text is None:
+            results.append({"filename": file.filename, "status": "failed", "error": file.error})
+            continue
+        title = next(titles_left)
+        results.append({"filename": file.filename, "status": "created", "title": title, "document_id": created[title]})
+
+    return JSONResponse(
+        status_code=201 if created else 400,
+        content={
+            "message": f"Imported {len(created)} of {len(imported)} files",
+            "created": len(created),
+            "failed": len(imported) - len(created),
+            "results": results
+        }
+    )
+
+
+async def insert_documents(db: AsyncConnection, user_id: int, files: List[ImportedFile]) -> Tuple[List[str], Dict[str, int]]:
+    """
+    Pick free titles with one query, then insert the files with one INSERT ... SELECT FROM unnest
+    per batch of up to BULK_UPLOAD_INSERT_BATCH_BYTES of text, all in one transaction
+    Returns the titles in file order and title -> new document id
+    """
+    names = [file.filename for file in files]
+    texts = [file.text for file in files]
+    # Existing titles a name could collide with: the name itself and its "<stem> (N).txt" copies
+    patterns = [copies_pattern(name) for name in names]
+    for attempt in range(2):
+        cursor = db.cursor()
+        await cursor.execute(
+            "SELECT title FROM documents WHERE user_id = %s AND (title = ANY(%s) OR title LIKE ANY(%s))",
+            (user_id, names, patterns)
+        )
+        taken = {row[0] for row in await cursor.fetchall()}
+        titles = resolve_titles(names, taken)
+        created = {}
+        try:
+            for batch_titles, batch_texts in insert_batches(titles, texts, BULK_UPLOAD_INSERT_BATCH_BYTES):
+                await cursor.execute(
+                    """
+                    INSERT INTO documents (user_id, title, content)
+                    SELECT %s, batch.title, batch.content
+                    FROM unnest(%s::text[], %s::text[]) AS batch(title, content)
+                    RETURNING id, title
+                    """,
+                    (user_id, batch_titles, batch_texts)
+                )
+                created.update((title, doc_id) for doc_id, title in await cursor.fetchall())
+        except UniqueViolation:
+            # Another request took one of the titles since the lookup; pick again
+            await cursor.close()
+            await db.rollback()
+            continue
+        await db.commit()
+        await cursor.close()
+        return titles, created
+    raise HTTPException(
+        status_code=409,
+        detail="Document names changed during the import. Please try again."
+    )
+
+@router.post("/get-next-untitled-number")
 async def get_next_untitled_number(
-    db: Connection = Depends(get_db),
+    db: AsyncConnection = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
-    """Get the next available number for Untitled documents"""
+    """
+    Reserve the next number for an Untitled document
+    One upsert on the user's counter row: constant time, and concurrent calls get distinct numbers
+    POST because every call consumes a number; a GET could be prefetched or retried by the browser
+    """
     try:
         cursor = db.cursor()
-        user_id = current_user["user_id"]
-        
-        cursor.execute(
+        await cursor.execute(
             """
-            SELECT title FROM documents 
-            WHERE user_id = %s
-            ORDER BY title
+            INSERT INTO untitled_counters (user_id, next_number) VALUES (%s, 2)
+            ON CONFLICT (user_id) DO UPDATE SET next_number = untitled_counters.next_number + 1
+            RETURNING next_number - 1
             """, 
-            (user_id,)
+            (current_user["user_id"],)
         )
-        
-        all_docs = cursor.fetchall()
-        cursor.close()
-        
-        # Filter for untitled documents and extract numbers
-        numbers = []
-        for doc in all_docs:
-            title = doc[0]
-            if title.startswith('Untitled ') and title.endswith('.txt'):
-                try:
-                    number_part = title.replace('Untitled ', '').replace('.txt', '')
-                    number = int(number_part)
-                    numbers.append(number)
-                except ValueError:
-                    continue
-        
-        next_number = 1 if not numbers else max(numbers) + 1
+        next_number = (await cursor.fetchone())[0]
+        await db.commit()
+        await cursor.close()
         
         return {
             "nextNumber": next_number,
@@ -145,18 +361,18 @@ async def get_next_untitled_number(
 @router.get("/check-filename/{filename}")
 async def check_filename_exists(
     filename: str,
-    db: Connection = Depends(get_db),
+    db: AsyncConnection = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Check if a filename already exists for the current user"""
     try:
         cursor = db.cursor()
-        cursor.execute(
+        await cursor.execute(
             "SELECT id FROM documents WHERE title = %s AND user_id = %s",
             (filename, current_user["user_id"])
         )
-        exists = cursor.fetchone() is not None
-        cursor.close()
+        exists = (await cursor.fetchone()) is not None
+        await cursor.close()
         
         return {
             "filename": filename,
@@ -172,40 +388,42 @@ async def check_filename_exists(
 @router.delete("/{doc_id}")
 async def delete_document(
     doc_id: int,
-    db: Connection = Depends(get_db),
+    db: AsyncConnection = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Delete a document"""
     try:
+        # Unsaved auto-save content must not resurrect the document
+        await websocket_manager.autosave_buffer.discard(current_user["user_id"], doc_id)
         cursor = db.cursor()
         
         # Check if document exists and belongs to user
-        cursor.execute(
+        await cursor.execute(
             """
             SELECT id, title FROM documents 
             WHERE id = %s AND user_id = %s
             """, 
             (doc_id, current_user["user_id"])
         )
-        document = cursor.fetchone()
+        document = await cursor.fetchone()
         
         if not document:
-            cursor.close()
+            await cursor.close()
             raise HTTPException(
                 status_code=404,
                 detail="Document not found or access denied"
             )
         
         # Delete the document
-        cursor.execute(
+        await cursor.execute(
             """
             DELETE FROM documents 
             WHERE id = %s AND user_id = %s
             """, 
             (doc_id, current_user["user_id"])
         )
-        db.commit()
-        cursor.close()
+        await db.commit()
+        await cursor.close()
         
         return {
             "message": "Document deleted successfully",
@@ -224,7 +442,7 @@ async def delete_document(
 @router.post("/submit-training-data")
 async def submit_training_data(
     request: Request,
-    db: Connection = Depends(get_db),
+    db: AsyncConnection = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Submit teacher corrections and feedback for training data collection"""
@@ -256,7 +474,7 @@ async def submit_training_data(
         cursor = db.cursor()
         
         # Insert training data (anonymous - no user_id stored)
-        cursor.execute(
+        await cursor.execute(
             """
             INSERT INTO training_data (
                 original_text, teacher_correction, cbc_feedback
@@ -266,9 +484,9 @@ async def submit_training_data(
             (original_text, teacher_correction, cbc_feedback)
         )
         
-        training_data_id = cursor.fetchone()[0]
-        db.commit()
-        cursor.close()
+        training_data_id = (await cursor.fetchone())[0]
+        await db.commit()
+        await cursor.close()
         
         return {
             "message": "Training data submitted successfully",
@@ -284,71 +502,153 @@ async def submit_training_data(
             detail=f"Error submitting training data: {str(e)}"
         )
 
+@router.get("/ai-stats")
+async def get_ai_stats(
+    current_user: dict = Depends(get_current_user)
+):
+    """Report AI cache and client metrics (hit/miss ratios etc.)"""
+    return ai_services.stats()
+
+@router.get("/autosave-stats")
+async def get_autosave_stats(
+    current_user: dict = Depends(get_current_user)
+):
+    """Report write-behind auto-save metrics (writes avoided, flush latency)"""
+    return websocket_manager.autosave_buffer.stats()
+
+@router.get("/chunk-cache-stats")
+async def get_chunk_cache_stats(
+    current_user: dict = Depends(get_current_user)
+):
+    """Report chunk cache metrics (hit ratio, estimated memory use)"""
+    return websocket_manager.chunking.cache.stats()
+
+@router.get("/db-pool-stats")
+async def get_db_pool_stats(
+    current_user: dict = Depends(get_current_user)
+):
+    """Report database pool metrics (connections in use, waiting requests, checkout latency)"""
+    return async_db.stats()
+
 @router.get("/list")
 async def get_user_documents(
     request: Request,  # Add this parameter
-    db: Connection = Depends(get_db),
+    response: Response,
+    limit: int = Query(DOCUMENT_PAGE_SIZE, ge=1, le=DOCUMENT_PAGE_MAX_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    title_prefix: Optional[str] = Query(None, description="Only titles starting with this (case-insensitive)"),
+    db: AsyncConnection = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
-    try:        
-        cursor = db.cursor()
-        cursor.execute(
-            """
-            SELECT id, title, content, created_at, last_updated 
+    """
+    Document metadata, newest first, one page at a time
+    When more documents follow, the X-Next-Cursor response header holds the cursor for the next page;
+    If-None-Match with the page's ETag gets 304 Not Modified
+    """
+    conditions = ["user_id = %s"]
+    params: List[Any] = [current_user["user_id"]]
+    if title_prefix:
+        conditions.append("title ILIKE %s")
+        params.append(escape_like(title_prefix) + "%")
+    if cursor:
+        conditions.append("(created_at, id) < (%s, %s)")
+        params.extend(decode_cursor(cursor))
+    try:
+        db_cursor = db.cursor()
+        # Keyset pagination on (created_at, id), served by idx_documents_user_created;
+        # one extra row tells whether another page exists
+        await db_cursor.execute(
+            f"""
+            SELECT id, title, content_size, created_at, last_updated, version 
             FROM documents 
-            WHERE user_id = %s 
-            ORDER BY created_at DESC
+            WHERE {" AND ".join(conditions)}
+            ORDER BY created_at DESC, id DESC
+            LIMIT %s
             """, 
-            (current_user["user_id"],)
+            (*params, limit + 1)
         )
-        documents = cursor.fetchall()
-        cursor.close() 
-        return [
-            {
-                "id": doc[0],
-                "title": doc[1],
-                "size": len(doc[2].encode('utf-8')) if doc[2] else 0,  # Calculate size in bytes
-                "created_at": doc[3].isoformat(),
-                "last_updated": doc[4].isoformat()
-            }
-            for doc in documents
-        ]
-    except Exception as e:# Debug log
+        documents = await db_cursor.fetchall()
+        await db_cursor.close()
+    except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error retrieving documents: {str(e)}"
         )
 
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = encode_cursor(documents[-1][3], documents[-1][0])
+    # Any insert, delete, rename or edit on the page changes an id or a version
+    page_state = ",".join(f"{doc[0]}-{doc[5]}" for doc in documents) + f"|{next_cursor}"
+    etag = f'"{hashlib.sha256(page_state.encode("utf-8")).hexdigest()[:32]}"'
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return not_modified(etag)
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = REVALIDATE
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [
+        {
+            "id": doc[0],
+            "title": doc[1],
+            "size": doc[2] or 0,  # UTF-8 bytes, computed by the database
+            "created_at": doc[3].isoformat(),
+            "last_updated": doc[4].isoformat()
+        }
+        for doc in documents
+    ]
+
 @router.get("/{doc_id}")
 async def get_document(
     doc_id: int,
-    db: Connection = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncConnection = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
+    """The document with its ETag; If-None-Match with the current ETag gets 304 Not Modified"""
     try:        
+        # Read-your-writes: persist auto-saved content still in the write-behind buffer
+        await websocket_manager.autosave_buffer.flush(current_user["user_id"], doc_id)
         cursor = db.cursor()
-        cursor.execute(
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match:
+            # Revalidation only needs the version, not the content
+            await cursor.execute(
+                "SELECT version FROM documents WHERE id = %s AND user_id = %s",
+                (doc_id, current_user["user_id"])
+            )
+            row = await cursor.fetchone()
+            if row and etag_matches(if_none_match, document_etag(doc_id, row[0])):
+                await cursor.close()
+                return not_modified(document_etag(doc_id, row[0]))
+        await cursor.execute(
             """
-            SELECT id, title, content, created_at, last_updated 
+            SELECT id, title, content, created_at, last_updated, version 
             FROM documents 
             WHERE id = %s AND user_id = %s
             """, 
             (doc_id, current_user["user_id"])
         )
-        document = cursor.fetchone()
-        cursor.close()
+        document = await cursor.fetchone()
+        await cursor.close()
         
         if not document:
             raise HTTPException(
                 status_code=404,
                 detail="Document not found or access denied"
             )
+        response.headers["ETag"] = document_etag(document[0], document[5])
+        response.headers["Cache-Control"] = REVALIDATE
         return {
             "id": document[0],
             "title": document[1],
             "content": document[2],
             "created_at": document[3].isoformat(),
-            "last_updated": document[4].isoformat()
+            "last_updated": document[4].isoformat(),
+            "version": document[5]
         }
         
     except HTTPException as e:
@@ -363,9 +663,11 @@ async def get_document(
 async def update_document(
     doc_id: int,
     request: Request,
-    db: Connection = Depends(get_db),
+    response: Response,
+    db: AsyncConnection = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
+    """Replace the content; with If-Match, only if the document is still at that ETag (else 412)"""
     try:
         # Get the request body
         body = await request.json()
@@ -382,38 +684,37 @@ async def update_document(
             )
         cursor = db.cursor()
         
-        # First check if document exists and user owns it
-        cursor.execute(
-            """
-            SELECT id FROM documents 
-            WHERE id = %s AND user_id = %s
-            """, 
-            (doc_id, current_user["user_id"])
-        )
+        # First check if document exists, user owns it and it is still the version the client loaded
+        expected_version = await check_if_match(cursor, request, doc_id, current_user["user_id"])
         
-        if not cursor.fetchone():
-            cursor.close()
-            raise HTTPException(
-                status_code=404,
-                detail="Document not found or access denied"
-            )
+        # This update supersedes any auto-save still waiting in the write-behind buffer
+        await websocket_manager.autosave_buffer.discard(current_user["user_id"], doc_id)
         
-        # Update the document content and last_updated timestamp
-        cursor.execute(
-            """
+        # Update the document content, last_updated timestamp and version
+        await cursor.execute(
+            f"""
             UPDATE documents 
-            SET content = %s, last_updated = CURRENT_TIMESTAMP 
-            WHERE id = %s AND user_id = %s
+            SET content = %s, last_updated = CURRENT_TIMESTAMP, version = version + 1 
+            WHERE id = %s AND user_id = %s {version_condition(expected_version)}
+            RETURNING version
             """, 
-            (new_content, doc_id, current_user["user_id"])
+            (new_content, doc_id, current_user["user_id"], *version_params(expected_version))
         )
+        updated = await cursor.fetchone()
+        if updated is None:
+            # Another write got in between the check and the update
+            await cursor.close()
+            await db.rollback()
+            raise document_modified_error()
         
-        db.commit()
-        cursor.close()
+        await db.commit()
+        await cursor.close()
         
+        response.headers["ETag"] = document_etag(doc_id, updated[0])
         return {
             "message": "Document updated successfully",
-            "document_id": doc_id
+            "document_id": doc_id,
+            "version": updated[0]
         }
         
     except HTTPException as e:
@@ -428,10 +729,11 @@ async def update_document(
 async def rename_document(
     doc_id: int,
     request: Request,
-    db: Connection = Depends(get_db),
+    response: Response,
+    db: AsyncConnection = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
-    """Rename a document"""
+    """Rename a document; If-Match works as for PUT /{doc_id}"""
     try:
         body = await request.json()
         new_title = body.get("title", "").strip()
@@ -442,36 +744,37 @@ async def rename_document(
                 detail="Document title cannot be empty"
             )
         cursor = db.cursor()
-        # Check if document exists and belongs to user
-        cursor.execute(
-            """
-            SELECT id FROM documents 
-            WHERE id = %s AND user_id = %s
-            """, 
-            (doc_id, current_user["user_id"])
-        )
-        if not cursor.fetchone():
-            cursor.close()
-            raise HTTPException(
-                status_code=404,
-                detail="Document not found or access denied"
-            )
+        # Check if document exists, belongs to user and matches If-Match
+        expected_version = await check_if_match(cursor, request, doc_id, current_user["user_id"])
         
-        # Update the document title and last_updated timestamp
-        cursor.execute(
-            """
-            UPDATE documents 
-            SET title = %s, last_updated = CURRENT_TIMESTAMP 
-            WHERE id = %s AND user_id = %s
-            """, 
-            (new_title, doc_id, current_user["user_id"])
-        )
-        db.commit()
-        cursor.close()
+        # Update the document title, last_updated timestamp and version
+        try:
+            await cursor.execute(
+                f"""
+                UPDATE documents 
+                SET title = %s, last_updated = CURRENT_TIMESTAMP, version = version + 1 
+                WHERE id = %s AND user_id = %s {version_condition(expected_version)}
+                RETURNING version
+                """, 
+                (new_title, doc_id, current_user["user_id"], *version_params(expected_version))
+            )
+        except UniqueViolation:
+            await cursor.close()
+            await db.rollback()
+            raise duplicate_title_error(new_title)
+        updated = await cursor.fetchone()
+        if updated is None:
+            await cursor.close()
+            await db.rollback()
+            raise document_modified_error()
+        await db.commit()
+        await cursor.close()
+        response.headers["ETag"] = document_etag(doc_id, updated[0])
         return {
             "message": "Document renamed successfully",
             "document_id": doc_id,
-            "new_title": new_title
+            "new_title": new_title,
+            "version": updated[0]
         }
         
     except HTTPException as e:
@@ -500,7 +803,7 @@ async def get_correction_and_feedback(
             )
         
         # Get BOTH correction and feedback from single-task Mistral model in ONE call
-        corrected_text, feedback_text, error = ai_services.get_correction_and_feedback(text)
+        corrected_text, feedback_text, error = await ai_services.get_correction_and_feedback(text)
         
         if error:
             raise HTTPException(
@@ -523,6 +826,79 @@ async def get_correction_and_feedback(
             detail=f"Error getting correction and feedback: {str(e)}"
         )
 
+@router.post("/{doc_id}/correct-all", status_code=202)
+async def start_correct_all(
+    doc_id: int,
+    db: AsyncConnection = Depends(get_async_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Correct every chunk of a saved document; results stream over the WebSocket as they finish"""
+    try:
+        await websocket_manager.autosave_buffer.flush(current_user["user_id"], doc_id)
+        cursor = db.cursor()
+        await cursor.execute(
+            "SELECT content FROM documents WHERE id = %s AND user_id = %s",
+            (doc_id, current_user["user_id"])
+        )
+        document = await cursor.fetchone()
+        await cursor.close()
+        
+        if not document:
+            raise HTTPException(
+                status_code=404,
+                detail="Document not found or access denied"
+            )
+        
+        text = html_to_text(document[0] or "")
+        if not text.strip():
+            raise HTTPException(
+                status_code=400,
+                detail="Document has no text to correct"
+            )
+        
+        job = await correction_job_manager.start(current_user["user_id"], doc_id, text)
+        return job.summary()
+        
+    except HTTPException as e:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error starting correction job: {str(e)}"
+        )
+
+@router.get("/{doc_id}/correct-all")
+async def get_correct_all_status(
+    doc_id: int,
+    current_user: dict = Depends(get_current_user)
+):
+    """Progress of the document's correction job plus the chunk results finished so far"""
+    job = correction_job_manager.get_job(current_user["user_id"], doc_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail="No correction job for this document"
+        )
+    return {
+        **job.summary(),
+        "results": [job.results[index] for index in sorted(job.results)],
+        "errors": [{"chunk_index": index, "error": error} for index, error in sorted(job.errors.items())]
+    }
+
+@router.delete("/{doc_id}/correct-all")
+async def cancel_correct_all(
+    doc_id: int,
+    current_user: dict = Depends(get_current_user)
+):
+    """Stop the document's correction job; finished chunk results are kept for resuming"""
+    job = await correction_job_manager.cancel(current_user["user_id"], doc_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail="No correction job for this document"
+        )
+    return job.summary()
+
 @router.post("/translate")
 async def translate_text(
     request: Request,
@@ -548,9 +924,9 @@ async def translate_text(
         
         # Perform translation
         if target_language == "kinyarwanda":
-            translated_text, error = ai_services.translate_to_kinyarwanda(text)
+            translated_text, error = await ai_services.translate_to_kinyarwanda(text)
         else:
-            translated_text, error = ai_services.translate_to_english(text)
+            translated_text, error = await ai_services.translate_to_english(text)
         
         if error:
             raise HTTPException(
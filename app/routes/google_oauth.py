@@ -1,24 +1,15 @@
 from fastapi import APIRouter, HTTPException, Depends, Request
 from fastapi.responses import RedirectResponse
 from app.utils.jwt_utils import create_access_token, verify_token
-from app.database.db_config import get_db_connection, get_user_by_email, create_google_user, accept_privacy_terms
+from app.database.async_db import get_async_db, get_user_by_email, create_google_user, accept_privacy_terms
 from app.utils.oauth_config import oauth
 from app.schemas.user import PrivacyAcceptance
-from psycopg2.extensions import connection as Connection
+from psycopg import AsyncConnection
 import os
 
 router = APIRouter()
 
 
-
-def get_db():
-    conn = get_db_connection()
-    try:
-        yield conn
-    finally:
-        conn.close()
-
-
 @router.get("/google/login")
 async def google_login(request: Request):
     """Initiate Google OAuth flow"""
@@ -36,7 +27,7 @@ async def google_login(request: Request):
 
 
 @router.get("/google/callback")
-async def google_callback(request: Request, db: Connection = Depends(get_db)):
+async def google_callback(request: Request, db: AsyncConnection = Depends(get_async_db)):
     """Handle Google OAuth callback"""
     try:
         # Get the access token from Google with clock leeway for WSL/Docker time sync issues
@@ -58,7 +49,7 @@ async def google_callback(request: Request, db: Connection = Depends(get_db)):
         if not google_id or not email:
             raise HTTPException(status_code=400, detail="Incomplete user information from Google")
         
-        existing_user = get_user_by_email(db, email)
+        existing_user = await get_user_by_email(db, email)
         is_new_user = False
         
         if existing_user:
@@ -79,13 +70,13 @@ async def google_callback(request: Request, db: Connection = Depends(get_db)):
             
             # Update last login
             cursor = db.cursor()
-            cursor.execute("UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = %s", (user_id,))
-            db.commit()
-            cursor.close()
+            await cursor.execute("UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = %s", (user_id,))
+            await db.commit()
+            await cursor.close()
         else:
             # New user - create without privacy acceptance
             try:
-                user_id = create_google_user(
+                user_id = await create_google_user(
                     db, email, google_id, first_name, last_name, profile_picture, privacy_accepted=False
                 )
                 user_first_name = first_name
@@ -141,7 +132,7 @@ async def google_callback(request: Request, db: Connection = Depends(get_db)):
 async def accept_privacy(
     privacy_data: PrivacyAcceptance,
     request: Request,
-    db: Connection = Depends(get_db)
+    db: AsyncConnection = Depends(get_async_db)
 ):
     """Accept privacy terms for Google OAuth users"""
     try:
@@ -164,7 +155,7 @@ async def accept_privacy(
             raise HTTPException(status_code=400, detail="Privacy terms must be accepted")
         
         # Accept privacy terms in database
-        accept_privacy_terms(db, user_id)
+        await accept_privacy_terms(db, user_id)
         
         return {
             "message": "Privacy terms accepted successfully",
@@ -0,0 +1,42 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from decouple import config
+from app.database.async_db import async_db
+from app.utils.readiness import readiness
+import asyncio
+import time
+
+READINESS_DB_TIMEOUT = config("READINESS_DB_TIMEOUT", default=2.0, cast=float)
+
+router = APIRouter()
+
+
+async def ping_database():
+    pool = await async_db.get_pool()
+    async with pool.connection(timeout=READINESS_DB_TIMEOUT) as conn:
+        await conn.execute("SELECT 1")
+
+
+async def check_database():
+    """Live database check, so an instance that lost its database stops receiving traffic"""
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(ping_database(), READINESS_DB_TIMEOUT)
+    except Exception as e:
+        return {"status": "failed", "required": True, "error": f"{type(e).__name__}: {e}"}
+    return {"status": "ready", "required": True, "latency_ms": (time.perf_counter() - started) * 1000}
+
+
+@router.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving requests"""
+    return {"status": "ok"}
+
+
+@router.get("/readyz")
+async def readyz():
+    """Readiness: startup and warm-up steps have finished and the database answers; 503 otherwise"""
+    report = readiness.report()
+    report["components"]["database"] = await check_database()
+    report["ready"] = report["ready"] and report["components"]["database"]["status"] == "ready"
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
@@ -1,28 +1,153 @@
-import requests
-import os
+import asyncio
+import httpx
+import time
 from decouple import config
-from typing import Dict, Tuple, Optional
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Tuple, Optional
+from app.utils.correction_cache import CorrectionCache, CORRECTION_MODEL_VERSION, make_cache_key
+from app.utils.translation_memory import TranslationMemory, source_hash
+from app.utils.batch_scheduler import MicroBatcher, QueueFullError
+
+# HTTP client tuning (overridable through environment / .env)
+AI_REQUEST_TIMEOUT = config("AI_REQUEST_TIMEOUT", default=100.0, cast=float)
+AI_CONNECT_TIMEOUT = config("AI_CONNECT_TIMEOUT", default=10.0, cast=float)
+AI_MAX_CONNECTIONS = config("AI_MAX_CONNECTIONS", default=20, cast=int)
+AI_MAX_KEEPALIVE_CONNECTIONS = config("AI_MAX_KEEPALIVE_CONNECTIONS", default=10, cast=int)
+AI_KEEPALIVE_EXPIRY = config("AI_KEEPALIVE_EXPIRY", default=60.0, cast=float)
+
+# Maximum simultaneous in-flight requests per endpoint
+MISTRAL_MAX_CONCURRENCY = config("MISTRAL_MAX_CONCURRENCY", default=4, cast=int)
+NLLB_MAX_CONCURRENCY = config("NLLB_MAX_CONCURRENCY", default=8, cast=int)
+
+# Micro-batching of correction requests to the Mistral endpoint
+CORRECTION_BATCH_ENABLED = config("CORRECTION_BATCH_ENABLED", default=True, cast=bool)
+CORRECTION_BATCH_WINDOW_MS = config("CORRECTION_BATCH_WINDOW_MS", default=20.0, cast=float)
+CORRECTION_BATCH_MAX_SIZE = config("CORRECTION_BATCH_MAX_SIZE", default=8, cast=int)
+CORRECTION_BATCH_MAX_QUEUE = config("CORRECTION_BATCH_MAX_QUEUE", default=256, cast=int)
+
+# Start-up warm-up requests keep retrying while an endpoint reports the model is loading
+AI_WARM_UP_TIMEOUT = config("AI_WARM_UP_TIMEOUT", default=300.0, cast=float)
+AI_WARM_UP_RETRY_INTERVAL = config("AI_WARM_UP_RETRY_INTERVAL", default=10.0, cast=float)
+
+MODEL_LOADING_ERROR = "Service unavailable: Model is loading"
+
+CORRECTION_PARAMETERS = {
+    "max_new_tokens": 600
+}
 
 class AIServices:
     """Handles all AI model interactions for grammar and translation"""
     
-    def __init__(self):
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None,
+                 correction_cache: Optional[CorrectionCache] = None,
+                 translation_memory: Optional[TranslationMemory] = None,
+                 batching: bool = CORRECTION_BATCH_ENABLED):
         self.hf_token = config("HF_TOKEN", default="")
         
         # Endpoint URLs
         self.mistral_endpoint = "https://sjue5qunezddjig4.us-east-1.aws.endpoints.huggingface.cloud"
         self.nllb_endpoint = "https://o2cic8aj8unax7y5.us-east-1.aws.endpoints.huggingface.cloud"
+        
+        self.endpoint_concurrency = {
+            self.mistral_endpoint: MISTRAL_MAX_CONCURRENCY,
+            self.nllb_endpoint: NLLB_MAX_CONCURRENCY
+        }
+        
+        # Shared keep-alive client, created lazily on the running event loop
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        
+        # Correction results cache, consulted before any network call
+        self.correction_cache = correction_cache or CorrectionCache()
+        
+        # Sentence-level translation memory for NLLB
+        self.translation_memory = translation_memory or TranslationMemory()
+        
+        # Single-flight registry of in-progress upstream calls
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.coalesced_calls = 0
+        
+        # Pending corrections are grouped into batched endpoint calls
+        self.correction_batcher: Optional[MicroBatcher] = None
+        if batching:
+            self.correction_batcher = MicroBatcher(
+                self._send_correction_batch,
+                max_batch_size=CORRECTION_BATCH_MAX_SIZE,
+                window_ms=CORRECTION_BATCH_WINDOW_MS,
+                max_queue_depth=CORRECTION_BATCH_MAX_QUEUE
+            )
     
-    def _make_request(self, endpoint: str, payload: Dict) -> Dict:
-        """Make request to Hugging Face endpoint with robust error handling (like test file)"""
-        headers = {
-            "Accept": "application/json",
-            "Authorization": f"Bearer {self.hf_token}",
-            "Content-Type": "application/json"
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared HTTP client, recreating it if the event loop changed"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                headers={
+                    "Accept": "application/json",
+                    "Authorization": f"Bearer {self.hf_token}",
+                    "Content-Type": "application/json"
+                },
+                timeout=httpx.Timeout(AI_REQUEST_TIMEOUT, connect=AI_CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=AI_MAX_CONNECTIONS,
+                    max_keepalive_connections=AI_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=AI_KEEPALIVE_EXPIRY
+                ),
+                transport=self._transport
+            )
+            self._client_loop = loop
+            self._semaphores = {}
+        return self._client
+    
+    def _get_semaphore(self, endpoint: str) -> asyncio.Semaphore:
+        """Per-endpoint concurrency limit"""
+        if endpoint not in self._semaphores:
+            self._semaphores[endpoint] = asyncio.Semaphore(self.endpoint_concurrency.get(endpoint, MISTRAL_MAX_CONCURRENCY))
+        return self._semaphores[endpoint]
+    
+    async def aclose(self):
+        """Close the shared HTTP client (called on application shutdown)"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._client_loop = None
+    
+    async def _single_flight(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run call() once per key among concurrent callers
+        Later callers await the same task; shield() keeps a disconnecting caller
+        from cancelling the upstream request the others are waiting on
+        """
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced_calls += 1
+            return await asyncio.shield(task)
+        
+        task = asyncio.ensure_future(call())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda finished: self._in_flight.pop(key, None) if self._in_flight.get(key) is finished else None)
+        return await asyncio.shield(task)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Cache and client metrics for monitoring"""
+        return {
+            "correction_cache": self.correction_cache.stats(),
+            "translation_memory": self.translation_memory.stats(),
+            "single_flight": {
+                "coalesced_calls": self.coalesced_calls,
+                "in_flight": len(self._in_flight)
+            },
+            "correction_batching": self.correction_batcher.stats() if self.correction_batcher else {"enabled": False}
         }
+    
+    async def _make_request(self, endpoint: str, payload: Dict) -> Dict:
+        """Make request to Hugging Face endpoint with robust error handling (like test file)"""
+        client = self._get_client()
         
         try:
-            response = requests.post(endpoint, headers=headers, json=payload, timeout=100)
+            async with self._get_semaphore(endpoint):
+                response = await client.post(endpoint, json=payload)
             
             if response.status_code == 401:
                 return {"error": "Unauthorized: Invalid or missing HF_TOKEN"}
@@ -33,34 +158,73 @@ class AIServices:
             elif response.status_code == 500:
                 return {"error": "Internal server error: Model endpoint issue"}
             elif response.status_code == 503:
-                return {"error": "Service unavailable: Model is loading"}
+                return {"error": MODEL_LOADING_ERROR}
             elif response.status_code != 200:
                 return {"error": f"HTTP {response.status_code}: {response.text}"}
             
             return response.json()
             
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             return {"error": "Request timeout: Model took too long to respond"}
-        except requests.exceptions.ConnectionError:
+        except httpx.NetworkError:
             return {"error": "Connection error: Unable to reach endpoint"}
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             return {"error": f"Request failed: {str(e)}"}
         except ValueError:
             return {"error": "Invalid JSON response from server"}
     
-    def get_correction_and_feedback(self, text: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    async def warm_up_endpoint(self, endpoint: str, retry_interval: float = AI_WARM_UP_RETRY_INTERVAL,
+                               timeout: float = AI_WARM_UP_TIMEOUT):
+        """
+        Send a minimal request so a scaled-down endpoint loads its model before real traffic
+        Retries while the endpoint answers 503; raises RuntimeError with the last error otherwise
+        Bypasses the caches and the correction batcher on purpose
+        """
+        if endpoint == self.nllb_endpoint:
+            payload = {"inputs": ["Hello."], "parameters": {"src_lang": "eng_Latn", "tgt_lang": "kin_Latn"}}
+        else:
+            payload = {"inputs": "Hello.", "parameters": {"max_new_tokens": 1}}
+        
+        deadline = time.monotonic() + timeout
+        while True:
+            output = await self._make_request(endpoint, payload)
+            error = output.get("error") if isinstance(output, dict) else None
+            if error is None:
+                return
+            if error != MODEL_LOADING_ERROR or time.monotonic() + retry_interval > deadline:
+                raise RuntimeError(error)
+            await asyncio.sleep(retry_interval)
+    
+    async def get_correction_and_feedback(self, text: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
         """
         Get BOTH grammar correction AND feedback from combined task model in ONE call
         Returns: (corrected_text, feedback_text, error_message)
         """
-        payload = {
-            "inputs": text,
-            "parameters": {
-                "max_new_tokens": 600
-            }
-        }
+        parameters = CORRECTION_PARAMETERS
+        cache_key = make_cache_key(text, self.mistral_endpoint, CORRECTION_MODEL_VERSION, parameters)
+        cached = await self.correction_cache.get(cache_key)
+        if cached is not None:
+            return cached[0], cached[1], None
         
-        output = self._make_request(self.mistral_endpoint, payload)
+        # Identical in-flight requests share one upstream call
+        return await self._single_flight(
+            ("correction", cache_key),
+            lambda: self._request_correction(text, parameters, cache_key)
+        )
+    
+    async def _request_correction(self, text: str, parameters: Dict, cache_key: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """Call the Mistral endpoint (batched when enabled) and cache a successful result"""
+        if self.correction_batcher is not None:
+            try:
+                output = await self.correction_batcher.submit(text)
+            except QueueFullError:
+                return None, None, "Server busy: too many pending corrections, please try again shortly"
+        else:
+            payload = {
+                "inputs": text,
+                "parameters": parameters
+            }
+            output = await self._make_request(self.mistral_endpoint, payload)
         
         # Check for errors first
         if isinstance(output, dict) and "error" in output:
@@ -74,79 +238,120 @@ class AIServices:
             # Clean newlines from correction (handle both escaped and regular newlines)
             correction = correction.replace('\\n\\n', '').replace('\n\n', '').replace('\\n', '').replace('\n', '').strip()
             
+            # Only successful results are cached, so errors are retried
+            await self.correction_cache.set(cache_key, correction, feedback)
             return correction, feedback, None
         
         return None, None, "Invalid response format"
     
-    def translate_to_kinyarwanda(self, text: str) -> Tuple[Optional[str], Optional[str]]:
+    async def _send_correction_batch(self, texts: List[str]) -> List[Any]:
         """
-        Translate English text to Kinyarwanda using NLLB model
-        Returns: (translated_text, error_message)
+        Send several chunks in one request and split the response per chunk
+        Each element has the single-request response shape, so parsing is shared
         """
         payload = {
-            "inputs": text,
-            "parameters": {
-                "src_lang": "eng_Latn",  # English (Latin script)
-                "tgt_lang": "kin_Latn",  # Kinyarwanda (Latin script)
-                "clean_up_tokenization_spaces": True,
-                "truncation": "longest_first"
-            }
+            # A lone chunk keeps the plain string form
+            "inputs": texts[0] if len(texts) == 1 else texts,
+            "parameters": CORRECTION_PARAMETERS
         }
+        output = await self._make_request(self.mistral_endpoint, payload)
         
-        output = self._make_request(self.nllb_endpoint, payload)
-        
-        # Check for errors first
+        if isinstance(output, dict) and "error" in output:
+            return [output] * len(texts)
+        if len(texts) == 1:
+            return [output]
+        if not isinstance(output, list) or len(output) != len(texts):
+            return [{"error": "Invalid response format"}] * len(texts)
+        return [item if isinstance(item, list) else [item] for item in output]
+    
+    def _parse_translations(self, output: Any, expected: int) -> Tuple[Optional[List[str]], Optional[str]]:
+        """Extract one translation per input from an NLLB response (single or batched)"""
         if isinstance(output, dict) and "error" in output:
             # Return user-friendly message if available
-            error_message = output.get("message", output.get("error"))
-            return None, error_message
+            return None, output.get("message", output.get("error"))
         
-        # Extract translation
-        if isinstance(output, list) and len(output) > 0:
-            translation = output[0].get("translation_text", "")
-            if translation:
-                return translation, None
-        elif isinstance(output, dict):
-            translation = output.get("translation_text", "")
-            if translation:
-                return translation, None
-        
-        return None, "Unable to translate text. Please try again."
+        if isinstance(output, dict):
+            output = [output]
+        if not isinstance(output, list) or len(output) != expected:
+            return None, "Unable to translate text. Please try again."
+        
+        translations = []
+        for item in output:
+            # Batched pipelines may wrap each result in its own list
+            if isinstance(item, list) and item:
+                item = item[0]
+            translation = item.get("translation_text", "") if isinstance(item, dict) else ""
+            if not translation:
+                return None, "Unable to translate text. Please try again."
+            translations.append(translation)
+        return translations, None
     
-    def translate_to_english(self, text: str) -> Tuple[Optional[str], Optional[str]]:
+    async def _translate(self, text: str, src_lang: str, tgt_lang: str) -> Tuple[Optional[str], Optional[str]]:
         """
-        Translate Kinyarwanda text to English using NLLB model
-        Returns: (translated_text, error_message)
+        Translate sentence by sentence through the translation memory
+        Only sentences not seen before are sent to NLLB, in one batched request
         """
-        payload = {
-            "inputs": text,
-            "parameters": {
-                "src_lang": "kin_Latn",  # Kinyarwanda (Latin script)
-                "tgt_lang": "eng_Latn",  # English (Latin script)
-                "clean_up_tokenization_spaces": True,
-                "truncation": "longest_first"
-            }
-        }
+        # spaCy segmentation is CPU-bound; keep it off the event loop
+        spans = await asyncio.to_thread(self.translation_memory.split, text)
+        sentences = [text[start:end] for start, end in spans]
+        known = await self.translation_memory.lookup(src_lang, tgt_lang, sentences)
         
-        output = self._make_request(self.nllb_endpoint, payload)
+        # Unique unknown sentences, in first-seen order
+        missing = {}
+        for sentence in sentences:
+            digest = source_hash(sentence)
+            if digest not in known and digest not in missing:
+                missing[digest] = sentence
         
-        # Check for errors first
-        if isinstance(output, dict) and "error" in output:
-            # Return user-friendly message if available
-            error_message = output.get("message", output.get("error"))
-            return None, error_message
+        if missing:
+            payload = {
+                "inputs": list(missing.values()),
+                "parameters": {
+                    "src_lang": src_lang,
+                    "tgt_lang": tgt_lang,
+                    "clean_up_tokenization_spaces": True,
+                    "truncation": "longest_first"
+                }
+            }
+            output = await self._make_request(self.nllb_endpoint, payload)
+            translations, error = self._parse_translations(output, len(missing))
+            if error:
+                return None, error
+            
+            known.update(zip(missing.keys(), translations))
+            await self.translation_memory.store(src_lang, tgt_lang, list(zip(missing.values(), translations)))
         
-        # Extract translation
-        if isinstance(output, list) and len(output) > 0:
-            translation = output[0].get("translation_text", "")
-            if translation:
-                return translation, None
-        elif isinstance(output, dict):
-            translation = output.get("translation_text", "")
-            if translation:
-                return translation, None
-        
-        return None, "Unable to translate text. Please try again."
+        # Reassemble in order, keeping the original whitespace between sentences
+        parts = []
+        position = 0
+        for (start, end), sentence in zip(spans, sentences):
+            parts.append(text[position:start])
+            parts.append(known[source_hash(sentence)])
+            position = end
+        parts.append(text[position:])
+        return ''.join(parts).strip(), None
+    
+    async def translate_to_kinyarwanda(self, text: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Translate English text to Kinyarwanda using NLLB model
+        Returns: (translated_text, error_message)
+        """
+        # English (Latin script) -> Kinyarwanda (Latin script)
+        return await self._single_flight(
+            ("translation", "eng_Latn", "kin_Latn", source_hash(text)),
+            lambda: self._translate(text, "eng_Latn", "kin_Latn")
+        )
+    
+    async def translate_to_english(self, text: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Translate Kinyarwanda text to English using NLLB model
+        Returns: (translated_text, error_message)
+        """
+        # Kinyarwanda (Latin script) -> English (Latin script)
+        return await self._single_flight(
+            ("translation", "kin_Latn", "eng_Latn", source_hash(text)),
+            lambda: self._translate(text, "kin_Latn", "eng_Latn")
+        )
 
 # Global AI services instance
 ai_services = AIServices()
@@ -0,0 +1,129 @@
+"""
+Micro-batching scheduler for model endpoints
+Collects pending requests for up to a time window or a maximum batch size,
+sends them as one batched call and fans the results back out to the callers
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class QueueFullError(Exception):
+    """Raised when the scheduler already holds max_queue_depth pending requests"""
+
+
+class MicroBatcher:
+    """
+    send_batch receives a list of items and must return a list of results of the same length
+    An exception from send_batch is propagated to every caller in that batch
+    """
+
+    def __init__(self, send_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+                 max_batch_size: int = 8, window_ms: float = 20.0, max_queue_depth: int = 256):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.send_batch = send_batch
+        self.max_batch_size = max_batch_size
+        self.window_ms = window_ms
+        self.max_queue_depth = max_queue_depth
+
+        self._pending: List[Tuple[Any, asyncio.Future, float]] = []  # (item, future, enqueued_at)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._dispatches: set = set()
+
+        # Metrics
+        self.batches_sent = 0
+        self.items_sent = 0
+        self.largest_batch = 0
+        self.rejected = 0
+        self.max_queue_depth_seen = 0
+        self._total_wait = 0.0
+        self._total_batch_latency = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result"""
+        if len(self._pending) >= self.max_queue_depth:
+            self.rejected += 1
+            raise QueueFullError(f"Batch queue is full ({self.max_queue_depth} pending requests)")
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future, time.perf_counter()))
+        self.max_queue_depth_seen = max(self.max_queue_depth_seen, len(self._pending))
+
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._worker = asyncio.ensure_future(self._run())
+        elif len(self._pending) >= self.max_batch_size:
+            self._wakeup.set()
+
+        return await future
+
+    async def _run(self):
+        """Form batches until the queue is empty"""
+        while self._pending:
+            # Wait for the window that started with the oldest request, unless the batch fills up first
+            oldest = self._pending[0][2]
+            remaining = self.window_ms / 1000 - (time.perf_counter() - oldest)
+            if remaining > 0 and len(self._pending) < self.max_batch_size:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+
+            # Callers that went away before dispatch don't cost a model slot
+            batch = [entry for entry in batch if not entry[1].cancelled()]
+            if batch:
+                # Dispatch without waiting so the next batch can form meanwhile
+                dispatch = asyncio.ensure_future(self._dispatch(batch))
+                self._dispatches.add(dispatch)
+                dispatch.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future, float]]):
+        started = time.perf_counter()
+        self.batches_sent += 1
+        self.items_sent += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        self._total_wait += sum(started - enqueued_at for _, _, enqueued_at in batch)
+
+        try:
+            results = await self.send_batch([item for item, _, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"Batch returned {len(results)} results for {len(batch)} inputs")
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._total_batch_latency += time.perf_counter() - started
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "window_ms": self.window_ms,
+            "max_queue_depth": self.max_queue_depth,
+            "queue_depth": len(self._pending),
+            "max_queue_depth_seen": self.max_queue_depth_seen,
+            "batches_sent": self.batches_sent,
+            "items_sent": self.items_sent,
+            "largest_batch": self.largest_batch,
+            "avg_batch_size": (self.items_sent / self.batches_sent) if self.batches_sent else 0.0,
+            "avg_queue_wait_ms": (self._total_wait / self.items_sent * 1000) if self.items_sent else 0.0,
+            "avg_batch_latency_ms": (self._total_batch_latency / self.batches_sent * 1000) if self.batches_sent else 0.0,
+            "rejected": self.rejected,
+        }
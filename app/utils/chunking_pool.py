@@ -0,0 +1,179 @@
+"""
+Chunking executor
+Runs the CPU-heavy spaCy sentence parse in a bounded process pool whose workers
+load the model once at start-up (the default), or inline on the event loop as an
+opt-out for single-user setups and tests; grouping sentences into chunks, the
+incremental chunking state and the cache of full chunking results stay in the
+web process
+"""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from decouple import config
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+from app.utils.text_processor import (
+    CHUNK_STREAM_WINDOW, ChunkCache, ChunkingState, ChunkPatch, IntelligentTextProcessor, Sentence,
+    SentenceGrouper, TextChunk, WindowedParse, apply_rechunk, build_chunking_state, content_hash,
+    get_text_processor, plan_rechunk, segmenter_version
+)
+
+CHUNKING_EXECUTOR = config("CHUNKING_EXECUTOR", default="process")  # "process" or "inline"
+CHUNKING_POOL_SIZE = config("CHUNKING_POOL_SIZE", default=2, cast=int)
+
+WARM_UP_TEXT = "The students wrote their essays. The teacher read them carefully!"
+
+ProcessorFactory = Callable[[], IntelligentTextProcessor]
+
+# Set in each pool process by _init_worker
+_worker_processor: Optional[IntelligentTextProcessor] = None
+
+
+def _init_worker(processor_factory: ProcessorFactory):
+    """Pool process initializer: load the spaCy pipeline once per process"""
+    global _worker_processor
+    _worker_processor = processor_factory()
+
+
+def _parse_in_worker(segment: str) -> List[Sentence]:
+    return _worker_processor.parse_sentences(segment)
+
+
+class ChunkingExecutor:
+    """Async front end for chunking; mode "process" keeps the event loop free while spaCy runs"""
+
+    def __init__(self, mode: str = CHUNKING_EXECUTOR, pool_size: int = CHUNKING_POOL_SIZE,
+                 processor_factory: ProcessorFactory = get_text_processor, cache: Optional[ChunkCache] = None,
+                 version: Optional[str] = None, stream_window: int = CHUNK_STREAM_WINDOW):
+        if mode not in ("inline", "process"):
+            raise ValueError(f"Unknown chunking executor mode: {mode}")
+        self.mode = mode
+        self.pool_size = pool_size
+        self.processor_factory = processor_factory
+        self.cache = cache if cache is not None else ChunkCache()
+        # Part of the cache key; pass the backend explicitly when processor_factory isn't the configured one
+        self.version = version or segmenter_version()
+        self.stream_window = stream_window
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: workers start clean instead of forking the server's threads and sockets
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.pool_size,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.processor_factory,)
+            )
+        return self._executor
+
+    async def parse_sentences(self, text: str, start: int = 0, end: Optional[int] = None) -> List[Sentence]:
+        """Sentences of text[start:end] with offsets into text"""
+        end = len(text) if end is None else end
+        if self.mode == "inline":
+            return self.processor_factory().parse_sentences(text, start, end)
+
+        loop = asyncio.get_running_loop()
+        # Cancelling the awaiting task drops a job that is still queued; a running one finishes and is ignored
+        sentences = await loop.run_in_executor(self._get_executor(), _parse_in_worker, text[start:end])
+        if start:
+            sentences = [Sentence(s.start + start, s.end + start, s.text, s.word_count) for s in sentences]
+        return sentences
+
+    async def warm_up(self):
+        """Load the spaCy pipeline ahead of the first request (every worker process in "process" mode)"""
+        if self.mode == "inline":
+            # Model loading is blocking work; keep it off the event loop
+            await asyncio.to_thread(lambda: self.processor_factory().parse_sentences(WARM_UP_TEXT))
+            return
+        await asyncio.gather(*[self.parse_sentences(WARM_UP_TEXT) for _ in range(self.pool_size)])
+
+    def _cache_key(self, text: str, target_words: int) -> Tuple[str, int, str]:
+        return (content_hash(text), target_words, self.version)
+
+    async def chunk_document(self, text: str, target_words: int = 200) -> ChunkingState:
+        """Chunk the whole text, reusing the cached result for content chunked before"""
+        if not text or not text.strip():
+            return ChunkingState(text=text or "", target_words=target_words)
+        key = self._cache_key(text, target_words)
+        state = self.cache.get(key)
+        if state is None:
+            state = build_chunking_state(text, target_words, await self.parse_sentences(text))
+            self.cache.put(key, state)
+        return state
+
+    def stream_document(self, text: str, target_words: int = 200) -> "ChunkStream":
+        """Chunk the whole text window by window; see ChunkStream"""
+        return ChunkStream(self, text, target_words)
+
+    def remember(self, state: ChunkingState):
+        """
+        Cache a state produced by incremental re-chunking, e.g. when the user leaves the document
+        Edits aren't cached one by one, so a long editing session doesn't flood the cache
+        """
+        if state.chunks:
+            self.cache.put(self._cache_key(state.text, state.target_words), state)
+
+    async def rechunk(self, previous: ChunkingState, text: str) -> Tuple[ChunkingState, ChunkPatch]:
+        plan = plan_rechunk(previous, text)
+        if plan is None:
+            state = await self.chunk_document(text, previous.target_words)
+            return state, ChunkPatch(0, len(previous.chunks), state.chunks, 0, 0)
+
+        reparsed = [] if plan.unchanged else await self.parse_sentences(text, plan.window_start, plan.window_end)
+        return apply_rechunk(previous, text, plan, reparsed)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+class ChunkStream:
+    """
+    async for batch in stream: lists of finished chunks, in order, as each window of the
+    text is parsed (a cached result comes as one batch); stream.state holds the full
+    chunking result once iteration is done
+    """
+
+    def __init__(self, executor: ChunkingExecutor, text: str, target_words: int):
+        self.executor = executor
+        self.text = text
+        self.target_words = target_words
+        self.state: Optional[ChunkingState] = None
+
+    def __aiter__(self) -> AsyncIterator[List[TextChunk]]:
+        return self._batches()
+
+    async def _batches(self) -> AsyncIterator[List[TextChunk]]:
+        text, executor = self.text, self.executor
+        if not text or not text.strip():
+            self.state = ChunkingState(text=text or "", target_words=self.target_words)
+            return
+        key = executor._cache_key(text, self.target_words)
+        cached = executor.cache.get(key)
+        if cached is not None:
+            self.state = cached
+            yield cached.chunks
+            return
+
+        grouper = SentenceGrouper(text, self.target_words)
+        windows = WindowedParse(text, executor.stream_window)
+        span = windows.next_window()
+        while span is not None:
+            sentences = windows.accept(span[1], await executor.parse_sentences(text, *span))
+            batch = [chunk for chunk in map(grouper.add, sentences) if chunk is not None]
+            span = windows.next_window()
+            if span is None:
+                last = grouper.finish()
+                if last is not None:
+                    batch.append(last)
+            if batch:
+                yield batch
+
+        self.state = grouper.state()
+        executor.cache.put(key, self.state)
+
+
+# Global chunking executor instance
+chunking_executor = ChunkingExecutor()
@@ -0,0 +1,115 @@
+"""
+Content-addressed cache for grammar correction and feedback results
+Keyed on a hash of the normalized chunk text plus model/endpoint version
+Tier 1: in-process LRU with TTL. Tier 2 (optional): PostgreSQL correction_cache table
+"""
+
+import hashlib
+import json
+import re
+import unicodedata
+from decouple import config
+from typing import Any, Dict, Optional, Tuple
+from app.utils.cache import LRUCache
+from app.database.async_db import async_db
+
+CORRECTION_CACHE_MAX_ENTRIES = config("CORRECTION_CACHE_MAX_ENTRIES", default=2048, cast=int)
+CORRECTION_CACHE_TTL = config("CORRECTION_CACHE_TTL", default=24 * 3600, cast=float)
+CORRECTION_CACHE_PERSISTENT = config("CORRECTION_CACHE_PERSISTENT", default=False, cast=bool)
+CORRECTION_MODEL_VERSION = config("CORRECTION_MODEL_VERSION", default="mistral-combined-task-v1")
+
+
+def normalize_text(text: str) -> str:
+    """Unicode NFC plus whitespace collapsing; case and punctuation are preserved"""
+    return re.sub(r'\s+', ' ', unicodedata.normalize("NFC", text)).strip()
+
+
+def make_cache_key(text: str, endpoint: str, model_version: str = CORRECTION_MODEL_VERSION,
+                   parameters: Optional[Dict[str, Any]] = None) -> str:
+    """SHA-256 over the normalized text and everything that affects the model output"""
+    material = json.dumps({
+        "text": normalize_text(text),
+        "endpoint": endpoint,
+        "model_version": model_version,
+        "parameters": parameters or {},
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class CorrectionCache:
+    """Two-tier cache of (correction, feedback) pairs"""
+
+    def __init__(self, max_entries: int = CORRECTION_CACHE_MAX_ENTRIES, ttl_seconds: float = CORRECTION_CACHE_TTL,
+                 persistent: bool = CORRECTION_CACHE_PERSISTENT):
+        self.memory = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.ttl_seconds = ttl_seconds
+        self.persistent = persistent
+        self.persistent_hits = 0
+        self.persistent_errors = 0
+
+    async def get(self, key: str) -> Optional[Tuple[str, str]]:
+        cached = self.memory.get(key)
+        if cached is not None:
+            return cached
+        if not self.persistent:
+            return None
+
+        cached = await self._load_persistent(key)
+        if cached is not None:
+            self.persistent_hits += 1
+            self.memory.set(key, cached)
+        return cached
+
+    async def set(self, key: str, correction: str, feedback: str):
+        self.memory.set(key, (correction, feedback))
+        if self.persistent:
+            await self._store_persistent(key, correction, feedback)
+
+    async def _load_persistent(self, key: str) -> Optional[Tuple[str, str]]:
+        try:
+            pool = await async_db.get_pool()
+            async with pool.connection() as conn:
+                cursor = await conn.execute(
+                    """
+                    SELECT correction, feedback FROM correction_cache
+                    WHERE cache_key = %s AND created_at > CURRENT_TIMESTAMP - make_interval(secs => %s)
+                    """,
+                    (key, self.ttl_seconds)
+                )
+                row = await cursor.fetchone()
+            return (row[0], row[1]) if row else None
+        except Exception:
+            # The persistent tier is best-effort; fall through to the model
+            self.persistent_errors += 1
+            return None
+
+    async def _store_persistent(self, key: str, correction: str, feedback: str):
+        try:
+            pool = await async_db.get_pool()
+            async with pool.connection() as conn:
+                await conn.execute(
+                    """
+                    INSERT INTO correction_cache (cache_key, correction, feedback)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (cache_key) DO UPDATE
+                    SET correction = EXCLUDED.correction, feedback = EXCLUDED.feedback, created_at = CURRENT_TIMESTAMP
+                    """,
+                    (key, correction, feedback)
+                )
+        except Exception:
+            self.persistent_errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        memory_stats = self.memory.stats()
+        # A persistent hit is counted as a memory miss first
+        lookups = memory_stats["hits"] + memory_stats["misses"]
+        hits = memory_stats["hits"] + self.persistent_hits
+        return {
+            "memory": memory_stats,
+            "persistent_enabled": self.persistent,
+            "persistent_hits": self.persistent_hits,
+            "persistent_errors": self.persistent_errors,
+            "hits": hits,
+            "misses": lookups - hits,
+            "hit_ratio": (hits / lookups) if lookups else 0.0,
+        }
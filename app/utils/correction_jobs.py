@@ -0,0 +1,227 @@
+"""
+Whole-document correction jobs
+Chunks a stored document, corrects the chunks concurrently through AIServices
+and streams each result to the user over the /ws/{user_id} channel as it finishes;
+correction of the first chunks starts while the rest of the document is still being chunked
+"""
+
+import asyncio
+import hashlib
+import time
+import uuid
+from decouple import config
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, List, Optional, Tuple
+from app.utils.ai_services import AIServices, ai_services
+from app.utils.chunking_pool import chunking_executor
+from app.utils.text_processor import TextChunk
+from app.utils.websocket_manager import websocket_manager
+
+CORRECTION_JOB_CONCURRENCY = config("CORRECTION_JOB_CONCURRENCY", default=4, cast=int)
+CORRECTION_JOB_RETENTION = config("CORRECTION_JOB_RETENTION", default=3600, cast=float)
+
+SendMessage = Callable[[Dict[str, Any], str], Awaitable[None]]
+Chunker = Callable[[str, int], AsyncIterable[List[TextChunk]]]  # yields batches of finished chunks in order
+
+
+def default_chunker(text: str, target_words: int) -> AsyncIterable[List[TextChunk]]:
+    return chunking_executor.stream_document(text, target_words)
+
+
+class CorrectionJob:
+    """State of one correct-all run; finished chunk results survive cancellation and reconnects"""
+
+    def __init__(self, user_id: str, document_id: int, content_hash: str):
+        self.job_id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.document_id = document_id
+        self.content_hash = content_hash
+        self.chunks: List[TextChunk] = []  # filled while the document is chunked
+        self.chunking_done = False
+        self.results: Dict[int, Dict[str, Any]] = {}  # chunk index -> successful result
+        self.errors: Dict[int, str] = {}  # chunk index -> last error (retried on resume)
+        self.status = "pending"
+        self.task: Optional[asyncio.Task] = None
+        self.updated_at = time.monotonic()
+
+    @property
+    def is_running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "document_id": self.document_id,
+            "status": self.status,
+            "total_chunks": len(self.chunks),
+            "chunking_done": self.chunking_done,
+            "completed_chunks": len(self.results),
+            "failed_chunks": len(self.errors),
+        }
+
+
+class CorrectionJobManager:
+    """Runs at most one job per (user, document) and keeps finished results for resuming"""
+
+    def __init__(self, ai: AIServices, send_message: SendMessage, chunker: Chunker = default_chunker,
+                 concurrency: int = CORRECTION_JOB_CONCURRENCY, retention_seconds: float = CORRECTION_JOB_RETENTION):
+        self.ai = ai
+        self.send_message = send_message
+        self.chunker = chunker
+        self.concurrency = concurrency
+        self.retention_seconds = retention_seconds
+        self.jobs: Dict[Tuple[str, int], CorrectionJob] = {}
+
+    def _prune(self):
+        """Forget finished jobs nobody has touched within the retention period"""
+        cutoff = time.monotonic() - self.retention_seconds
+        for key, job in list(self.jobs.items()):
+            if not job.is_running and job.updated_at < cutoff:
+                del self.jobs[key]
+
+    def get_job(self, user_id: str, document_id: int) -> Optional[CorrectionJob]:
+        return self.jobs.get((str(user_id), document_id))
+
+    async def start(self, user_id: str, document_id: int, text: str, target_words: int = 200) -> CorrectionJob:
+        """
+        Start (or resume) correcting every chunk of text
+        The same content resumes the previous job and only runs unfinished chunks
+        """
+        user_id = str(user_id)
+        self._prune()
+        content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        key = (user_id, document_id)
+        job = self.jobs.get(key)
+
+        if job is not None and job.content_hash == content_hash:
+            if job.is_running:
+                return job
+        else:
+            if job is not None:
+                await self.cancel(user_id, document_id)
+            current = self.jobs.get(key)
+            if current is not None and current.content_hash == content_hash and current.is_running:
+                # A concurrent request started the same job while the old one was being cancelled
+                return current
+            job = CorrectionJob(user_id, document_id, content_hash)
+            self.jobs[key] = job
+
+        job.errors.clear()
+        job.status = "running"
+        job.updated_at = time.monotonic()
+        job.task = asyncio.ensure_future(self._run(job, text, target_words))
+        return job
+
+    async def cancel(self, user_id: str, document_id: int) -> Optional[CorrectionJob]:
+        job = self.get_job(user_id, document_id)
+        if job is None:
+            return None
+        if job.is_running:
+            job.task.cancel()
+            try:
+                await job.task
+            except asyncio.CancelledError:
+                pass
+            if job.status == "running":
+                # Cancelled before the task got to run
+                job.status = "cancelled"
+                job.updated_at = time.monotonic()
+                await self.send_message({"type": "correction_job_cancelled", **job.summary()}, job.user_id)
+        return job
+
+    async def replay(self, user_id: str):
+        """Re-send job state and finished results, e.g. after a WebSocket reconnect"""
+        for (job_user, _), job in list(self.jobs.items()):
+            if job_user != str(user_id):
+                continue
+            await self.send_message({"type": "correction_job_status", **job.summary()}, job.user_id)
+            for index in sorted(job.results):
+                await self.send_message(self._result_message(job, job.results[index]), job.user_id)
+
+    def _result_message(self, job: CorrectionJob, result: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "type": "correction_chunk_result",
+            "job_id": job.job_id,
+            "document_id": job.document_id,
+            **result
+        }
+
+    async def _run(self, job: CorrectionJob, text: str, target_words: int):
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def correct_chunk(chunk: TextChunk):
+            try:
+                async with semaphore:
+                    corrected_text, feedback_text, error = await self.ai.get_correction_and_feedback(chunk.text)
+            except Exception as e:
+                corrected_text, feedback_text, error = None, None, f"Error getting correction and feedback: {str(e)}"
+            job.updated_at = time.monotonic()
+
+            if error:
+                job.errors[chunk.index] = error
+                await self.send_message({
+                    "type": "correction_chunk_error",
+                    "job_id": job.job_id,
+                    "document_id": job.document_id,
+                    "chunk_index": chunk.index,
+                    "error": error
+                }, job.user_id)
+                return
+
+            result = {
+                "chunk_index": chunk.index,
+                "original_text": chunk.text,
+                "corrected_text": corrected_text,
+                "feedback": feedback_text
+            }
+            job.results[chunk.index] = result
+            await self.send_message(self._result_message(job, result), job.user_id)
+
+        corrections: List[asyncio.Future] = []
+
+        def correct(chunks: List[TextChunk]):
+            corrections.extend(
+                asyncio.ensure_future(correct_chunk(chunk)) for chunk in chunks if chunk.index not in job.results
+            )
+
+        await self.send_message({"type": "correction_job_started", **job.summary()}, job.user_id)
+
+        async def stop():
+            for correction in corrections:
+                correction.cancel()
+            await asyncio.gather(*corrections, return_exceptions=True)
+
+        try:
+            if job.chunking_done:
+                correct(job.chunks)
+            else:
+                # Same text gives the same chunks, so results kept from an interrupted run still line up
+                job.chunks = []
+                try:
+                    async for batch in self.chunker(text, target_words):
+                        job.chunks.extend(batch)
+                        correct(batch)
+                except Exception:
+                    await stop()
+                    job.status = "failed"
+                    job.updated_at = time.monotonic()
+                    await self.send_message({
+                        "type": "correction_job_failed",
+                        **job.summary(),
+                        "error": "Error processing document chunks"
+                    }, job.user_id)
+                    return
+                job.chunking_done = True
+            await asyncio.gather(*corrections)
+        except asyncio.CancelledError:
+            await stop()
+            job.status = "cancelled"
+            job.updated_at = time.monotonic()
+            await self.send_message({"type": "correction_job_cancelled", **job.summary()}, job.user_id)
+            raise
+        job.status = "completed" if not job.errors else "completed_with_errors"
+        job.updated_at = time.monotonic()
+        await self.send_message({"type": "correction_job_finished", **job.summary()}, job.user_id)
+
+
+# Global correction job manager instance
+correction_job_manager = CorrectionJobManager(ai_services, websocket_manager.send_personal_message)
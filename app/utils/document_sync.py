@@ -0,0 +1,102 @@
+"""
+Delta-based document sync for the WebSocket channel
+Clients send Quill-style operations ({"retain": n}, {"insert": "..."}, {"delete": n})
+against the revision they last sent; the server applies them to an in-memory buffer
+Lengths and offsets are UTF-16 code units, as measured by JavaScript strings
+"""
+
+from typing import Any, Dict, List, Optional
+
+
+
+class DeltaError(ValueError):
+    """Raised when operations don't fit the buffer; the client has to resync"""
+
+
+def utf16_length(text: str) -> int:
+    """Length of text as a JavaScript string (characters outside the BMP count twice)"""
+    if text.isascii():
+        return len(text)
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _advance(text: str, index: int, units: int, astral: bool) -> int:
+    """Index reached after moving `units` UTF-16 code units forward from `index`"""
+    if not astral:
+        end = index + units
+        if end > len(text):
+            raise DeltaError("Operation runs past the end of the document")
+        return end
+
+    while units > 0:
+        if index >= len(text):
+            raise DeltaError("Operation runs past the end of the document")
+        units -= 2 if ord(text[index]) > 0xFFFF else 1
+        index += 1
+    if units < 0:
+        raise DeltaError("Operation splits a surrogate pair")
+    return index
+
+
+def apply_ops(text: str, ops: List[Dict[str, Any]]) -> str:
+    """Apply retain/insert/delete operations; anything after the last operation is retained"""
+    if not isinstance(ops, list):
+        raise DeltaError("ops must be a list")
+
+    # Offsets only need translating when the text has characters outside the BMP
+    astral = utf16_length(text) != len(text)
+    pieces = []
+    index = 0
+    for op in ops:
+        if not isinstance(op, dict) or len(op) != 1:
+            raise DeltaError(f"Invalid operation: {op!r}")
+        kind, value = next(iter(op.items()))
+        if kind == "insert" and isinstance(value, str):
+            pieces.append(value)
+        elif kind in ("retain", "delete") and isinstance(value, int) and not isinstance(value, bool) and value >= 0:
+            end = _advance(text, index, value, astral)
+            if kind == "retain":
+                pieces.append(text[index:end])
+            index = end
+        else:
+            raise DeltaError(f"Invalid operation: {op!r}")
+
+    pieces.append(text[index:])
+    return ''.join(pieces)
+
+
+class DocumentBuffer:
+    """Server copy of one client-side string (editor text or HTML content) and its revision"""
+
+    def __init__(self, document_id: Any, text: str = "", revision: int = 0):
+        self.document_id = document_id
+        self.text = text
+        self.revision = revision
+
+    def reset(self, document_id: Any, text: str, revision: int):
+        """Full sync: take the client's value as-is"""
+        self.document_id = document_id
+        self.text = text
+        self.revision = revision
+
+    def apply(self, base_revision: Any, revision: Any, ops: List[Dict[str, Any]], length: Optional[int] = None,
+              max_length: Optional[int] = None) -> str:
+        """
+        Apply a delta made against base_revision and move to revision
+        Raises DeltaError on a revision gap, a length mismatch or a result longer than
+        max_length characters; the buffer is left untouched
+        """
+        if base_revision != self.revision:
+            raise DeltaError(f"Delta is based on revision {base_revision}, buffer is at {self.revision}")
+        if not isinstance(revision, int) or isinstance(revision, bool) or revision <= self.revision:
+            raise DeltaError("revision must be an integer greater than base_revision")
+
+        text = apply_ops(self.text, ops)
+        if max_length is not None and len(text) > max_length:
+            raise DeltaError("Document exceeds the size limit")
+        if length is not None and utf16_length(text) != length:
+            raise DeltaError("Document length after the delta doesn't match the client")
+
+        self.text = text
+        self.revision = revision
+        return text
@@ -0,0 +1,57 @@
+"""
+Startup readiness tracking
+Startup steps (schema setup, model warm-up, ...) record their outcome here so a slow
+or failed dependency is visible instead of hidden behind a generic startup error
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class ReadinessTracker:
+    """Status of each startup step: pending, ready or failed (with the error and how long it took)"""
+
+    def __init__(self):
+        self.components: Dict[str, Dict[str, Any]] = {}
+
+    def register(self, name: str, required: bool = True):
+        """Declare a step up front so it reports "pending" until it has run"""
+        self.components.setdefault(name, {"status": "pending", "required": required})
+
+    async def run(self, name: str, step: Callable[[], Awaitable[Any]], required: bool = True) -> bool:
+        """Run one startup step and record the outcome; failures are logged, not raised"""
+        self.register(name, required)
+        component = self.components[name]
+        component.update(status="pending", error=None)
+        started = time.perf_counter()
+        try:
+            await step()
+        except asyncio.CancelledError:
+            component["status"] = "cancelled"
+            raise
+        except Exception as e:
+            component.update(status="failed", error=f"{type(e).__name__}: {e}")
+            logger.error(f"Startup step '{name}' failed: {type(e).__name__}: {e}")
+        else:
+            component["status"] = "ready"
+        component["duration_ms"] = (time.perf_counter() - started) * 1000
+        return component["status"] == "ready"
+
+    @property
+    def ready(self) -> bool:
+        """True once every required step has succeeded"""
+        return all(c["status"] == "ready" for c in self.components.values() if c["required"])
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "components": {name: dict(component) for name, component in self.components.items()},
+        }
+
+
+# Global readiness tracker instance
+readiness = ReadinessTracker()
@@ -3,19 +3,539 @@ Simple Intelligent Text Chunker using spaCy
 Splits text at sentence boundaries - no grammar analysis
 """
 
-import spacy
+import hashlib
 import re
-from typing import List
-from dataclasses import dataclass
+import sys
+import threading
+from collections import OrderedDict
+from importlib.metadata import version as package_version
+from decouple import config
+from bisect import bisect_left, bisect_right
+from html.parser import HTMLParser
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from dataclasses import dataclass, field
+
+SPACY_MODEL = config("SPACY_MODEL", default="en_core_web_sm")
+SPACY_SEGMENTER = config("SPACY_SEGMENTER", default="parser")  # "parser", "senter" or "sentencizer"
+
+CHUNK_CACHE_SIZE = config("CHUNK_CACHE_SIZE", default=128, cast=int)  # documents
+CHUNK_CACHE_MAX_MB = config("CHUNK_CACHE_MAX_MB", default=64, cast=float)
+CHUNK_STREAM_WINDOW = config("CHUNK_STREAM_WINDOW", default=20000, cast=int)  # characters parsed per streaming step
+CHUNKING_BATCH_SIZE = config("CHUNKING_BATCH_SIZE", default=64, cast=int)  # texts per nlp.pipe batch
+
+SEGMENTERS = ("parser", "senter", "sentencizer")
+
+# Pipeline components sentence detection never needs
+_UNUSED_COMPONENTS = ["tagger", "morphologizer", "attribute_ruler", "lemmatizer", "ner"]
+
+def clean_spacing(text: str) -> str:
+    """Collapse whitespace runs and drop spaces before punctuation (see IntelligentTextProcessor.clean_spacing)"""
+    if not text or not text.strip():
+        return ""
+    text = re.sub(r'\s+', ' ', text.strip())
+    return re.sub(r'\s+([,.!?;:])', r'\1', text)
 
-@dataclass
 class TextChunk:
-    """Simple data container for a text chunk"""
-    index: int
+    """
+    One chunk of a document: a span of the source text plus its word count
+    The source string is shared by every chunk of the document and the text is only
+    built (spacing cleaned) when it is read, so chunks don't copy the document
+    start_position / end_position are offsets into the source text
+    """
+    __slots__ = ("index", "source", "start_position", "end_position", "word_count")
+    
+    def __init__(self, index: int, source: str, start_position: int, end_position: int, word_count: int):
+        self.index = index
+        self.source = source
+        self.start_position = start_position
+        self.end_position = end_position
+        self.word_count = word_count
+    
+    @property
+    def text(self) -> str:
+        return clean_spacing(self.source[self.start_position:self.end_position])
+    
+    def moved(self, source: str, index_shift: int = 0, position_shift: int = 0) -> "TextChunk":
+        """The same chunk inside an edited source text"""
+        return TextChunk(self.index + index_shift, source, self.start_position + position_shift,
+                         self.end_position + position_shift, self.word_count)
+    
+    def to_wire(self) -> Dict[str, Any]:
+        """Chunk as sent in chunks_updated / chunks_patch messages"""
+        return {
+            "index": self.index,
+            "text": self.text,
+            "wordCount": self.word_count,
+            "start": self.start_position,
+            "end": self.end_position
+        }
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TextChunk):
+            return NotImplemented
+        return (self.index == other.index and self.word_count == other.word_count
+                and self.start_position == other.start_position and self.end_position == other.end_position
+                and (self.source is other.source or self.text == other.text))
+    
+    __hash__ = None
+    
+    def __repr__(self) -> str:
+        return (f"TextChunk(index={self.index}, start_position={self.start_position}, "
+                f"end_position={self.end_position}, word_count={self.word_count}, text={self.text!r})")
+
+class Sentence(NamedTuple):
+    """One detected sentence: span in the raw text plus its cleaned text"""
+    start: int
+    end: int
     text: str
     word_count: int
-    start_position: int
-    end_position: int
+
+@dataclass
+class ChunkingState:
+    """Last chunking result for a document, kept so the next edit can be re-chunked incrementally"""
+    text: str
+    target_words: int
+    sentences: List[Sentence] = field(default_factory=list)
+    chunk_starts: List[int] = field(default_factory=list)  # index of the first sentence of each chunk
+    chunks: List[TextChunk] = field(default_factory=list)
+
+@dataclass
+class ChunkPatch:
+    """
+    How to turn the previous chunk list into the new one:
+    new = old[:start] + chunks + old[start + removed:] with the kept tail's index and
+    positions moved by index_shift / position_shift
+    """
+    start: int
+    removed: int
+    chunks: List[TextChunk]
+    index_shift: int
+    position_shift: int
+
+_PUNCTUATION_RUN_START = set(",.!?;:")
+
+def _clean_with_offsets(text: str) -> Tuple[str, List[int], List[int]]:
+    """
+    Same result as IntelligentTextProcessor.clean_spacing, plus a map back to raw offsets
+    Returns (cleaned, run_cleaned_starts, run_raw_starts) for each non-whitespace run;
+    characters inside a run are copied verbatim, so offsets within a run map linearly
+    """
+    pieces = []
+    cleaned_starts = []
+    raw_starts = []
+    position = 0
+    for match in re.finditer(r'\S+', text):
+        run = match.group()
+        if pieces and run[0] not in _PUNCTUATION_RUN_START:
+            pieces.append(' ')
+            position += 1
+        cleaned_starts.append(position)
+        raw_starts.append(match.start())
+        pieces.append(run)
+        position += len(run)
+    return ''.join(pieces), cleaned_starts, raw_starts
+
+def _common_affix_lengths(old: str, new: str, block: int = 4096) -> Tuple[int, int]:
+    """Length of the common prefix and (non-overlapping) common suffix of two strings"""
+    limit = min(len(old), len(new))
+    prefix = 0
+    # Compare in blocks (C-level string comparison), then finish character by character
+    while prefix + block <= limit and old[prefix:prefix + block] == new[prefix:prefix + block]:
+        prefix += block
+    while prefix < limit and old[prefix] == new[prefix]:
+        prefix += 1
+
+    limit -= prefix
+    suffix = 0
+    while suffix + block <= limit and old[len(old) - suffix - block:len(old) - suffix] == new[len(new) - suffix - block:len(new) - suffix]:
+        suffix += block
+    while suffix < limit and old[len(old) - suffix - 1] == new[len(new) - suffix - 1]:
+        suffix += 1
+    return prefix, suffix
+
+class _HTMLTextExtractor(HTMLParser):
+    """Collect text content, turning block-level tags into line breaks"""
+    BLOCK_TAGS = {"p", "div", "br", "li", "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre"}
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+    
+    def handle_starttag(self, tag, attrs):
+        if tag == "br":
+            self.parts.append("\n")
+    
+    def handle_endtag(self, tag):
+        if tag in self.BLOCK_TAGS and tag != "br":
+            self.parts.append("\n")
+    
+    def handle_data(self, data):
+        self.parts.append(data)
+
+def html_to_text(content: str) -> str:
+    """
+    Plain text of a stored document
+    Editor saves are Quill HTML, uploads are plain text - plain text is returned unchanged
+    """
+    if not content or not re.search(r'<(p|div|br|span|strong|em|ol|ul|li|h[1-6])\b', content, re.IGNORECASE):
+        return content
+    extractor = _HTMLTextExtractor()
+    extractor.feed(content)
+    extractor.close()
+    return ''.join(extractor.parts).strip()
+
+def group_sentences(text: str, sentences: List[Sentence], target_words: int, first: int = 0,
+                    chunk_index: int = 0,
+                    resume: Optional[Callable[[int, int], bool]] = None) -> Tuple[List[int], List[TextChunk], Optional[int]]:
+    """
+    Greedily pack sentences[first:] of text into chunks of about target_words
+    resume(sentence_index, chunk_index) is asked whenever a new chunk would start;
+    if it returns True grouping stops there and the caller reuses its previous chunks from that sentence on.
+    Returns (chunk_starts, chunks, sentence index grouping stopped at or None)
+    """
+    chunk_starts = []
+    chunks = []
+    chunk_first = first
+    current_word_count = 0
+
+    def emit(last: int):
+        chunk_starts.append(chunk_first)
+        chunks.append(TextChunk(
+            index=chunk_index + len(chunks),
+            source=text,
+            start_position=sentences[chunk_first].start,
+            end_position=sentences[last].end,
+            word_count=current_word_count
+        ))
+
+    for sentence_index in range(first, len(sentences)):
+        sentence = sentences[sentence_index]
+
+        # Check if adding this sentence would exceed target
+        if current_word_count + sentence.word_count > target_words and sentence_index > chunk_first:
+            # Create chunk from current sentences
+            emit(sentence_index - 1)
+            if resume is not None and resume(sentence_index, chunk_index + len(chunks)):
+                return chunk_starts, chunks, sentence_index
+
+            # Start new chunk
+            chunk_first = sentence_index
+            current_word_count = sentence.word_count
+        else:
+            # Add sentence to current chunk
+            current_word_count += sentence.word_count
+
+    # Handle remaining sentences
+    if chunk_first < len(sentences):
+        emit(len(sentences) - 1)
+
+    return chunk_starts, chunks, None
+
+class SentenceGrouper:
+    """
+    Incremental form of group_sentences: sentences are added one at a time and each chunk
+    is returned as soon as the next sentence no longer fits in it
+    """
+    
+    def __init__(self, text: str, target_words: int):
+        self.text = text
+        self.target_words = target_words
+        self.sentences: List[Sentence] = []
+        self.chunk_starts: List[int] = []
+        self.chunks: List[TextChunk] = []
+        self._word_count = 0
+    
+    @property
+    def _chunk_open(self) -> bool:
+        """True while sentences have been added since the last chunk was closed"""
+        return len(self.chunk_starts) > len(self.chunks)
+    
+    def _emit(self) -> TextChunk:
+        chunk = TextChunk(len(self.chunks), self.text, self.sentences[self.chunk_starts[-1]].start,
+                          self.sentences[-1].end, self._word_count)
+        self.chunks.append(chunk)
+        self._word_count = 0
+        return chunk
+    
+    def add(self, sentence: Sentence) -> Optional[TextChunk]:
+        """Add the next sentence; returns the chunk it closed, if any"""
+        closed = None
+        if self._chunk_open and self._word_count + sentence.word_count > self.target_words:
+            closed = self._emit()
+        if not self._chunk_open:
+            self.chunk_starts.append(len(self.sentences))
+        self.sentences.append(sentence)
+        self._word_count += sentence.word_count
+        return closed
+    
+    def finish(self) -> Optional[TextChunk]:
+        """Close the last chunk once there are no more sentences"""
+        return self._emit() if self._chunk_open else None
+    
+    def state(self) -> ChunkingState:
+        return ChunkingState(text=self.text, target_words=self.target_words, sentences=self.sentences,
+                             chunk_starts=self.chunk_starts, chunks=self.chunks)
+
+class WindowedParse:
+    """
+    Plans the spaCy calls for streaming a document: text is parsed in windows of about
+    `window` characters, and the last sentence of a window is reparsed at the start of
+    the next one, since the cut may have split it
+    """
+    
+    def __init__(self, text: str, window: int = CHUNK_STREAM_WINDOW):
+        self.text = text
+        self.window = window
+        self.position = 0
+        self._size = window
+    
+    def next_window(self) -> Optional[Tuple[int, int]]:
+        """(start, end) of the next text slice to parse, or None when the text is done"""
+        if self.position >= len(self.text):
+            return None
+        end = self.position + self._size
+        if end >= len(self.text):
+            return self.position, len(self.text)
+        # Cut at whitespace so no word is split
+        match = re.compile(r'\s').search(self.text, end)
+        return self.position, match.start() if match else len(self.text)
+    
+    def accept(self, end: int, sentences: List[Sentence]) -> List[Sentence]:
+        """Sentences of the window just parsed that are final"""
+        if end >= len(self.text):
+            self.position = len(self.text)
+            return sentences
+        if len(sentences) < 2:
+            # Nothing is known to be complete yet: parse a larger window
+            self._size *= 2
+            return []
+        self._size = self.window
+        self.position = sentences[-1].start
+        return sentences[:-1]
+
+def build_chunking_state(text: str, target_words: int, sentences: List[Sentence]) -> ChunkingState:
+    """Group freshly parsed sentences into chunks"""
+    chunk_starts, chunks, _ = group_sentences(text, sentences, target_words)
+    return ChunkingState(text=text, target_words=target_words, sentences=sentences,
+                         chunk_starts=chunk_starts, chunks=chunks)
+
+@dataclass
+class RechunkPlan:
+    """Which previous sentences an edit replaces and the raw window of the new text to reparse"""
+    first: int
+    last: int
+    window_start: int
+    window_end: int
+    unchanged: bool = False
+
+def plan_rechunk(previous: ChunkingState, text: str) -> Optional[RechunkPlan]:
+    """
+    Locate the edit between previous.text and text
+    The sentences touching the edit plus one sentence either side get reparsed;
+    None means there is nothing to build on and the whole text needs chunking
+    """
+    old_text = previous.text
+    old_sentences = previous.sentences
+    if not old_sentences or not text.strip():
+        return None
+    
+    prefix, suffix = _common_affix_lengths(old_text, text)
+    if prefix == len(old_text) == len(text):
+        return RechunkPlan(len(old_sentences), len(old_sentences) - 1, len(text), len(text), unchanged=True)
+    
+    delta = len(text) - len(old_text)
+    changed_end = len(old_text) - suffix
+    
+    first = max(bisect_left(old_sentences, prefix, key=lambda sentence: sentence.end) - 1, 0)
+    last = min(bisect_right(old_sentences, changed_end, key=lambda sentence: sentence.start), len(old_sentences) - 1)
+    window_start = 0 if first == 0 else min(old_sentences[first].start, prefix)
+    window_end = len(old_text) if last == len(old_sentences) - 1 else max(old_sentences[last].end, changed_end)
+    return RechunkPlan(first, last, window_start, window_end + delta)
+
+def apply_rechunk(previous: ChunkingState, text: str, plan: RechunkPlan,
+                  reparsed: List[Sentence]) -> Tuple[ChunkingState, ChunkPatch]:
+    """
+    Splice the reparsed sentences in and regroup chunks
+    Later sentences are shifted by the length change; chunks are regrouped from the
+    chunk holding the first reparsed sentence until the grouping lines up with an old
+    chunk boundary again, and only the chunks in between are returned in the patch
+    """
+    if plan.unchanged:
+        # Keep the previous text object: the chunks already point into it
+        state = ChunkingState(previous.text, previous.target_words, previous.sentences, previous.chunk_starts, previous.chunks)
+        return state, ChunkPatch(len(previous.chunks), 0, [], 0, 0)
+    
+    old_sentences = previous.sentences
+    first, last = plan.first, plan.last
+    delta = len(text) - len(previous.text)
+    tail = [
+        Sentence(sentence.start + delta, sentence.end + delta, sentence.text, sentence.word_count)
+        for sentence in old_sentences[last + 1:]
+    ]
+    sentences = old_sentences[:first] + reparsed + tail
+    
+    # Regroup from the chunk holding the first reparsed sentence
+    old_chunk_starts = previous.chunk_starts
+    old_chunks = previous.chunks
+    regroup_chunk = max(bisect_right(old_chunk_starts, first) - 1, 0)
+    tail_first = first + len(reparsed)  # first shifted (unchanged) sentence
+    sentence_shift = tail_first - (last + 1)
+    old_chunk_by_start = {start: index for index, start in enumerate(old_chunk_starts)}
+    resumed: Dict[str, int] = {}
+
+    def resume(sentence_index: int, chunk_index: int) -> bool:
+        if sentence_index < tail_first:
+            return False
+        old_chunk = old_chunk_by_start.get(sentence_index - sentence_shift)
+        if old_chunk is None:
+            return False
+        resumed.update(old_chunk=old_chunk, index_shift=chunk_index - old_chunk)
+        return True
+
+    regroup_from = old_chunk_starts[regroup_chunk] if old_chunk_starts else 0
+    new_starts, new_chunks, stopped_at = group_sentences(
+        text, sentences, previous.target_words, regroup_from, regroup_chunk, resume
+    )
+
+    if stopped_at is None:
+        kept_from = len(old_chunks)
+        index_shift = position_shift = 0
+        kept_chunks: List[TextChunk] = []
+        kept_starts: List[int] = []
+    else:
+        kept_from = resumed["old_chunk"]
+        index_shift = resumed["index_shift"]
+        # Everything after the edit moved by the length change
+        position_shift = delta
+        kept_chunks = [chunk.moved(text, index_shift, position_shift) for chunk in old_chunks[kept_from:]]
+        kept_starts = [start + sentence_shift for start in old_chunk_starts[kept_from:]]
+
+    # Chunks before the edit keep their offsets but point into the new text, so the old one can be freed
+    head_chunks = [chunk.moved(text) for chunk in old_chunks[:regroup_chunk]]
+    state = ChunkingState(
+        text=text,
+        target_words=previous.target_words,
+        sentences=sentences,
+        chunk_starts=old_chunk_starts[:regroup_chunk] + new_starts + kept_starts,
+        chunks=head_chunks + new_chunks + kept_chunks
+    )
+
+    # Don't resend regrouped chunks that came out identical
+    patch_start = regroup_chunk
+    while (new_chunks and patch_start < kept_from and new_chunks[0] == old_chunks[patch_start]):
+        new_chunks.pop(0)
+        patch_start += 1
+    return state, ChunkPatch(patch_start, kept_from - patch_start, new_chunks, index_shift, position_shift)
+
+def load_segmentation_pipeline(segmenter: str = SPACY_SEGMENTER, model: str = SPACY_MODEL):
+    """
+    Load the smallest spaCy pipeline that produces doc.sents for the given backend
+    - "parser": boundaries from the dependency parser (the original behaviour)
+    - "senter": the model's statistical sentence recognizer only
+    - "sentencizer": rule-based punctuation splitting, no trained model needed
+    """
+    if segmenter not in SEGMENTERS:
+        raise ValueError(f"Unknown sentence segmenter: {segmenter} (expected one of {', '.join(SEGMENTERS)})")
+    
+    # Imported here rather than at module level: importing spaCy alone takes about half a second
+    import spacy
+    
+    if segmenter == "sentencizer":
+        nlp = spacy.blank("en")
+        nlp.add_pipe("sentencizer")
+        return nlp
+    
+    exclude = _UNUSED_COMPONENTS + (["senter"] if segmenter == "parser" else ["parser"])
+    try:
+        nlp = spacy.load(model, exclude=exclude)
+    except OSError:
+        raise Exception(f"spaCy model '{model}' not found. Run: python -m spacy download {model}")
+    
+    if segmenter == "senter":
+        if "senter" not in nlp.component_names:
+            raise Exception(f"spaCy model '{model}' has no senter component; use SPACY_SEGMENTER=parser or sentencizer")
+        if "senter" in nlp.disabled:
+            nlp.enable_pipe("senter")
+    
+    # Shared tok2vec only costs time if nothing that is still enabled listens to it
+    if "tok2vec" in nlp.pipe_names:
+        listeners = set(nlp.get_pipe("tok2vec").listening_components)
+        if not listeners & set(nlp.pipe_names):
+            nlp.disable_pipe("tok2vec")
+    return nlp
+
+def segmenter_version(segmenter: str = SPACY_SEGMENTER, model: str = SPACY_MODEL) -> str:
+    """Identifies what produced a chunking result; cached results from another backend are never reused"""
+    return f"{segmenter}:{model}:spacy-{package_version('spacy')}"
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+def estimate_state_size(state: ChunkingState) -> int:
+    """Approximate bytes held by a chunking result (document text, sentences and chunks)"""
+    size = sys.getsizeof(state.text) + sys.getsizeof(state.sentences) + sys.getsizeof(state.chunks)
+    size += sum(sys.getsizeof(sentence) + sys.getsizeof(sentence.text) for sentence in state.sentences)
+    # Chunks only hold offsets into state.text
+    size += sum(sys.getsizeof(chunk) for chunk in state.chunks)
+    return size + sys.getsizeof(state.chunk_starts)
+
+class ChunkCache:
+    """
+    LRU cache of chunking results keyed by (content hash, target_words, segmenter version)
+    Bounded by entry count and by estimated memory; cached states are shared, never mutated
+    """
+    
+    def __init__(self, max_entries: int = CHUNK_CACHE_SIZE, max_bytes: int = int(CHUNK_CACHE_MAX_MB * 1024 * 1024)):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, int, str], Tuple[ChunkingState, int]]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: Tuple[str, int, str]) -> Optional[ChunkingState]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+    
+    def put(self, key: Tuple[str, int, str], state: ChunkingState):
+        size = estimate_state_size(state)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.bytes -= previous[1]
+        self._entries[key] = (state, size)
+        self.bytes += size
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+    
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "memory_bytes": self.bytes,
+            "max_memory_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
 
 class IntelligentTextProcessor:
     """
@@ -23,88 +543,146 @@ class IntelligentTextProcessor:
     Uses spaCy only for sentence detection - no grammar analysis
     """
     
-    def __init__(self):
-        """Initialize the spaCy model"""
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            raise Exception("spaCy model 'en_core_web_sm' not found. Run: python -m spacy download en_core_web_sm")
+    def __init__(self, nlp=None, segmenter: str = SPACY_SEGMENTER, model: str = SPACY_MODEL):
+        """Load a sentence segmentation pipeline (an already loaded pipeline can be passed in)"""
+        self.segmenter = segmenter
+        if nlp is not None:
+            self.nlp = nlp
+            return
+        self.nlp = load_segmentation_pipeline(segmenter, model)
     
     def clean_spacing(self, text: str) -> str:
         """
         Fix spacing issues so spaCy can properly detect sentences
         Only fixes spacing - no grammar correction
         """
+        return clean_spacing(text)
+    
+    def sentence_spans(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Return (start, end) character offsets of each sentence in the raw text
+        Surrounding whitespace is excluded, so the gaps between spans hold the original spacing
+        """
         if not text or not text.strip():
-            return ""
-        
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text.strip())
-        
-        # Fix spacing around punctuation
-        text = re.sub(r'\s+([,.!?;:])', r'\1', text)
+            return []
         
-        return text
+        doc = self.nlp(text)
+        spans = []
+        for sentence in doc.sents:
+            sentence_text = sentence.text
+            stripped = sentence_text.strip()
+            if not stripped:
+                continue
+            start = sentence.start_char + (len(sentence_text) - len(sentence_text.lstrip()))
+            spans.append((start, start + len(stripped)))
+        return spans
+    
+    def parse_sentences(self, text: str, start: int = 0, end: Optional[int] = None) -> List[Sentence]:
+        """
+        Detect sentences in text[start:end] after clean_spacing
+        Offsets are mapped back to the raw text; sentence text and word counts come from the cleaned text
+        """
+        end = len(text) if end is None else end
+        cleaned, cleaned_starts, raw_starts = _clean_with_offsets(text[start:end])
+        if not cleaned:
+            return []
+        return self._sentences_from_doc(self.nlp(cleaned), cleaned_starts, raw_starts, start)
+    
+    def _sentences_from_doc(self, doc, cleaned_starts: List[int], raw_starts: List[int], start: int = 0) -> List[Sentence]:
+        """Sentences of a Doc parsed from cleaned text, with offsets mapped back to the raw text"""
+        def to_raw(position: int) -> int:
+            run = bisect_right(cleaned_starts, position) - 1
+            return start + raw_starts[run] + (position - cleaned_starts[run])
+
+        sentences = []
+        for sentence in doc.sents:
+            sentence_text = sentence.text.strip()
+            if not sentence_text:
+                continue
+            sentence_start = sentence.start_char + (len(sentence.text) - len(sentence.text.lstrip()))
+            sentences.append(Sentence(
+                start=to_raw(sentence_start),
+                end=to_raw(sentence_start + len(sentence_text) - 1) + 1,
+                text=sentence_text,
+                word_count=len([token for token in sentence if not token.is_space])
+            ))
+        return sentences
     
     def create_intelligent_chunks(self, text: str, target_words: int = 200) -> List[TextChunk]:
         """
         Split text into chunks that respect sentence boundaries
         Simple and clean - just smart chunking
         """
+        return self.chunk_document(text, target_words).chunks
+    
+    def pipe_chunks(self, texts: Iterable[str], target_words: int = 200, batch_size: int = CHUNKING_BATCH_SIZE,
+                    n_process: int = 1) -> Iterator[List[TextChunk]]:
+        """
+        Chunk many documents through nlp.pipe, yielding one chunk list per text in input order
+        Texts are consumed and Docs released as the generator advances, so a bulk job only
+        holds about batch_size parsed documents at a time; n_process > 1 parses in worker processes
+        """
+        def cleaned_texts():
+            for text in texts:
+                text = text or ""
+                cleaned, cleaned_starts, raw_starts = _clean_with_offsets(text)
+                yield cleaned, (text, cleaned_starts, raw_starts)
+
+        docs = self.nlp.pipe(cleaned_texts(), as_tuples=True, batch_size=batch_size, n_process=n_process)
+        for doc, (text, cleaned_starts, raw_starts) in docs:
+            if not cleaned_starts:
+                yield []
+                continue
+            sentences = self._sentences_from_doc(doc, cleaned_starts, raw_starts)
+            yield group_sentences(text, sentences, target_words)[1]
+    
+    def iter_chunks(self, text: str, target_words: int = 200, window: int = CHUNK_STREAM_WINDOW) -> Iterator[TextChunk]:
+        """
+        Streaming create_intelligent_chunks: the text is parsed window by window and each
+        chunk is yielded as soon as it is complete, before the rest of the text is parsed
+        """
         if not text or not text.strip():
-            return []
-        
-        # Fix spacing for proper sentence detection
-        cleaned_text = self.clean_spacing(text)
-        
-        # Use spaCy to detect sentences
-        doc = self.nlp(cleaned_text)
-        sentences = list(doc.sents)
-        
-        chunks = []
-        current_chunk_sentences = []
-        current_word_count = 0
-        chunk_index = 0
-        current_position = 0
-        
-        for sentence in sentences:
-            sentence_text = sentence.text.strip()
-            sentence_word_count = len([token for token in sentence if not token.is_space])
-            
-            # Check if adding this sentence would exceed target
-            if current_word_count + sentence_word_count > target_words and current_chunk_sentences:
-                # Create chunk from current sentences
-                chunk_text = ' '.join(current_chunk_sentences)
-                chunk_end_pos = current_position + len(chunk_text)
-                
-                chunks.append(TextChunk(
-                    index=chunk_index,
-                    text=chunk_text,
-                    word_count=current_word_count,
-                    start_position=current_position,
-                    end_position=chunk_end_pos
-                ))
-                
-                # Start new chunk
-                chunk_index += 1
-                current_chunk_sentences = [sentence_text]
-                current_word_count = sentence_word_count
-                current_position = chunk_end_pos
-            else:
-                # Add sentence to current chunk
-                current_chunk_sentences.append(sentence_text)
-                current_word_count += sentence_word_count
-        
-        # Handle remaining sentences
-        if current_chunk_sentences:
-            chunk_text = ' '.join(current_chunk_sentences)
-            chunks.append(TextChunk(
-                index=chunk_index,
-                text=chunk_text,
-                word_count=current_word_count,
-                start_position=current_position,
-                end_position=current_position + len(chunk_text)
-            ))
+            return
+        grouper = SentenceGrouper(text, target_words)
+        windows = WindowedParse(text, window)
+        span = windows.next_window()
+        while span is not None:
+            for sentence in windows.accept(span[1], self.parse_sentences(text, *span)):
+                chunk = grouper.add(sentence)
+                if chunk is not None:
+                    yield chunk
+            span = windows.next_window()
+        chunk = grouper.finish()
+        if chunk is not None:
+            yield chunk
+    
+    def chunk_document(self, text: str, target_words: int = 200) -> ChunkingState:
+        """Chunk the whole text and return the state needed for incremental updates"""
+        if not text or not text.strip():
+            return ChunkingState(text=text or "", target_words=target_words)
+        return build_chunking_state(text, target_words, self.parse_sentences(text))
+    
+    def rechunk(self, previous: ChunkingState, text: str) -> Tuple[ChunkingState, ChunkPatch]:
+        """Re-chunk after an edit, reparsing only the sentences around the changed region"""
+        plan = plan_rechunk(previous, text)
+        if plan is None:
+            state = self.chunk_document(text, previous.target_words)
+            return state, ChunkPatch(0, len(previous.chunks), state.chunks, 0, 0)
         
-        return chunks
+        reparsed = [] if plan.unchanged else self.parse_sentences(text, plan.window_start, plan.window_end)
+        return apply_rechunk(previous, text, plan, reparsed)
+
+
+# Shared processor instance (spaCy is loaded on first use)
+_text_processor: Optional[IntelligentTextProcessor] = None
+_text_processor_lock = threading.Lock()
 
+def get_text_processor() -> IntelligentTextProcessor:
+    """Return the process-wide IntelligentTextProcessor, creating it on first call"""
+    global _text_processor
+    if _text_processor is None:
+        # The startup warm-up loads it in a worker thread while requests may already need it
+        with _text_processor_lock:
+            if _text_processor is None:
+                _text_processor = IntelligentTextProcessor()
+    return _text_processor
@@ -0,0 +1,129 @@
+"""
+Sentence-level translation memory for the NLLB English <-> Kinyarwanda endpoint
+Sentences are looked up by (src_lang, tgt_lang, normalized text); only unknown
+sentences are sent to the model, and the translation is reassembled in order
+"""
+
+import hashlib
+from decouple import config
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from app.utils.cache import LRUCache
+from app.utils.correction_cache import normalize_text
+from app.utils.text_processor import get_text_processor
+from app.database.async_db import async_db
+
+TRANSLATION_MEMORY_MAX_ENTRIES = config("TRANSLATION_MEMORY_MAX_ENTRIES", default=10000, cast=int)
+# Off by default like CORRECTION_CACHE_PERSISTENT: the database tier stores sentences of student text
+TRANSLATION_MEMORY_PERSISTENT = config("TRANSLATION_MEMORY_PERSISTENT", default=False, cast=bool)
+
+SentenceSplitter = Callable[[str], List[Tuple[int, int]]]
+
+
+def default_sentence_splitter(text: str) -> List[Tuple[int, int]]:
+    """Sentence spans from the shared spaCy pipeline"""
+    return get_text_processor().sentence_spans(text)
+
+
+def source_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class TranslationMemory:
+    """In-memory front cache backed by the translation_memory table"""
+
+    def __init__(self, max_entries: int = TRANSLATION_MEMORY_MAX_ENTRIES,
+                 persistent: bool = TRANSLATION_MEMORY_PERSISTENT,
+                 splitter: Optional[SentenceSplitter] = None):
+        self.front = LRUCache(max_entries=max_entries)
+        self.persistent = persistent
+        self.splitter = splitter or default_sentence_splitter
+        self.persistent_hits = 0
+        self.persistent_errors = 0
+        self.sentences_translated = 0
+
+    def split(self, text: str) -> List[Tuple[int, int]]:
+        """Sentence spans, falling back to the whole text if segmentation is unavailable"""
+        try:
+            spans = self.splitter(text)
+        except Exception:
+            spans = []
+        if not spans and text.strip():
+            start = len(text) - len(text.lstrip())
+            spans = [(start, len(text.rstrip()))]
+        return spans
+
+    async def lookup(self, src_lang: str, tgt_lang: str, sentences: Iterable[str]) -> Dict[str, str]:
+        """Return {source_hash: translation} for every sentence already in memory"""
+        found = {}
+        missing = []
+        for sentence in sentences:
+            digest = source_hash(sentence)
+            if digest in found:
+                continue
+            cached = self.front.get((src_lang, tgt_lang, digest))
+            if cached is not None:
+                found[digest] = cached
+            else:
+                missing.append(digest)
+
+        if missing and self.persistent:
+            rows = await self._load_persistent(src_lang, tgt_lang, missing)
+            for digest, translation in rows:
+                found[digest] = translation
+                self.front.set((src_lang, tgt_lang, digest), translation)
+            self.persistent_hits += len(rows)
+        return found
+
+    async def store(self, src_lang: str, tgt_lang: str, pairs: List[Tuple[str, str]]):
+        """Remember (source sentence, translation) pairs"""
+        rows = []
+        for sentence, translation in pairs:
+            digest = source_hash(sentence)
+            self.front.set((src_lang, tgt_lang, digest), translation)
+            rows.append((src_lang, tgt_lang, digest, normalize_text(sentence), translation))
+        self.sentences_translated += len(pairs)
+        if rows and self.persistent:
+            await self._store_persistent(rows)
+
+    async def _load_persistent(self, src_lang: str, tgt_lang: str, digests: List[str]) -> List[Tuple[str, str]]:
+        try:
+            pool = await async_db.get_pool()
+            async with pool.connection() as conn:
+                cursor = await conn.execute(
+                    """
+                    SELECT source_hash, translation FROM translation_memory
+                    WHERE src_lang = %s AND tgt_lang = %s AND source_hash = ANY(%s)
+                    """,
+                    (src_lang, tgt_lang, digests)
+                )
+                return [(row[0], row[1]) for row in await cursor.fetchall()]
+        except Exception:
+            # Best-effort: a database problem only costs a model call
+            self.persistent_errors += 1
+            return []
+
+    async def _store_persistent(self, rows: List[Tuple[str, str, str, str, str]]):
+        try:
+            pool = await async_db.get_pool()
+            async with pool.connection() as conn:
+                cursor = conn.cursor()
+                await cursor.executemany(
+                    """
+                    INSERT INTO translation_memory (src_lang, tgt_lang, source_hash, source_text, translation)
+                    VALUES (%s, %s, %s, %s, %s)
+                    ON CONFLICT (src_lang, tgt_lang, source_hash) DO NOTHING
+                    """,
+                    rows
+                )
+                await cursor.close()
+        except Exception:
+            self.persistent_errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "front_cache": self.front.stats(),
+            "persistent_enabled": self.persistent,
+            "persistent_hits": self.persistent_hits,
+            "persistent_errors": self.persistent_errors,
+            "sentences_translated": self.sentences_translated,
+        }
@@ -0,0 +1,201 @@
+"""
+Streaming text uploads
+Reads an upload in fixed-size blocks, stops at the first block that goes past the size
+limit and decodes UTF-8 incrementally as the blocks arrive, so only the decoded text
+is kept instead of the raw bytes plus the text. Bulk imports read the .txt entries of
+ZIP archives the same way and pick free titles for colliding names
+"""
+
+import codecs
+import posixpath
+import re
+import zipfile
+from decouple import config
+from typing import Any, BinaryIO, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+UPLOAD_MAX_BYTES = 1024 * 1024  # 1MB, same limit as document saves
+UPLOAD_BLOCK_SIZE = config("UPLOAD_BLOCK_SIZE", default=64 * 1024, cast=int)
+TITLE_MAX_LENGTH = 255  # documents.title is VARCHAR(255)
+BULK_UPLOAD_MAX_FILES = config("BULK_UPLOAD_MAX_FILES", default=100, cast=int)  # .txt files + archive entries
+BULK_UPLOAD_MAX_ARCHIVE_BYTES = config("BULK_UPLOAD_MAX_ARCHIVE_BYTES", default=20 * 1024 * 1024, cast=int)
+BULK_UPLOAD_INSERT_BATCH_BYTES = config("BULK_UPLOAD_INSERT_BATCH_BYTES", default=4 * 1024 * 1024, cast=int)
+COPY_NUMBER_MAX_DIGITS = 10  # copy numbers are never longer; bounds how far copy_title can shorten a stem
+
+
+class UploadError(ValueError):
+    """Upload rejected; the message is meant for the user"""
+
+
+class TooLarge(UploadError):
+    pass
+
+
+class NotUtf8(UploadError):
+    pass
+
+
+class TextAccumulator:
+    """Collects decoded text block by block, enforcing the byte limit and UTF-8 validity"""
+
+    def __init__(self, max_bytes: int = UPLOAD_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._parts: List[str] = []
+
+    def feed(self, block: bytes):
+        self.size += len(block)
+        if self.size > self.max_bytes:
+            raise TooLarge("File size exceeds 1MB limit")
+        try:
+            # A character split across blocks is held back by the decoder until its last byte arrives
+            self._parts.append(self._decoder.decode(block))
+        except UnicodeDecodeError:
+            raise NotUtf8("File must be a valid UTF-8 text file")
+
+    def finish(self) -> str:
+        try:
+            self._parts.append(self._decoder.decode(b"", final=True))
+        except UnicodeDecodeError:
+            raise NotUtf8("File must be a valid UTF-8 text file")
+        text = "".join(self._parts)
+        self._parts = []
+        return text
+
+
+async def read_text_upload(file: Any, max_bytes: int = UPLOAD_MAX_BYTES,
+                           block_size: int = UPLOAD_BLOCK_SIZE) -> str:
+    """
+    Decoded text of an UploadFile (anything with an async read(size)), read block by block
+    Raises TooLarge / NotUtf8 as soon as a block shows the upload is unacceptable
+    """
+    size: Optional[int] = getattr(file, "size", None)
+    if size is not None and size > max_bytes:
+        # The multipart parser already knows the size; don't read anything
+        raise TooLarge("File size exceeds 1MB limit")
+    text = TextAccumulator(max_bytes)
+    while True:
+        block = await file.read(block_size)
+        if not block:
+            return text.finish()
+        text.feed(block)
+        block = None  # don't hold the raw block while waiting for the next one
+
+
+class ImportedFile(NamedTuple):
+    """One file of a bulk import: text is None when error says why it was rejected"""
+    filename: str
+    text: Optional[str] = None
+    error: Optional[str] = None
+
+
+def check_txt_name(filename: str) -> Optional[str]:
+    """Why filename can't be a document title, or None"""
+    if not filename.lower().endswith(".txt"):
+        return "Only .txt files are allowed"
+    if len(filename) > TITLE_MAX_LENGTH:
+        return f"File name is longer than {TITLE_MAX_LENGTH} characters"
+    return None
+
+
+def read_zip_texts(archive: BinaryIO, max_entries: int, max_bytes: int = UPLOAD_MAX_BYTES,
+                   block_size: int = UPLOAD_BLOCK_SIZE) -> List[ImportedFile]:
+    """
+    The files of a ZIP archive (blocking; run it in a thread), each read block by block
+    Folders inside the archive are flattened to the file name; directories and macOS
+    metadata are skipped. Raises UploadError for an unreadable archive or too many files
+    """
+    try:
+        zf = zipfile.ZipFile(archive)
+    except (zipfile.BadZipFile, OSError):
+        raise UploadError("Not a valid ZIP archive")
+    with zf:
+        entries = [
+            info for info in zf.infolist()
+            if not info.is_dir() and not info.filename.startswith("__MACOSX/")
+            and not posixpath.basename(info.filename).startswith(".")
+        ]
+        if len(entries) > max_entries:
+            raise UploadError(f"Archive contains more than {max_entries} files")
+
+        files = []
+        for info in entries:
+            filename = posixpath.basename(info.filename)
+            error = check_txt_name(filename)
+            if error is None and info.file_size > max_bytes:
+                # Declared size; the accumulator still enforces the real one
+                error = "File size exceeds 1MB limit"
+            if error is not None:
+                files.append(ImportedFile(filename, error=error))
+                continue
+            text = TextAccumulator(max_bytes)
+            try:
+                with zf.open(info) as entry:
+                    while True:
+                        block = entry.read(block_size)
+                        if not block:
+                            break
+                        text.feed(block)
+                files.append(ImportedFile(filename, text=text.finish()))
+            except UploadError as e:
+                files.append(ImportedFile(filename, error=str(e)))
+            except (zipfile.BadZipFile, NotImplementedError, RuntimeError, OSError):
+                # Corrupt, encrypted or unsupported entry
+                files.append(ImportedFile(filename, error="Could not extract file from archive"))
+        return files
+
+
+def title_stem(title: str) -> str:
+    """Title without its copy number and extension: Essay (2).txt and Essay.txt both give Essay"""
+    return re.sub(r"( \(\d+\))?\.txt$", "", title, flags=re.IGNORECASE)
+
+
+def copy_title(stem: str, copy: int, extension: str) -> str:
+    suffix = f" ({copy}){extension}"
+    return stem[:TITLE_MAX_LENGTH - len(suffix)] + suffix
+
+
+def copy_stem_prefix(stem: str, extension: str) -> Tuple[str, bool]:
+    """
+    The start of stem that every copy_title(stem, N, extension) keeps, and whether that is all of it
+    A long stem is cut shorter the more digits N has, so its copies only share a prefix
+    """
+    keep = TITLE_MAX_LENGTH - len(f" (){extension}") - COPY_NUMBER_MAX_DIGITS
+    return stem[:keep], len(stem) <= keep
+
+
+def resolve_titles(names: Iterable[str], taken: Set[str]) -> List[str]:
+    """
+    A free title for every name, in order: names already in taken (or repeated in names)
+    get the first free " (N)" suffix, e.g. "Essay.txt" -> "Essay (2).txt"
+    taken must hold the existing titles that equal a name or follow the "<stem> (N).txt"
+    pattern; it is extended with the chosen titles
+    """
+    titles = []
+    for name in names:
+        title = name
+        if title in taken:
+            stem, extension = title_stem(name), name[-4:]
+            copy = 2
+            while copy_title(stem, copy, extension) in taken:
+                copy += 1
+            title = copy_title(stem, copy, extension)
+        taken.add(title)
+        titles.append(title)
+    return titles
+
+
+def insert_batches(titles: List[str], texts: List[str],
+                   max_bytes: int = BULK_UPLOAD_INSERT_BATCH_BYTES) -> List[Tuple[List[str], List[str]]]:
+    """(titles, texts) groups, in order, of at most max_bytes of UTF-8 text each (a larger text goes alone)"""
+    batches: List[Tuple[List[str], List[str]]] = []
+    size = 0
+    for title, text in zip(titles, texts):
+        text_bytes = len(text.encode("utf-8"))
+        if not batches or size + text_bytes > max_bytes:
+            batches.append(([], []))
+            size = 0
+        batches[-1][0].append(title)
+        batches[-1][1].append(text)
+        size += text_bytes
+    return batches
@@ -0,0 +1,45 @@
+"""
+Start-up warm-up
+Primes what the first requests would otherwise pay for: the spaCy pipeline, the async
+database pool's connections and, optionally, the Hugging Face endpoints; every step reports
+to the readiness tracker behind /readyz
+"""
+
+import asyncio
+from decouple import config
+from typing import Awaitable, Callable, Optional
+from app.database.async_db import async_db
+from app.database.db_config import DB_POOL_CHECKOUT_TIMEOUT
+from app.utils.ai_services import AIServices, ai_services
+from app.utils.chunking_pool import ChunkingExecutor, chunking_executor
+from app.utils.readiness import ReadinessTracker, readiness
+
+AI_WARM_UP = config("AI_WARM_UP", default=False, cast=bool)
+
+
+async def open_database_pool():
+    """Open the async pool's min_size connections before the first request needs one"""
+    pool = await async_db.get_pool()
+    await pool.wait(timeout=DB_POOL_CHECKOUT_TIMEOUT)
+
+
+def start_warm_up(tracker: ReadinessTracker = readiness, chunking: ChunkingExecutor = chunking_executor,
+                  ai: AIServices = ai_services, warm_ai: bool = AI_WARM_UP,
+                  open_pool: Callable[[], Awaitable[None]] = open_database_pool) -> asyncio.Task:
+    """
+    Run all warm-up steps concurrently in the background
+    Steps are registered before this returns, so /readyz reports them as pending right away;
+    the HF endpoints are optional: an upstream outage must not take every instance out of rotation
+    """
+    steps = [
+        ("spacy", chunking.warm_up, True),
+        ("database_pool", open_pool, True),
+    ]
+    if warm_ai:
+        steps += [
+            ("mistral_endpoint", lambda: ai.warm_up_endpoint(ai.mistral_endpoint), False),
+            ("nllb_endpoint", lambda: ai.warm_up_endpoint(ai.nllb_endpoint), False),
+        ]
+    for name, _, required in steps:
+        tracker.register(name, required)
+    return asyncio.ensure_future(asyncio.gather(*[tracker.run(name, step, required) for name, step, required in steps]))
@@ -5,19 +5,27 @@ Handles intelligent chunking, auto-save, and file size validation
 
 import json
 import asyncio
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 from fastapi import WebSocket
-from app.utils.text_processor import IntelligentTextProcessor
-from app.database.db_config import get_db_connection
+from app.utils.document_sync import DeltaError, DocumentBuffer
+from app.utils.write_behind import WriteBehindBuffer
+from app.utils.chunking_pool import ChunkingExecutor, chunking_executor
+from app.utils.text_processor import ChunkingState
+from app.database.async_db import async_db
 
 class WebSocketManager:
     """Manages WebSocket connections and real-time document processing"""
     
-    def __init__(self):
+    def __init__(self, chunking: ChunkingExecutor = chunking_executor):
         self.active_connections: Dict[str, WebSocket] = {}
         self.user_documents: Dict[str, str] = {}  # user_id -> document_id
-        self.text_processor = IntelligentTextProcessor()
+        self.chunking_states: Dict[str, Tuple[Any, ChunkingState]] = {}  # user_id -> (document_id, last chunking)
+        self.document_buffers: Dict[str, Dict[str, DocumentBuffer]] = {}  # user_id -> {"text" | "content": buffer}
+        self.chunking = chunking
+        self.chunking_tasks: Dict[str, Tuple[asyncio.Task, bool]] = {}  # user_id -> (running job, full chunk list requested)
         self.max_file_size = 1024 * 1024  # 1MB limit
+        # Auto-saves are coalesced in memory and written once per flush interval
+        self.autosave_buffer = WriteBehindBuffer(self._save_document_content, self._on_autosave_flushed)
     
     async def connect(self, websocket: WebSocket, user_id: str):
         """Store WebSocket connection (connection already accepted in main.py)"""
@@ -29,6 +37,19 @@ class WebSocketManager:
             del self.active_connections[user_id]
         if user_id in self.user_documents:
             del self.user_documents[user_id]
+        self._leave_chunking_state(user_id)
+        self.document_buffers.pop(user_id, None)
+        chunking = self.chunking_tasks.pop(user_id, None)
+        if chunking is not None:
+            chunking[0].cancel()
+        # Persist whatever the user typed since the last flush
+        self.autosave_buffer.schedule_flush_user(user_id)
+    
+    def _leave_chunking_state(self, user_id: str):
+        """Drop the user's chunking state, keeping the result cached for when the document is reopened"""
+        previous = self.chunking_states.pop(user_id, None)
+        if previous is not None:
+            self.chunking.remember(previous[1])
     
     async def send_personal_message(self, message: Dict[str, Any], user_id: str):
         """Send message to specific user"""
@@ -38,8 +59,41 @@ class WebSocketManager:
             except Exception:
                 self.disconnect(user_id)
     
-    async def process_text_chunking(self, user_id: str, text: str, document_id: str):
-        """Process text with spaCy intelligent chunking"""
+    def schedule_text_chunking(self, user_id: str, text: str, document_id: str, full: bool = False) -> asyncio.Task:
+        """
+        Chunk in the background so the connection keeps reading messages
+        A newer text_changed supersedes the user's pending job: it is cancelled before it
+        runs, or its result is dropped if the parse already started
+        """
+        pending = self.chunking_tasks.get(user_id)
+        if pending is not None and not pending[0].done():
+            pending[0].cancel()
+            # The client is still waiting for the full list the stale job would have sent
+            full = full or pending[1]
+        
+        task = asyncio.ensure_future(self.process_text_chunking(user_id, text, document_id, full))
+        self.chunking_tasks[user_id] = (task, full)
+        
+        def forget(finished: asyncio.Task):
+            current = self.chunking_tasks.get(user_id)
+            if current is not None and current[0] is finished:
+                del self.chunking_tasks[user_id]
+        
+        task.add_done_callback(forget)
+        return task
+    
+    async def wait_for_chunking(self, user_id: str):
+        """Wait until the user's latest chunking job has finished"""
+        pending = self.chunking_tasks.get(user_id)
+        if pending is not None:
+            await asyncio.gather(pending[0], return_exceptions=True)
+    
+    async def process_text_chunking(self, user_id: str, text: str, document_id: str, full: bool = False):
+        """
+        Process text with spaCy intelligent chunking
+        After the first full pass only the sentences around the edit are reparsed and
+        the client gets a chunks_patch with just the chunks that changed
+        """
         try:
             # Validate file size before processing
             text_size = len(text.encode('utf-8'))
@@ -50,71 +104,172 @@ class WebSocketManager:
                 }, user_id)
                 return
             
-            # Create intelligent chunks
-            chunks = self.text_processor.create_intelligent_chunks(text, target_words=200)
+            previous = self.chunking_states.get(user_id)
+            if full or previous is None or previous[0] != document_id:
+                # Until this pass finishes there is no state to patch against
+                self._leave_chunking_state(user_id)
+                if len(text) > self.chunking.stream_window:
+                    await self.stream_text_chunks(user_id, text, document_id, text_size)
+                    return
+                
+                # Create intelligent chunks (served from the cache when this content was chunked before)
+                state = await self.chunking.chunk_document(text, target_words=200)
+                self.chunking_states[user_id] = (document_id, state)
+                
+                # Send chunks to client
+                await self.send_personal_message({
+                    "type": "chunks_updated",
+                    "document_id": document_id,
+                    "chunks": [chunk.to_wire() for chunk in state.chunks],
+                    "total_chunks": len(state.chunks),
+                    "file_size": text_size
+                }, user_id)
+                return
             
-            # Convert chunks to serializable format
-            chunk_data = []
-            for chunk in chunks:
-                chunk_data.append({
-                    "index": chunk.index,
-                    "text": chunk.text,
-                    "wordCount": chunk.word_count,
-                    "start": chunk.start_position,
-                    "end": chunk.end_position
-                })
+            previous_state = previous[1]
+            state, patch = await self.chunking.rechunk(previous_state, text)
+            self.chunking_states[user_id] = (document_id, state)
             
-            # Send chunks to client
             await self.send_personal_message({
-                "type": "chunks_updated",
+                "type": "chunks_patch",
                 "document_id": document_id,
-                "chunks": chunk_data,
-                "total_chunks": len(chunks),
+                "start": patch.start,
+                "removed": patch.removed,
+                "chunks": [chunk.to_wire() for chunk in patch.chunks],
+                "index_shift": patch.index_shift,
+                "position_shift": patch.position_shift,
+                "previous_total": len(previous_state.chunks),
+                "total_chunks": len(state.chunks),
                 "file_size": text_size
             }, user_id)
             
         except Exception:
+            # Next text_changed starts over with a full pass
+            self.chunking_states.pop(user_id, None)
             await self.send_personal_message({
                 "type": "error",
                 "message": "Error processing document chunks"
             }, user_id)
     
-    async def auto_save_document(self, user_id: str, document_id: str, content: str):
-        """Auto-save document via WebSocket"""
-        try:
-            # Validate file size
-            content_size = len(content.encode('utf-8'))
-            if content_size > self.max_file_size:
-                await self.send_personal_message({
-                    "type": "save_error",
-                    "message": f"Cannot save: Document size ({content_size} bytes) exceeds 1MB limit"
-                }, user_id)
-                return
-            
-            # Save to database with last_updated timestamp
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute(
-                "UPDATE documents SET content = %s, last_updated = CURRENT_TIMESTAMP WHERE id = %s AND user_id = %s",
-                (content, document_id, user_id)
-            )
-            conn.commit()
-            cursor.close()
-            conn.close()
-            
-            # Send success confirmation
+    async def stream_text_chunks(self, user_id: str, text: str, document_id: str, text_size: int):
+        """
+        Full chunking pass for a large document, sent as it is parsed
+        Each chunks_appended message carries the chunks finished so far (start == 0 begins a
+        new list); the last one has done set and the total
+        """
+        stream = self.chunking.stream_document(text, target_words=200)
+        sent = 0
+        async for batch in stream:
             await self.send_personal_message({
-                "type": "auto_saved",
+                "type": "chunks_appended",
                 "document_id": document_id,
-                "file_size": content_size,
-                "timestamp": asyncio.get_event_loop().time()
+                "start": sent,
+                "chunks": [chunk.to_wire() for chunk in batch],
+                "done": False
             }, user_id)
-            
-        except Exception:
+            sent += len(batch)
+        
+        self.chunking_states[user_id] = (document_id, stream.state)
+        await self.send_personal_message({
+            "type": "chunks_appended",
+            "document_id": document_id,
+            "start": sent,
+            "chunks": [],
+            "done": True,
+            "total_chunks": sent,
+            "file_size": text_size
+        }, user_id)
+    
+    async def _save_document_content(self, user_id: str, document_id: str, content: str):
+        """Write document content using a pooled async connection"""
+        pool = await async_db.get_pool()
+        async with pool.connection() as conn:
+            await conn.execute(
+                "UPDATE documents SET content = %s, last_updated = CURRENT_TIMESTAMP, version = version + 1 "
+                "WHERE id = %s AND user_id = %s",
+                (content, document_id, user_id)
+            )
+
+    async def _on_autosave_flushed(self, user_id: str, document_id: str, content: str, error: Exception = None):
+        """Tell the client once buffered content has actually been written (or failed to)"""
+        if error is not None:
             await self.send_personal_message({
                 "type": "save_error",
                 "message": "Failed to auto-save document"
             }, user_id)
+            return
+        
+        await self.send_personal_message({
+            "type": "auto_saved",
+            "document_id": document_id,
+            "file_size": len(content.encode('utf-8')),
+            "timestamp": asyncio.get_event_loop().time()
+        }, user_id)
+    
+    async def auto_save_document(self, user_id: str, document_id: str, content: str, flush: bool = False) -> bool:
+        """
+        Auto-save document via WebSocket
+        Content goes to the write-behind buffer; flush=True writes it before returning
+        """
+        # Validate file size
+        content_size = len(content.encode('utf-8'))
+        if content_size > self.max_file_size:
+            await self.send_personal_message({
+                "type": "save_error",
+                "message": f"Cannot save: Document size ({content_size} bytes) exceeds 1MB limit"
+            }, user_id)
+            return False
+        
+        self.autosave_buffer.put(user_id, document_id, content)
+        if flush:
+            return await self.autosave_buffer.flush(user_id, document_id)
+        return True
+    
+    async def sync_document_buffer(self, user_id: str, message: Dict[str, Any], channel: str, field: str) -> Optional[str]:
+        """
+        Bring the user's copy of a client-side string up to date
+        The message carries either the full value in `field` or `ops` against `base_revision`.
+        Returns the synced value, or None after asking the client for a full resync
+        """
+        document_id = message.get("document_id")
+        buffers = self.document_buffers.setdefault(user_id, {})
+        buffer = buffers.get(channel)
+        
+        if "ops" not in message:
+            revision = message.get("revision")
+            value = message.get(field, "")
+            if buffer is None:
+                buffer = buffers[channel] = DocumentBuffer(document_id)
+            buffer.reset(document_id, value, revision if isinstance(revision, int) else 0)
+        else:
+            try:
+                if buffer is None or buffer.document_id != document_id:
+                    raise DeltaError("No synced copy of this document")
+                value = buffer.apply(
+                    message.get("base_revision"),
+                    message.get("revision"),
+                    message.get("ops"),
+                    message.get("length"),
+                    max_length=self.max_file_size
+                )
+            except DeltaError as e:
+                await self.send_personal_message({
+                    "type": "resync_required",
+                    "document_id": document_id,
+                    "channel": channel,
+                    "message_type": message.get("type"),
+                    "base_revision": message.get("base_revision"),
+                    "message": str(e)
+                }, user_id)
+                return None
+        
+        await self.send_personal_message({
+            "type": "delta_ack",
+            "document_id": document_id,
+            "channel": channel,
+            "revision": buffer.revision
+        }, user_id)
+        return value
     
     async def handle_message(self, user_id: str, message: Dict[str, Any]):
         """Handle incoming WebSocket messages"""
@@ -122,28 +277,33 @@ class WebSocketManager:
         
         if message_type == "text_changed":
             # Handle text change for intelligent chunking
-            text = message.get("text", "")
             document_id = message.get("document_id")
             
             if document_id:
                 self.user_documents[user_id] = document_id
-                await self.process_text_chunking(user_id, text, document_id)
+                text = await self.sync_document_buffer(user_id, message, "text", "text")
+                if text is not None:
+                    self.schedule_text_chunking(user_id, text, document_id, full=bool(message.get("full")))
         
         elif message_type == "auto_save":
             # Handle auto-save request
             document_id = message.get("document_id")
-            content = message.get("content", "")
             
             if document_id:
-                await self.auto_save_document(user_id, document_id, content)
+                content = await self.sync_document_buffer(user_id, message, "content", "content")
+                if content is not None:
+                    await self.auto_save_document(user_id, document_id, content)
         
         elif message_type == "manual_save":
             # Handle manual save request (same as auto-save but different response)
             document_id = message.get("document_id")
-            content = message.get("content", "")
             
             if document_id:
-                await self.auto_save_document(user_id, document_id, content)
+                content = await self.sync_document_buffer(user_id, message, "content", "content")
+                if content is None:
+                    return
+                if not await self.auto_save_document(user_id, document_id, content, flush=True):
+                    return
                 # Send manual save confirmation
                 await self.send_personal_message({
                     "type": "manual_saved",
@@ -0,0 +1,201 @@
+"""
+Write-behind buffer for WebSocket auto-saves
+Keeps only the latest content per document and writes it to PostgreSQL once per
+flush interval (or on manual save / disconnect / shutdown), so a burst of
+auto_save messages turns into a single UPDATE
+"""
+
+import asyncio
+import contextlib
+import time
+from decouple import config
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+AUTO_SAVE_FLUSH_INTERVAL = config("AUTO_SAVE_FLUSH_INTERVAL", default=5.0, cast=float)
+
+WriteFunc = Callable[[str, Any, str], Awaitable[None]]
+FlushedCallback = Callable[[str, Any, str, Optional[Exception]], Awaitable[None]]
+
+
+class PendingWrite:
+    """Latest unsaved content of one document"""
+
+    def __init__(self, content: str):
+        self.content = content
+        self.dirty_since = time.monotonic()
+        self.versions = 1  # auto-saves collapsed into this write
+        self.discarded = False  # set while it is being written; a failed write is then not retried
+
+
+class WriteBehindBuffer:
+    """
+    write(user_id, document_id, content) persists one document
+    on_flushed(user_id, document_id, content, error) is awaited after every write attempt
+    """
+
+    def __init__(self, write: WriteFunc, on_flushed: Optional[FlushedCallback] = None,
+                 flush_interval: float = AUTO_SAVE_FLUSH_INTERVAL):
+        self.write = write
+        self.on_flushed = on_flushed
+        self.flush_interval = flush_interval
+
+        self._pending: Dict[Tuple[str, str], PendingWrite] = {}
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        self._lock_users: Dict[Tuple[str, str], int] = {}
+        self._writing: Dict[Tuple[str, str], PendingWrite] = {}
+        self._flusher: Optional[asyncio.Task] = None
+        self._flusher_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._background: set = set()
+
+        # Metrics
+        self.saves_received = 0
+        self.writes = 0
+        self.writes_avoided = 0
+        self.failures = 0
+        self._total_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+
+    def put(self, user_id: str, document_id: Any, content: str):
+        """Record the latest content; it is written at the next flush"""
+        key = (str(user_id), str(document_id))
+        self.saves_received += 1
+        pending = self._pending.get(key)
+        if pending is None:
+            self._pending[key] = PendingWrite(content)
+        else:
+            pending.content = content
+            pending.versions += 1
+
+        loop = asyncio.get_running_loop()
+        if self._flusher is None or self._flusher.done() or self._flusher_loop is not loop:
+            self._flusher_loop = loop
+            self._flusher = asyncio.ensure_future(self._run())
+
+    def is_dirty(self, user_id: str, document_id: Any) -> bool:
+        return (str(user_id), str(document_id)) in self._pending
+
+    async def discard(self, user_id: str, document_id: Any):
+        """
+        Drop unsaved content, e.g. for a document that is being deleted or overwritten
+        Returns once a write already in progress has finished, so it can't land after the caller's own
+        """
+        key = (str(user_id), str(document_id))
+        self._pending.pop(key, None)
+        writing = self._writing.get(key)
+        if writing is None:
+            return
+        writing.discarded = True
+        async with self._document_lock(key):
+            pass
+
+    @contextlib.asynccontextmanager
+    async def _document_lock(self, key: Tuple[str, str]) -> AsyncIterator[None]:
+        """
+        One write per document at a time, so an older version can't land after a newer one
+        The lock is dropped only when nobody holds or waits for it; a waiter woken by release()
+        doesn't show in lock.locked() yet, and a fresh lock would let a third flush run alongside it
+        """
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._lock_users[key] = self._lock_users.get(key, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._lock_users[key] -= 1
+            if not self._lock_users[key]:
+                del self._lock_users[key]
+                del self._locks[key]
+
+    async def flush(self, user_id: str, document_id: Any) -> bool:
+        """Write the document now if it has unsaved content; False if the write failed"""
+        key = (str(user_id), str(document_id))
+        async with self._document_lock(key):
+            pending = self._pending.pop(key, None)
+            if pending is None:
+                return True
+
+            started = time.perf_counter()
+            error = None
+            self._writing[key] = pending
+            try:
+                await self.write(key[0], key[1], pending.content)
+            except asyncio.CancelledError:
+                self._requeue(key, pending)
+                raise
+            except Exception as e:
+                error = e
+                self.failures += 1
+                self._requeue(key, pending)
+            else:
+                latency = time.perf_counter() - started
+                self.writes += 1
+                self.writes_avoided += pending.versions - 1
+                self._total_flush_latency += latency
+                self.max_flush_latency = max(self.max_flush_latency, latency)
+            finally:
+                del self._writing[key]
+
+        if self.on_flushed is not None:
+            await self.on_flushed(key[0], key[1], pending.content, error)
+        return error is None
+
+    def _requeue(self, key: Tuple[str, str], pending: PendingWrite):
+        """Keep an unwritten version for the next flush unless a newer one arrived meanwhile or it was discarded"""
+        if pending.discarded:
+            return
+        newer = self._pending.get(key)
+        if newer is None:
+            pending.dirty_since = time.monotonic()  # retry after another interval, not in a tight loop
+            self._pending[key] = pending
+        else:
+            newer.versions += pending.versions
+
+    async def flush_user(self, user_id: str) -> bool:
+        """Flush every dirty document of one user"""
+        keys = [key for key in list(self._pending) if key[0] == str(user_id)]
+        results = await asyncio.gather(*[self.flush(*key) for key in keys])
+        return all(results)
+
+    async def flush_all(self) -> bool:
+        results = await asyncio.gather(*[self.flush(*key) for key in list(self._pending)])
+        return all(results)
+
+    def schedule_flush_user(self, user_id: str):
+        """Flush a user's documents in the background (for synchronous callers such as disconnect)"""
+        if not any(key[0] == str(user_id) for key in self._pending):
+            return
+        task = asyncio.ensure_future(self.flush_user(user_id))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _run(self):
+        """Flush documents once they have been dirty for flush_interval"""
+        while self._pending:
+            now = time.monotonic()
+            due = [key for key, pending in self._pending.items() if now - pending.dirty_since >= self.flush_interval]
+            if due:
+                await asyncio.gather(*[self.flush(*key) for key in due])
+                continue
+            oldest = min(pending.dirty_since for pending in self._pending.values())
+            await asyncio.sleep(max(oldest + self.flush_interval - now, 0.01))
+
+    async def close(self):
+        """Flush everything that is still dirty (graceful shutdown)"""
+        if self._background:
+            await asyncio.gather(*list(self._background), return_exceptions=True)
+        await self.flush_all()
+        if self._flusher is not None and not self._flusher.done():
+            self._flusher.cancel()
+        self._flusher = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "flush_interval": self.flush_interval,
+            "saves_received": self.saves_received,
+            "writes": self.writes,
+            "writes_avoided": self.writes_avoided,
+            "failures": self.failures,
+            "dirty_documents": len(self._pending),
+            "avg_flush_latency_ms": (self._total_flush_latency / self.writes * 1000) if self.writes else 0.0,
+            "max_flush_latency_ms": self.max_flush_latency * 1000,
+        }
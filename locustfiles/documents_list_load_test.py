@@ -0,0 +1,47 @@
+"""
+Locust load test for /documents/list under heavy concurrency
+Measures p99 latency with 200 concurrent callers hammering the document listing
+To run (headless, 200 users, results in documents_list_stats.csv):
+    locust -f locustfiles/documents_list_load_test.py --host=http://localhost:8000 \
+        --headless -u 200 -r 200 -t 60s --csv=reports/documents_list
+
+Before/after comparison: run once against the commit before the async database
+layer and once against the current tree, then compare the "99%" column of the
+"/documents/list" row in reports/documents_list_stats.csv
+
+Results: not measured. The before/after p99 of this comparison has not been run yet
+(it needs a PostgreSQL database seeded with the test user); no numbers are claimed
+for the async database layer until it is
+"""
+
+from locust import HttpUser, task, constant
+
+
+class DocumentsListUser(HttpUser):
+    """
+    ONE simulated dashboard user that keeps re-listing documents
+    Locust creates 200 instances of this class with -u 200
+    """
+    wait_time = constant(0)  # No think time - we want maximum pressure on the worker
+
+    def on_start(self):
+        """Log in once per simulated user and reuse the token"""
+        self.email = "test@example.com"
+        self.password = "TestPassword123"
+        self.token = None
+
+        response = self.client.post(
+            "/auth/login",
+            json={"email": self.email, "password": self.password}
+        )
+        if response.status_code == 200:
+            self.token = response.json().get("access_token")
+
+    @task
+    def list_documents(self):
+        """List documents for the logged in user"""
+        if self.token:
+            self.client.get(
+                "/documents/list",
+                headers={"Authorization": f"Bearer {self.token}"}
+            )
@@ -17,6 +17,10 @@ class DocumentManager {
         this.autoSaveTimeout = null;
         this.lastSavedContent = '';
         this.documentChunks = [];
+        this.correctionJob = null; // Correct all run of the open document, see handleCorrectionJobUpdate
+        this.documentsCursor = null; // X-Next-Cursor of the last page loaded, null once all are loaded
+        this.isLoadingMoreDocuments = false;
+        this.documentsEndObserver = null;
         
         // New view and sorting elements
         this.currentView = 'grid'; // 'grid' or 'list'
@@ -121,6 +125,17 @@ class DocumentManager {
             saveDocumentBtn.addEventListener('click', () => this.saveDocument());
         }
 
+        const correctAllBtn = document.getElementById('correctAllBtn');
+        const cancelCorrectAllBtn = document.getElementById('cancelCorrectAllBtn');
+
+        if (correctAllBtn) {
+            correctAllBtn.addEventListener('click', () => this.startCorrectAll());
+        }
+
+        if (cancelCorrectAllBtn) {
+            cancelCorrectAllBtn.addEventListener('click', () => this.cancelCorrectAll());
+        }
+
         // Logout button (now in settings dropdown)
         const logoutBtn = document.getElementById('logoutBtn');
         if (logoutBtn) {
@@ -413,28 +428,13 @@ class DocumentManager {
         }
 
         try {
-            // Add timeout to prevent infinite loading
-            const controller = new AbortController();
-            const timeoutId = setTimeout(() => controller.abort(), 10000); // 10 second timeout
-            
-            const response = await fetch('/documents/list', {
-                headers: {
-                    'Authorization': `Bearer ${token}`
-                },
-                signal: controller.signal
-            });
-            
-            clearTimeout(timeoutId);
-
-            if (await this.handleAuthError(response)) {
+            // Only the first page; the rest are loaded as the user scrolls (see loadMoreDocuments)
+            const page = await this.fetchDocumentsPage(token, null);
+            if (!page) {
                 return;
             }
-
-            if (!response.ok) {
-                throw new Error('Failed to fetch documents');
-            }
-
-            const documents = await response.json();
+            const documents = page.documents;
+            this.documentsCursor = page.nextCursor;
             
             // Store documents for sorting and filtering
             this.documents = documents;
@@ -464,6 +464,8 @@ class DocumentManager {
                 lucide.createIcons({ icons: lucide.icons });
             }
 
+            this.observeDocumentsEnd();
+
         } catch (error) {
             let errorMessage = 'Failed to load documents';
             if (error.name === 'AbortError') {
@@ -486,6 +488,96 @@ class DocumentManager {
         }
     }
 
+    async fetchDocumentsPage(token, cursor) {
+        // One page of /documents/list, with its own timeout; null if the user was sent to log in
+        const controller = new AbortController();
+        const timeoutId = setTimeout(() => controller.abort(), 10000); // 10 second timeout
+        try {
+            const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+            const response = await fetch(`/documents/list${query}`, {
+                headers: {
+                    'Authorization': `Bearer ${token}`
+                },
+                signal: controller.signal
+            });
+
+            if (await this.handleAuthError(response)) {
+                return null;
+            }
+
+            if (!response.ok) {
+                throw new Error('Failed to fetch documents');
+            }
+
+            return {
+                documents: await response.json(),
+                nextCursor: response.headers.get('X-Next-Cursor')
+            };
+        } finally {
+            clearTimeout(timeoutId);
+        }
+    }
+
+    observeDocumentsEnd() {
+        // Load the next page when the end of the documents comes into view
+        const container = document.getElementById('documentsContainer');
+        if (!container || typeof IntersectionObserver === 'undefined') {
+            return;
+        }
+        let sentinel = document.getElementById('documentsEnd');
+        if (!sentinel) {
+            sentinel = document.createElement('div');
+            sentinel.id = 'documentsEnd';
+            container.appendChild(sentinel);
+        }
+        if (!this.documentsEndObserver) {
+            this.documentsEndObserver = new IntersectionObserver((entries) => {
+                if (entries.some(entry => entry.isIntersecting)) {
+                    this.loadMoreDocuments();
+                }
+            }, { rootMargin: '200px' });
+        }
+        // Observing again reports the current state, so a page that doesn't fill the screen loads the next one
+        this.documentsEndObserver.unobserve(sentinel);
+        if (this.documentsCursor) {
+            this.documentsEndObserver.observe(sentinel);
+        }
+    }
+
+    async loadMoreDocuments() {
+        if (!this.documentsCursor || this.isLoadingMoreDocuments) {
+            return;
+        }
+        this.isLoadingMoreDocuments = true;
+        const token = localStorage.getItem('access_token');
+        const cursor = this.documentsCursor;
+
+        try {
+            const page = await this.fetchDocumentsPage(token, cursor);
+            if (!page || this.documentsCursor !== cursor) {
+                return; // logged out, or the list was reloaded meanwhile
+            }
+            this.documents.push(...page.documents);
+            this.documentsCursor = page.nextCursor;
+
+            this.sortDocuments();
+            if (this.currentView === 'grid') {
+                this.renderDocumentsGrid();
+            } else {
+                this.renderDocumentsList();
+            }
+        } catch (error) {
+            const errorMessage = error.name === 'AbortError'
+                ? 'Request timed out. Please check your connection and try again.'
+                : 'Failed to load more documents';
+            this.showFloatingNotification('error', errorMessage);
+            return;
+        } finally {
+            this.isLoadingMoreDocuments = false;
+        }
+        this.observeDocumentsEnd();
+    }
+
     escapeHtml(unsafe) {
         return unsafe
             .replace(/&/g, "&amp;")
@@ -1620,6 +1712,11 @@ class DocumentManager {
             // Trigger initial WebSocket intelligent chunking
             this.scheduleTextChunking();
 
+            // Pick up a Correct all run started earlier for this document
+            this.correctionJob = null;
+            this.updateCorrectAllButtons();
+            this.resumeCorrectionJob();
+
         } catch (error) {
             editorLoading.style.display = 'none';
             
@@ -1730,6 +1827,9 @@ class DocumentManager {
         this.clearRightPanel();
         this.currentDocument = null;
         this.documentChunks = [];
+        this.chunkStates = {};
+        this.correctionJob = null;
+        this.updateCorrectAllButtons();
         this.selectedChunk = null;
         this.currentFeedbackChunk = null;
         this.isGrammarCorrectionInProgress = false;
@@ -1828,7 +1928,9 @@ class DocumentManager {
         this.chunkingTimeout = setTimeout(() => {
             if (window.websocketClient && window.websocketClient.isConnected && this.currentDocument) {
                 const text = this.quillEditor.getText();
-                window.websocketClient.requestTextChunking(text, this.currentDocument.id);
+                // Without chunks on screen there is nothing for an incremental patch to apply to
+                const full = this.documentChunks.length === 0;
+                window.websocketClient.requestTextChunking(text, this.currentDocument.id, full);
             }
         }, 1500);
     }
@@ -1897,7 +1999,7 @@ class DocumentManager {
         statusElement.textContent = message;
         
         statusElement.classList.remove('updating', 'ready');
-        if (message.includes('Updating') || message.includes('Splitting')) {
+        if (message.includes('Updating') || message.includes('Splitting') || message.includes('Correcting')) {
             statusElement.classList.add('updating');
         } else if (message.includes('Ready')) {
             statusElement.classList.add('ready');
@@ -1923,7 +2025,7 @@ class DocumentManager {
             chunksList.innerHTML = this.documentChunks.map(chunk => `
                 <div class="chunk-item fade-in" data-chunk-index="${chunk.index}">
                     <div class="chunk-header">
-                        <span class="chunk-number">Chunk ${chunk.index + 1}</span>
+                        <span class="chunk-number">Chunk ${chunk.index + 1}${this.correctionFor(chunk) ? this.correctedChunkBadge() : ''}</span>
                         <span class="chunk-word-count">
                             <i data-lucide="type"></i>
                             ${chunk.wordCount} words
@@ -2036,10 +2138,11 @@ class DocumentManager {
             this.chunkStates = {};
         }
         
-        // Get or create state for this chunk
+        // Get or create state for this chunk (a Correct all result if there is one)
+        const correction = this.correctionFor(chunk);
         const chunkState = this.chunkStates[chunkIndex] || {
-            correctedText: '',
-            feedbackText: ''
+            correctedText: correction ? correction.corrected_text : '',
+            feedbackText: correction ? correction.feedback : ''
         };
         
         // Always use current chunk text, but maintain per-chunk corrected text and feedback
@@ -2057,6 +2160,259 @@ class DocumentManager {
         this.isProcessingFeedback = false;
     }
 
+    // Correct all: the server corrects every chunk of the saved document and streams the results over the WebSocket
+
+    async startCorrectAll() {
+        if (!this.currentDocument || !this.quillEditor) {
+            return;
+        }
+        if (this.quillEditor.root.innerHTML !== this.lastSavedContent) {
+            // The job corrects the stored text, so unsaved edits would not line up with the results
+            this.showFloatingNotification('warning', 'Save the document before correcting all sections', 3000);
+            return;
+        }
+
+        const token = localStorage.getItem('access_token');
+        const correctAllBtn = document.getElementById('correctAllBtn');
+        if (correctAllBtn) correctAllBtn.disabled = true;
+
+        try {
+            const response = await fetch(`/documents/${this.currentDocument.id}/correct-all`, {
+                method: 'POST',
+                headers: {
+                    'Authorization': `Bearer ${token}`
+                }
+            });
+
+            if (await this.handleAuthError(response)) {
+                return;
+            }
+
+            const result = await response.json();
+
+            if (!response.ok) {
+                this.showFloatingNotification('error', result.detail || 'Failed to start correcting the document');
+                return;
+            }
+
+            this.handleCorrectionJobUpdate({ type: 'correction_job_status', ...result });
+            this.showFloatingNotification('info', 'Correcting all sections...', 3000);
+
+        } catch (error) {
+            this.showFloatingNotification('error', 'Connection error. Please try again.');
+        } finally {
+            this.updateCorrectAllButtons();
+        }
+    }
+
+    async cancelCorrectAll() {
+        if (!this.currentDocument) {
+            return;
+        }
+
+        const token = localStorage.getItem('access_token');
+
+        try {
+            const response = await fetch(`/documents/${this.currentDocument.id}/correct-all`, {
+                method: 'DELETE',
+                headers: {
+                    'Authorization': `Bearer ${token}`
+                }
+            });
+
+            if (await this.handleAuthError(response)) {
+                return;
+            }
+
+            const result = await response.json();
+
+            if (!response.ok) {
+                this.showFloatingNotification('error', result.detail || 'Failed to stop correcting the document');
+                return;
+            }
+
+            // The correction_job_cancelled message that follows over the WebSocket shows the notification
+            this.handleCorrectionJobUpdate({ type: 'correction_job_status', ...result });
+
+        } catch (error) {
+            this.showFloatingNotification('error', 'Connection error. Please try again.');
+        }
+    }
+
+    async resumeCorrectionJob() {
+        // Replay the open document's job (e.g. after a reconnect): its progress and every chunk finished so far
+        if (!this.currentDocument) {
+            return;
+        }
+
+        const documentId = this.currentDocument.id;
+        const token = localStorage.getItem('access_token');
+
+        try {
+            const response = await fetch(`/documents/${documentId}/correct-all`, {
+                headers: {
+                    'Authorization': `Bearer ${token}`
+                }
+            });
+
+            if (await this.handleAuthError(response)) {
+                return;
+            }
+
+            if (!response.ok) {
+                return; // 404: no job for this document
+            }
+
+            const job = await response.json();
+            if (!this.currentDocument || this.currentDocument.id !== documentId) {
+                return;
+            }
+
+            const { results, errors, ...summary } = job;
+            this.handleCorrectionJobUpdate({ type: 'correction_job_status', ...summary });
+            results.forEach(result => this.handleCorrectionJobUpdate({
+                type: 'correction_chunk_result', job_id: job.job_id, document_id: documentId, ...result
+            }));
+            errors.forEach(error => this.handleCorrectionJobUpdate({
+                type: 'correction_chunk_error', job_id: job.job_id, document_id: documentId, ...error
+            }));
+
+        } catch (error) {
+            // The server replays the job over the WebSocket as well
+        }
+    }
+
+    handleCorrectionJobUpdate(message) {
+        if (!this.currentDocument || String(this.currentDocument.id) !== String(message.document_id)) {
+            return;
+        }
+
+        let job = this.correctionJob;
+        if (!job || job.jobId !== message.job_id) {
+            // A new run (the document changed since the last one): earlier results no longer apply
+            job = this.correctionJob = {
+                jobId: message.job_id,
+                status: 'running',
+                totalChunks: 0,
+                chunkingDone: false,
+                results: {}, // chunk index -> correction_chunk_result
+                errors: {} // chunk index -> error
+            };
+        }
+
+        if ('status' in message) {
+            job.status = message.status;
+            job.totalChunks = message.total_chunks;
+            job.chunkingDone = message.chunking_done;
+        }
+
+        switch (message.type) {
+            case 'correction_chunk_result':
+                job.results[message.chunk_index] = message;
+                delete job.errors[message.chunk_index];
+                this.applyChunkCorrection(message);
+                break;
+            case 'correction_chunk_error':
+                job.errors[message.chunk_index] = message.error;
+                break;
+            case 'correction_job_finished': {
+                const failed = Object.keys(job.errors).length;
+                if (failed) {
+                    this.showFloatingNotification('warning', `${failed} section${failed === 1 ? '' : 's'} could not be corrected. Click Correct all to retry.`, 5000);
+                } else {
+                    this.showFloatingNotification('success', 'All sections corrected!', 3000);
+                }
+                break;
+            }
+            case 'correction_job_cancelled':
+                this.showFloatingNotification('info', 'Correction stopped. Finished sections are kept.', 3000);
+                break;
+            case 'correction_job_failed':
+                this.showFloatingNotification('error', message.error || 'Failed to correct the document');
+                break;
+            default:
+        }
+
+        this.updateCorrectionProgress();
+    }
+
+    correctionFor(chunk) {
+        // The Correct all result for a chunk, as long as the chunk still holds the text that was corrected
+        const result = this.correctionJob && this.correctionJob.results[chunk.index];
+        if (!result || result.original_text.replace(/\s+/g, ' ').trim() !== chunk.text.replace(/\s+/g, ' ').trim()) {
+            return null;
+        }
+        return result;
+    }
+
+    correctedChunkBadge() {
+        return '<span class="chunk-corrected-badge" title="Corrected by Correct all"><i data-lucide="check-circle"></i>Corrected</span>';
+    }
+
+    applyChunkCorrection(result) {
+        const chunk = this.documentChunks[result.chunk_index];
+        if (!chunk || !this.correctionFor(chunk)) {
+            return; // not on screen yet, or edited since; displayChunks picks it up when it matches
+        }
+
+        // The job result replaces an earlier Grammar Check of this chunk
+        if (this.chunkStates) {
+            delete this.chunkStates[result.chunk_index];
+        }
+
+        const chunkNumber = document.querySelector(`#chunksList .chunk-item[data-chunk-index="${result.chunk_index}"] .chunk-number`);
+        if (chunkNumber && !chunkNumber.querySelector('.chunk-corrected-badge')) {
+            chunkNumber.insertAdjacentHTML('beforeend', this.correctedChunkBadge());
+            if (typeof lucide !== 'undefined') {
+                lucide.createIcons({ icons: lucide.icons });
+            }
+        }
+
+        // The Writing Assistant is showing this chunk - fill in its correction
+        if (this.currentFeedbackChunk && this.currentFeedbackChunk.index === result.chunk_index) {
+            this.showFeedbackInRightPanel(
+                `Grammar Feedback - Chunk ${result.chunk_index + 1}`,
+                chunk.text,
+                result.corrected_text,
+                result.feedback
+            );
+        }
+    }
+
+    updateCorrectionProgress() {
+        const job = this.correctionJob;
+        if (!job) {
+            return;
+        }
+
+        const done = Object.keys(job.results).length;
+        const failed = Object.keys(job.errors).length;
+        // While the server is still chunking the document the final count is not known yet
+        const total = job.chunkingDone ? job.totalChunks : Math.max(job.totalChunks, this.documentChunks.length);
+        const failedText = failed ? `, ${failed} failed` : '';
+
+        if (job.status === 'running') {
+            this.updateChunksStatus(`Correcting... (${done}/${total} chunks${failedText})`);
+        } else {
+            this.updateChunksStatus(`Ready (${total} chunks, ${done} corrected${failedText})`);
+        }
+        this.updateCorrectAllButtons();
+    }
+
+    updateCorrectAllButtons() {
+        const correctAllBtn = document.getElementById('correctAllBtn');
+        const cancelCorrectAllBtn = document.getElementById('cancelCorrectAllBtn');
+        const running = Boolean(this.correctionJob && this.correctionJob.status === 'running');
+
+        if (correctAllBtn) {
+            correctAllBtn.style.display = running ? 'none' : '';
+            correctAllBtn.disabled = false;
+        }
+        if (cancelCorrectAllBtn) {
+            cancelCorrectAllBtn.style.display = running ? '' : 'none';
+        }
+    }
+
     async translateText(type, targetLanguage) {
         // Check if translation is already in progress
         if (this.isTranslationInProgress) {
@@ -2221,6 +2577,7 @@ class DocumentManager {
             const frontendNextNumber = this.getFrontendNextUntitledNumber();
             
             const response = await fetch('/documents/get-next-untitled-number', {
+                method: 'POST',
                 headers: {
                     'Authorization': `Bearer ${token}`
                 }
@@ -12,6 +12,11 @@ class WebSocketClient {
         this.reconnectDelay = 1000; // 1 second
         this.isConnected = false;
         this.messageQueue = [];
+
+        // Delta sync: per channel ('text' for chunking, 'content' for saves) the last value sent
+        this.syncState = {};
+        this.revisionCounter = 0;
+        this.lastFullRevision = {};
     }
 
     async connect(userId) {
@@ -37,9 +42,15 @@ class WebSocketClient {
             this.websocket = new WebSocket(wsUrl);
             
             this.websocket.onopen = () => {
+                const reconnected = this.reconnectAttempts > 0;
                 this.isConnected = true;
                 this.reconnectAttempts = 0;
                 this.processMessageQueue();
+
+                // Correct all results may have finished while the connection was down
+                if (reconnected && window.documentManager) {
+                    window.documentManager.resumeCorrectionJob();
+                }
                 
                 // Connection established silently (no notification needed)
             };
@@ -50,6 +61,8 @@ class WebSocketClient {
             
             this.websocket.onclose = (event) => {
                 this.isConnected = false;
+                // The server drops its document buffers with the connection
+                this.syncState = {};
                 
                 // Handle authentication errors
                 if (event.code === 1008) {
@@ -138,6 +151,17 @@ class WebSocketClient {
             case 'chunks_updated':
                 this.handleChunksUpdated(message);
                 break;
+            case 'chunks_patch':
+                this.handleChunksPatch(message);
+                break;
+            case 'chunks_appended':
+                this.handleChunksAppended(message);
+                break;
+            case 'delta_ack':
+                break;
+            case 'resync_required':
+                this.handleResyncRequired(message);
+                break;
             case 'auto_saved':
                 this.handleAutoSaved(message);
                 break;
@@ -150,6 +174,15 @@ class WebSocketClient {
             case 'error':
                 this.handleError(message);
                 break;
+            case 'correction_job_started':
+            case 'correction_job_status':
+            case 'correction_chunk_result':
+            case 'correction_chunk_error':
+            case 'correction_job_cancelled':
+            case 'correction_job_failed':
+            case 'correction_job_finished':
+                this.handleCorrectionJobUpdate(message);
+                break;
             default:
         }
     }
@@ -163,6 +196,75 @@ class WebSocketClient {
         }
     }
 
+    handleChunksAppended(message) {
+        // Large documents arrive in parts while the server is still chunking them
+        const manager = window.documentManager;
+        if (!manager || !manager.currentDocument || String(manager.currentDocument.id) !== String(message.document_id)) {
+            return;
+        }
+        const current = message.start === 0 ? [] : (manager.documentChunks || []);
+        if (current.length !== message.start) {
+            // Out of step (a part belonged to a superseded pass) - ask for the full list again
+            if (message.done && manager.quillEditor) {
+                this.requestTextChunking(manager.quillEditor.getText(), manager.currentDocument.id, true);
+            }
+            return;
+        }
+        manager.documentChunks = current.concat(message.chunks);
+        manager.displayChunks();
+        manager.updateChunksStatus(message.done
+            ? `Ready (${message.total_chunks} chunks)`
+            : `Chunking... (${manager.documentChunks.length} chunks so far)`);
+    }
+
+    handleChunksPatch(message) {
+        // Apply an incremental chunk update: replace the changed chunks and shift the ones after them
+        const manager = window.documentManager;
+        if (!manager) {
+            return;
+        }
+        const current = manager.documentChunks || [];
+        if (!manager.currentDocument || String(manager.currentDocument.id) !== String(message.document_id)
+            || current.length !== message.previous_total) {
+            // Out of step with the server (e.g. a document was just opened) - ask for the full list
+            if (manager.currentDocument && manager.quillEditor) {
+                this.requestTextChunking(manager.quillEditor.getText(), manager.currentDocument.id, true);
+            }
+            return;
+        }
+
+        const tail = current.slice(message.start + message.removed).map(chunk => ({
+            ...chunk,
+            index: chunk.index + message.index_shift,
+            start: chunk.start + message.position_shift,
+            end: chunk.end + message.position_shift
+        }));
+        manager.documentChunks = current.slice(0, message.start).concat(message.chunks, tail);
+        manager.displayChunks();
+        manager.updateChunksStatus(`Ready (${message.total_chunks} chunks)`);
+    }
+
+    handleResyncRequired(message) {
+        // The server couldn't apply a delta - send the whole value once
+        if (message.base_revision !== null && message.base_revision < (this.lastFullRevision[message.channel] || 0)) {
+            return;  // a full sync was already sent after that delta
+        }
+        delete this.syncState[message.channel];
+
+        const manager = window.documentManager;
+        if (!manager || !manager.currentDocument || !manager.quillEditor
+            || String(manager.currentDocument.id) !== String(message.document_id)) {
+            return;
+        }
+        if (message.channel === 'text') {
+            this.requestTextChunking(manager.quillEditor.getText(), manager.currentDocument.id, true);
+        } else if (message.message_type === 'manual_save') {
+            this.requestManualSave(manager.currentDocument.id, manager.quillEditor.root.innerHTML);
+        } else {
+            this.requestAutoSave(manager.currentDocument.id, manager.quillEditor.root.innerHTML);
+        }
+    }
+
     handleAutoSaved(message) {
         // Auto-save completed silently (no notification needed)
         // Refresh document list to update file sizes
@@ -195,12 +297,76 @@ class WebSocketClient {
         }
     }
 
+    handleCorrectionJobUpdate(message) {
+        // Whole-document correction progress (started with POST /documents/{id}/correct-all)
+        if (window.documentManager) {
+            window.documentManager.handleCorrectionJobUpdate(message);
+        }
+    }
+
+    static diffOps(previous, next) {
+        // One splice covering everything between the common prefix and common suffix
+        const limit = Math.min(previous.length, next.length);
+        let prefix = 0;
+        while (prefix < limit && previous.charCodeAt(prefix) === next.charCodeAt(prefix)) {
+            prefix++;
+        }
+        // Never split a surrogate pair
+        if (prefix > 0 && prefix < limit && (next.charCodeAt(prefix - 1) & 0xFC00) === 0xD800) {
+            prefix--;
+        }
+        let suffix = 0;
+        while (suffix < limit - prefix
+            && previous.charCodeAt(previous.length - 1 - suffix) === next.charCodeAt(next.length - 1 - suffix)) {
+            suffix++;
+        }
+        if (suffix > 0 && (next.charCodeAt(next.length - suffix) & 0xFC00) === 0xDC00) {
+            suffix--;
+        }
+
+        const ops = [];
+        if (prefix > 0) {
+            ops.push({ retain: prefix });
+        }
+        const deleted = previous.length - prefix - suffix;
+        if (deleted > 0) {
+            ops.push({ delete: deleted });
+        }
+        const inserted = next.slice(prefix, next.length - suffix);
+        if (inserted) {
+            ops.push({ insert: inserted });
+        }
+        return ops;
+    }
+
+    buildSyncPayload(channel, field, documentId, value) {
+        // Delta against the last value sent on this channel, or the full value when there is none
+        const previous = this.syncState[channel];
+        const revision = ++this.revisionCounter;
+        this.syncState[channel] = { documentId: documentId, revision: revision, value: value };
+
+        if (previous && previous.documentId === documentId) {
+            return {
+                base_revision: previous.revision,
+                revision: revision,
+                ops: WebSocketClient.diffOps(previous.value, value),
+                length: value.length
+            };
+        }
+        this.lastFullRevision[channel] = revision;
+        return { [field]: value, revision: revision };
+    }
+
     // Public methods for document operations
-    requestTextChunking(text, documentId) {
+    requestTextChunking(text, documentId, full = false) {
+        if (full) {
+            delete this.syncState.text;
+        }
         this.sendMessage({
             type: 'text_changed',
-            text: text,
-            document_id: documentId
+            document_id: documentId,
+            full: full,
+            ...this.buildSyncPayload('text', 'text', documentId, text)
         });
     }
 
@@ -208,7 +374,7 @@ class WebSocketClient {
         this.sendMessage({
             type: 'auto_save',
             document_id: documentId,
-            content: content
+            ...this.buildSyncPayload('content', 'content', documentId, content)
         });
     }
 
@@ -216,7 +382,7 @@ class WebSocketClient {
         this.sendMessage({
             type: 'manual_save',
             document_id: documentId,
-            content: content
+            ...this.buildSyncPayload('content', 'content', documentId, content)
         });
     }
 
@@ -24,6 +24,135 @@ def test_user():
     }
 
 
+def sentencizer_processor():
+    """IntelligentTextProcessor with the rule-based sentencizer backend (no model download)"""
+    from app.utils.text_processor import IntelligentTextProcessor
+    processor = IntelligentTextProcessor(segmenter="sentencizer")
+    processor.nlp.max_length = 2 * 1024 * 1024
+    return processor
+
+
+@pytest.fixture(scope="session")
+def text_processor():
+    return sentencizer_processor()
+
+
+# Integration test users (need PostgreSQL), written through the same async helpers the routes use
+async def _connect():
+    from psycopg import AsyncConnection
+    from app.database.db_config import DB_CONFIG
+    return await AsyncConnection.connect(**DB_CONFIG)
+
+
+def create_database_user(user_data) -> int:
+    """A fresh email user, replacing one an earlier run left behind"""
+    from app.database.async_db import create_user
+    from app.utils.auth_utils import hash_password
+
+    async def create():
+        async with await _connect() as db:
+            await db.execute("DELETE FROM users WHERE email = %s", (user_data["email"],))
+            await db.commit()
+            return await create_user(
+                db,
+                email=user_data["email"],
+                password_hash=hash_password(user_data["password"]),
+                first_name=user_data["first_name"],
+                last_name=user_data["last_name"],
+                privacy_accepted=True,
+                auth_method="email",
+                theme="dark"
+            )
+
+    return asyncio.run(create())
+
+
+def delete_database_user(email: str):
+    """Remove an integration test user and their documents"""
+    async def delete():
+        async with await _connect() as db:
+            await db.execute("DELETE FROM documents WHERE user_id IN (SELECT id FROM users WHERE email = %s)", (email,))
+            await db.execute("DELETE FROM users WHERE email = %s", (email,))
+            await db.commit()
+
+    asyncio.run(delete())
+
+
+# Route unit tests without PostgreSQL
+TEST_USER_ID = 7
+
+
+class FakeAsyncCursor:
+    def __init__(self, db):
+        self.db = db
+        self.rows = []
+
+    async def execute(self, query, params=None):
+        query = " ".join(query.split())
+        self.db.executed.append((query, params))
+        self.rows = list(self.db.respond(query, params))
+
+    async def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    async def fetchall(self):
+        return self.rows
+
+    async def close(self):
+        pass
+
+
+class FakeAsyncConnection:
+    """
+    Stand-in for the psycopg AsyncConnection that get_async_db hands to the routes
+    Every statement is recorded with its whitespace collapsed; subclasses override respond()
+    to return its rows (or raise, e.g. a psycopg error) from whatever state the test needs
+    """
+
+    def __init__(self):
+        self.executed = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    @property
+    def queries(self):
+        return [query for query, _ in self.executed]
+
+    def respond(self, query, params):
+        return []
+
+    def cursor(self):
+        return FakeAsyncCursor(self)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+@pytest.fixture
+def db():
+    """Override in a test module to hand the routes a FakeAsyncConnection subclass"""
+    return FakeAsyncConnection()
+
+
+@pytest.fixture
+def client(db):
+    """TestClient for the documents router, signed in as TEST_USER_ID, on the db fixture's connection"""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.database.async_db import get_async_db
+    from app.dependencies.jwt_current_user import get_current_user
+    from app.routes.documents import router as documents_router
+    app = FastAPI()
+    app.include_router(documents_router, prefix="/documents")
+    app.dependency_overrides[get_async_db] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: {"user_id": TEST_USER_ID}
+    with TestClient(app) as client:
+        yield client
+
+
 # Playwright fixtures
 @pytest.fixture(scope="session")
 def browser_type_launch_args():
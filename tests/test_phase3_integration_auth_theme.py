@@ -9,8 +9,7 @@ import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from app.routes.auth import router as auth_router
-from app.utils.auth_utils import hash_password
-from app.database.db_config import get_db_connection, create_user, get_user_by_email
+from tests.conftest import create_database_user, delete_database_user
 
 
 @pytest.fixture
@@ -23,8 +22,9 @@ def test_app():
 
 @pytest.fixture
 def client(test_app):
-    """Create a test client for testing"""
-    return TestClient(test_app)
+    """Create a test client for testing (one event loop for the async DB pool)"""
+    with TestClient(test_app) as client:
+        yield client
 
 
 @pytest.fixture
@@ -41,40 +41,12 @@ def test_user_data():
 @pytest.fixture
 def setup_test_user(test_user_data):
     """Create a test user in the database before tests"""
-    db = get_db_connection()
+    user_id = create_database_user(test_user_data)
     try:
-        # Check if user already exists
-        existing_user = get_user_by_email(db, test_user_data["email"])
-        if existing_user:
-            # User exists, clean up
-            cursor = db.cursor()
-            cursor.execute("DELETE FROM users WHERE email = %s", (test_user_data["email"],))
-            db.commit()
-            cursor.close()
-        
-        # Create new test user
-        password_hash = hash_password(test_user_data["password"])
-        user_id = create_user(
-            db=db,
-            email=test_user_data["email"],
-            password_hash=password_hash,
-            first_name=test_user_data["first_name"],
-            last_name=test_user_data["last_name"],
-            privacy_accepted=True,
-            auth_method="email",
-            theme="dark"
-        )
         yield user_id
     finally:
         # Clean up test user
-        try:
-            cursor = db.cursor()
-            cursor.execute("DELETE FROM users WHERE email = %s", (test_user_data["email"],))
-            db.commit()
-            cursor.close()
-        except Exception:
-            pass
-        db.close()
+        delete_database_user(test_user_data["email"])
 
 
 @pytest.mark.integration
@@ -0,0 +1,210 @@
+"""
+Phase 5: Performance Benchmarks for document chunking
+Tests: keystroke-to-chunks message latency on a 1 MB document, full reparse (streamed) vs incremental re-chunking;
+       per-keystroke payload size and parse cost, full text vs delta sync;
+       event-loop stalls while chunking inline vs in the process pool;
+       bulk chunking throughput, one nlp() call per document vs nlp.pipe batches;
+       memory held by the chunks of a 1 MB document
+Tool: pytest, time.perf_counter (blank English pipeline + sentencizer; en_core_web_sm widens the gap)
+Run with: pytest tests/test_phase5_performance_chunking.py -v -s
+"""
+
+import asyncio
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+import pytest
+import app.utils.text_processor as text_processor_module
+from app.utils.chunking_pool import ChunkingExecutor
+from app.utils.document_sync import DocumentBuffer
+from app.utils.websocket_manager import WebSocketManager
+from tests.conftest import sentencizer_processor
+
+
+SENTENCE = "The students wrote their essays about climate change in Rwanda and the teacher read them carefully. "
+
+
+def one_megabyte_document():
+    paragraphs = [SENTENCE * 6 + "\n\n" for _ in range(1800)]
+    # Just under the 1 MB limit, leaving room for the simulated keystrokes
+    return "".join(paragraphs)[:1024 * 1024 - 1024]
+
+
+class TimingWebSocket:
+    """Records when each message would have left the server"""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, data):
+        self.sent.append((time.perf_counter(), json.loads(data)))
+
+
+@pytest.mark.performance
+class TestChunkingLatency:
+    """Keystroke-to-chunks latency through WebSocketManager"""
+
+    async def test_keystroke_latency_on_1mb_document(self, text_processor, monkeypatch):
+        monkeypatch.setattr(text_processor_module, "_text_processor", text_processor)
+        manager = WebSocketManager(ChunkingExecutor(mode="inline", processor_factory=lambda: text_processor))
+        websocket = TimingWebSocket()
+        await manager.connect(websocket, "1")
+
+        rng = random.Random(0)
+        text = one_megabyte_document()
+        await manager.process_text_chunking("1", text, 7, full=True)
+
+        def keystroke(current):
+            position = rng.randrange(len(current))
+            return current[:position] + "x" + current[position:]
+
+        full_latencies = []
+        first_part_latencies = []
+        for _ in range(3):
+            text = keystroke(text)
+            sent_before = len(websocket.sent)
+            started = time.perf_counter()
+            await manager.process_text_chunking("1", text, 7, full=True)
+            full_latencies.append(websocket.sent[-1][0] - started)
+            first_part_latencies.append(websocket.sent[sent_before][0] - started)
+            assert websocket.sent[-1][1]["type"] == "chunks_appended" and websocket.sent[-1][1]["done"]
+
+        incremental_latencies = []
+        for _ in range(30):
+            text = keystroke(text)
+            started = time.perf_counter()
+            await manager.process_text_chunking("1", text, 7)
+            incremental_latencies.append(websocket.sent[-1][0] - started)
+            assert websocket.sent[-1][1]["type"] == "chunks_patch"
+
+        full_ms = statistics.median(full_latencies) * 1000
+        incremental_ms = statistics.median(incremental_latencies) * 1000
+        print(f"\n1 MB document, keystroke -> chunks message: full {full_ms:.1f} ms "
+              f"(first chunks after {statistics.median(first_part_latencies) * 1000:.1f} ms), "
+              f"incremental {incremental_ms:.1f} ms (p50), {max(incremental_latencies) * 1000:.1f} ms (max)")
+
+        # Incremental state stays identical to a full pass
+        assert manager.chunking_states["1"][1].chunks == text_processor.chunk_document(text).chunks
+        assert incremental_ms * 10 < full_ms
+
+
+@pytest.mark.performance
+class TestDeltaSyncCost:
+    """Per-keystroke wire cost of full-text vs delta messages"""
+
+    def test_delta_payload_on_1mb_document(self):
+        text = one_megabyte_document()
+        position = len(text) // 2
+        edited = text[:position] + "x" + text[position:]
+
+        full_message = json.dumps({"type": "text_changed", "document_id": 7, "text": edited, "revision": 2})
+        delta_message = json.dumps({
+            "type": "text_changed", "document_id": 7, "base_revision": 1, "revision": 2,
+            "ops": [{"retain": position}, {"insert": "x"}], "length": len(edited)
+        })
+
+        started = time.perf_counter()
+        json.loads(full_message)
+        full_parse_ms = (time.perf_counter() - started) * 1000
+
+        buffer = DocumentBuffer(7, text, revision=1)
+        started = time.perf_counter()
+        parsed = json.loads(delta_message)
+        buffer.apply(parsed["base_revision"], parsed["revision"], parsed["ops"], parsed["length"])
+        delta_ms = (time.perf_counter() - started) * 1000
+
+        print(f"\n1 MB document, one keystroke: full message {len(full_message)} bytes ({full_parse_ms:.2f} ms to parse), "
+              f"delta {len(delta_message)} bytes ({delta_ms:.2f} ms to parse and apply)")
+        assert buffer.text == edited
+        assert len(delta_message) * 1000 < len(full_message)
+
+
+async def max_loop_stall(work):
+    """Longest gap between 5 ms heartbeats while `work` runs, in ms"""
+    stalls = []
+    done = asyncio.Event()
+
+    async def heartbeat():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.005)
+            stalls.append(time.perf_counter() - started - 0.005)
+
+    beat = asyncio.ensure_future(heartbeat())
+    await asyncio.sleep(0.02)
+    result = await work
+    done.set()
+    await beat
+    return max(stalls) * 1000, result
+
+
+@pytest.mark.performance
+class TestChunkingExecutor:
+    """Event-loop responsiveness while a 1 MB document is chunked"""
+
+    async def test_process_pool_keeps_loop_responsive(self):
+        text = one_megabyte_document()
+        inline = ChunkingExecutor(mode="inline", processor_factory=sentencizer_processor)
+        pool = ChunkingExecutor(mode="process", pool_size=1, processor_factory=sentencizer_processor)
+        try:
+            await pool.chunk_document("Warm up the worker.")
+
+            inline_stall, inline_state = await max_loop_stall(inline.chunk_document(text))
+            pool_stall, pool_state = await max_loop_stall(pool.chunk_document(text))
+        finally:
+            pool.shutdown()
+
+        print(f"\n1 MB document, longest event-loop stall: inline {inline_stall:.1f} ms, process pool {pool_stall:.1f} ms")
+        assert pool_state.chunks == inline_state.chunks
+        assert pool_stall * 5 < inline_stall
+
+
+def dataset_inputs():
+    """Learner texts from cbc_dataset.jsonl"""
+    path = Path(__file__).resolve().parent.parent / "cbc_dataset.jsonl"
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["input"] for line in f if line.strip()]
+
+
+@pytest.mark.performance
+class TestBatchChunking:
+    """Bulk chunking of the training dataset inputs"""
+
+    def test_pipe_chunks_throughput(self, text_processor):
+        texts = dataset_inputs() * 4
+
+        started = time.perf_counter()
+        single = [text_processor.create_intelligent_chunks(text) for text in texts]
+        single_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        batched = list(text_processor.pipe_chunks(texts, batch_size=256))
+        batched_seconds = time.perf_counter() - started
+
+        print(f"\n{len(texts)} documents: one at a time {len(texts) / single_seconds:.0f} docs/s, "
+              f"nlp.pipe {len(texts) / batched_seconds:.0f} docs/s")
+        assert batched == single
+        assert batched_seconds < single_seconds
+
+
+@pytest.mark.performance
+class TestChunkMemory:
+    """Chunks are offset views into the document, not copies of it"""
+
+    def test_chunks_of_1mb_document(self, text_processor):
+        text = one_megabyte_document()
+        sentences = text_processor.parse_sentences(text)
+
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        state = text_processor_module.build_chunking_state(text, 200, sentences)
+        chunk_bytes = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+
+        copied_bytes = sum(len(chunk.text) for chunk in state.chunks)
+        print(f"\n1 MB document, {len(state.chunks)} chunks: {chunk_bytes / 1024:.0f} KB held by chunks "
+              f"(their text would be {copied_bytes / 1024:.0f} KB)")
+        assert chunk_bytes * 5 < len(text)
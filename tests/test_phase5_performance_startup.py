@@ -0,0 +1,111 @@
+"""
+Phase 5: Performance Benchmarks for application startup
+Tests: import time of app.main (no spaCy import), cold start of the lifespan with the model
+       loading in the background, readiness reporting of startup steps
+Tool: pytest, subprocess, time.perf_counter, FastAPI TestClient
+Run with: pytest tests/test_phase5_performance_startup.py -v -s
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+import pytest
+from fastapi.testclient import TestClient
+
+IMPORT_BUDGET_SECONDS = 2.0
+COLD_START_BUDGET_SECONDS = 1.0
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+IMPORT_PROBE = """
+import sys, time
+started = time.perf_counter()
+import app.main
+print(time.perf_counter() - started)
+print("spacy" in sys.modules)
+"""
+
+
+@pytest.mark.performance
+class TestStartup:
+    """Import-time and cold-start budgets"""
+
+    def test_import_time_budget(self):
+        """Importing the app doesn't import spaCy, load models or touch the database"""
+        env = dict(os.environ, AUTH_SECRET=os.environ.get("AUTH_SECRET", "test"))
+        result = subprocess.run([sys.executable, "-c", IMPORT_PROBE], cwd=PROJECT_ROOT, env=env,
+                                capture_output=True, text=True, timeout=60)
+        assert result.returncode == 0, result.stderr
+        seconds, spacy_imported = result.stdout.split()
+
+        print(f"\nimport app.main: {float(seconds) * 1000:.0f} ms")
+        assert spacy_imported == "False"
+        assert float(seconds) < IMPORT_BUDGET_SECONDS
+
+    def test_cold_start_does_not_wait_for_model(self, monkeypatch):
+        """The lifespan finishes while spaCy is still loading; readiness shows what is pending"""
+        import app.main as main
+        import app.utils.warmup as warmup
+        from app.utils.readiness import ReadinessTracker
+
+        schema_calls = []
+        model_loaded = asyncio.Event()
+
+        async def slow_warm_up():
+            await asyncio.sleep(30)
+            model_loaded.set()
+
+        async def open_pool():
+            pass
+
+        tracker = ReadinessTracker()
+        monkeypatch.setattr(main, "readiness", tracker)
+        monkeypatch.setattr(main, "run_migrations", lambda: schema_calls.append(1))
+        monkeypatch.setattr(main.chunking_executor, "warm_up", slow_warm_up)
+        monkeypatch.setattr(main, "start_warm_up", lambda tracker: warmup.start_warm_up(tracker, open_pool=open_pool))
+
+        started = time.perf_counter()
+        with TestClient(main.app) as client:
+            cold_start = time.perf_counter() - started
+            report = tracker.report()
+            response = client.get("/openapi.json")
+
+        print(f"\ncold start (lifespan startup): {cold_start * 1000:.0f} ms")
+        assert schema_calls == [1]
+        assert response.status_code == 200
+        assert report["components"]["database_schema"]["status"] == "ready"
+        assert report["components"]["spacy"]["status"] == "pending"
+        assert report["components"]["database_pool"]["status"] == "ready"
+        assert not report["ready"]
+        assert not model_loaded.is_set()
+        assert cold_start < COLD_START_BUDGET_SECONDS
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestReadinessTracker:
+    """Unit tests for ReadinessTracker"""
+
+    async def test_failed_step_is_reported_not_raised(self):
+        from app.utils.readiness import ReadinessTracker
+        tracker = ReadinessTracker()
+
+        async def fail():
+            raise OSError("connection refused")
+
+        async def succeed():
+            pass
+
+        assert not await tracker.run("database_schema", fail)
+        assert await tracker.run("spacy", succeed)
+        assert await tracker.run("warm_cache", fail, required=False) is False
+
+        report = tracker.report()
+        assert not report["ready"]
+        assert report["components"]["database_schema"]["error"] == "OSError: connection refused"
+
+        await tracker.run("database_schema", succeed)
+        assert tracker.ready
@@ -0,0 +1,190 @@
+"""
+Phase 5: Performance Benchmarks for document uploads
+Tests: peak traced memory of 100 concurrent uploads, whole-file read + decode vs block-wise
+       streaming with incremental UTF-8 decoding; early abort of an oversized upload;
+       import throughput (files/sec), one /upload call per file vs /bulk-upload
+Tool: pytest, tracemalloc, asyncio, FastAPI TestClient (fake database with a fixed round-trip time)
+Run with: pytest tests/test_phase5_performance_upload.py -v -s
+"""
+
+import asyncio
+import io
+import time
+import tracemalloc
+import zipfile
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.database.async_db import get_async_db
+from app.dependencies.jwt_current_user import get_current_user
+from app.routes.documents import router as documents_router
+from app.utils.upload_utils import TooLarge, read_text_upload
+from tests.conftest import TEST_USER_ID, FakeAsyncConnection, FakeAsyncCursor
+
+CONCURRENT_UPLOADS = 100
+UPLOAD_BYTES = 256 * 1024
+IMPORT_FILES = 100
+DB_ROUND_TRIP_SECONDS = 0.002  # a database on the same network
+SENTENCE = "The students wrote their essays about climate change in Rwanda. "
+
+
+class NetworkFile:
+    """UploadFile stand-in whose reads yield to the event loop, so uploads interleave"""
+
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.offset = 0
+        self.size = None  # not known up front, as with chunked transfer encoding
+
+    async def read(self, size=-1):
+        await asyncio.sleep(0)
+        end = len(self.data) if size < 0 else self.offset + size
+        # Reading from the spooled upload file returns a fresh copy of the bytes
+        block = self.data[self.offset:end].tobytes()
+        self.offset += len(block)
+        return block
+
+
+async def store(text: str):
+    """Stands in for the INSERT: every upload is in flight at the same time"""
+    await asyncio.sleep(0.01)
+
+
+async def whole_file_upload(file: NetworkFile) -> int:
+    """The previous upload path: read everything, check the size, decode"""
+    content = await file.read()
+    if len(content) > 1024 * 1024:
+        raise TooLarge("File size exceeds 1MB limit")
+    text_content = content.decode("utf-8")
+    await store(text_content)
+    return len(text_content)
+
+
+async def streaming_upload(file: NetworkFile) -> int:
+    text_content = await read_text_upload(file)
+    await store(text_content)
+    return len(text_content)
+
+
+def peak_memory(upload, payload: bytes) -> int:
+    files = [NetworkFile(payload) for _ in range(CONCURRENT_UPLOADS)]
+
+    async def run():
+        return await asyncio.gather(*[upload(file) for file in files])
+
+    tracemalloc.start()
+    try:
+        sizes = asyncio.run(run())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert sizes == [len(payload)] * CONCURRENT_UPLOADS
+    return peak
+
+
+@pytest.mark.performance
+class TestUploadMemory:
+    """Memory profile of concurrent uploads"""
+
+    def test_concurrent_upload_peak_memory(self):
+        payload = (SENTENCE * (UPLOAD_BYTES // len(SENTENCE) + 1)).encode("utf-8")[:UPLOAD_BYTES]
+        whole = peak_memory(whole_file_upload, payload)
+        streaming = peak_memory(streaming_upload, payload)
+
+        total = CONCURRENT_UPLOADS * UPLOAD_BYTES
+        print(f"\n{CONCURRENT_UPLOADS} concurrent uploads of {UPLOAD_BYTES // 1024} KB ({total / 2**20:.0f} MB of text)")
+        print(f"  whole file + decode: peak {whole / 2**20:7.1f} MB ({whole / total:.2f}x payload)")
+        print(f"  streaming blocks:    peak {streaming / 2**20:7.1f} MB ({streaming / total:.2f}x payload)")
+        # Only the decoded text outlives the read; the whole-file path also keeps the raw bytes
+        assert streaming < whole * 0.75
+
+    async def test_oversized_upload_is_cut_off_early(self):
+        file = NetworkFile(b"x" * (10 * 1024 * 1024))
+        with pytest.raises(TooLarge):
+            await read_text_upload(file)
+        print(f"\n10 MB upload rejected after reading {file.offset / 2**20:.2f} MB")
+        assert file.offset <= 1024 * 1024 + 64 * 1024
+
+
+class LatencyCursor(FakeAsyncCursor):
+    """Every statement costs one database round trip"""
+
+    async def execute(self, query, params=None):
+        await asyncio.sleep(DB_ROUND_TRIP_SECONDS)
+        await super().execute(query, params)
+
+
+class LatencyConnection(FakeAsyncConnection):
+    """Stores the inserted titles; statements and commits each cost a round trip"""
+
+    def __init__(self):
+        super().__init__()
+        self.titles = []
+
+    @property
+    def round_trips(self):
+        return len(self.executed) + self.commits
+
+    def respond(self, query, params):
+        if not query.startswith("INSERT"):
+            return []
+        titles = params[1] if isinstance(params[1], list) else [params[1]]
+        rows = [(len(self.titles) + i + 1, title) for i, title in enumerate(titles)]
+        self.titles.extend(titles)
+        return rows
+
+    def cursor(self):
+        return LatencyCursor(self)
+
+    async def commit(self):
+        await asyncio.sleep(DB_ROUND_TRIP_SECONDS)
+        await super().commit()
+
+
+@pytest.mark.performance
+class TestImportThroughput:
+    """Importing a class set of essays"""
+
+    def test_bulk_upload_throughput(self):
+        essays = [(f"Student {i}.txt", (SENTENCE * 30).encode("utf-8")) for i in range(IMPORT_FILES)]
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+            for name, data in essays:
+                zf.writestr(name, data)
+
+        def run(send):
+            db = LatencyConnection()
+            app = FastAPI()
+            app.include_router(documents_router, prefix="/documents")
+            app.dependency_overrides[get_async_db] = lambda: db
+            app.dependency_overrides[get_current_user] = lambda: {"user_id": TEST_USER_ID}
+            with TestClient(app) as client:
+                started = time.perf_counter()
+                send(client)
+                elapsed = time.perf_counter() - started
+            assert len(db.titles) == IMPORT_FILES
+            return IMPORT_FILES / elapsed, db.round_trips
+
+        def one_by_one(client):
+            for name, data in essays:
+                assert client.post("/documents/upload", files={"file": (name, data, "text/plain")}).status_code == 201
+
+        def bulk_files(client):
+            files = [("files", (name, data, "text/plain")) for name, data in essays]
+            assert client.post("/documents/bulk-upload", files=files).status_code == 201
+
+        def bulk_zip(client):
+            files = [("files", ("class.zip", archive.getvalue(), "application/zip"))]
+            assert client.post("/documents/bulk-upload", files=files).status_code == 201
+
+        single_rate, single_trips = run(one_by_one)
+        files_rate, files_trips = run(bulk_files)
+        zip_rate, zip_trips = run(bulk_zip)
+
+        print(f"\nImporting {IMPORT_FILES} essays ({DB_ROUND_TRIP_SECONDS * 1000:.0f} ms per database round trip)")
+        print(f"  /upload per file:     {single_rate:8.0f} files/s  {single_trips:4d} round trips")
+        print(f"  /bulk-upload (files): {files_rate:8.0f} files/s  {files_trips:4d} round trips")
+        print(f"  /bulk-upload (zip):   {zip_rate:8.0f} files/s  {zip_trips:4d} round trips")
+        assert files_trips == zip_trips == 3
+        assert files_rate > single_rate * 3
+        assert zip_rate > single_rate * 3
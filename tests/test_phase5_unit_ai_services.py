@@ -0,0 +1,284 @@
+"""
+Phase 5: Unit Tests for the async AI client
+Tests: response parsing, error mapping, keep-alive client reuse, per-endpoint concurrency limits
+Tool: pytest, pytest-asyncio, httpx.MockTransport
+Run with: pytest tests/test_phase5_unit_ai_services.py -v
+"""
+
+import asyncio
+import json
+import re
+import time
+import httpx
+import pytest
+from app.utils.ai_services import AIServices
+from app.utils.correction_cache import CorrectionCache
+from app.utils.translation_memory import TranslationMemory
+
+
+def regex_sentence_spans(text):
+    """Lightweight splitter so tests don't need the spaCy model"""
+    return [match.span() for match in re.finditer(r'[^.!?\s][^.!?]*[.!?]?', text)]
+
+
+def make_services(handler):
+    """AIServices wired to an in-memory transport instead of the HF endpoints"""
+    return AIServices(
+        transport=httpx.MockTransport(handler),
+        correction_cache=CorrectionCache(persistent=False),
+        translation_memory=TranslationMemory(persistent=False, splitter=regex_sentence_spans)
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestAIServices:
+    """Unit tests for AIServices"""
+
+    async def test_correction_and_feedback(self):
+        """Correction newlines are stripped and feedback passed through"""
+        def handler(request):
+            return httpx.Response(200, json=[{"correction": "I am happy.\n\n", "feedback": "Good work!"}])
+
+        services = make_services(handler)
+        correction, feedback, error = await services.get_correction_and_feedback("i am happy")
+
+        assert error is None
+        assert correction == "I am happy."
+        assert feedback == "Good work!"
+        await services.aclose()
+
+    async def test_model_loading_error(self):
+        """503 responses are mapped to the model loading message"""
+        services = make_services(lambda request: httpx.Response(503))
+        correction, feedback, error = await services.get_correction_and_feedback("text")
+
+        assert correction is None
+        assert error == "Service unavailable: Model is loading"
+        await services.aclose()
+
+    async def test_timeout_error(self):
+        """Transport timeouts are reported instead of raised"""
+        def handler(request):
+            raise httpx.ReadTimeout("timed out", request=request)
+
+        services = make_services(handler)
+        translation, error = await services.translate_to_kinyarwanda("Hello")
+
+        assert translation is None
+        assert error == "Request timeout: Model took too long to respond"
+        await services.aclose()
+
+    async def test_client_is_reused(self):
+        """All calls share one keep-alive client"""
+        services = make_services(lambda request: httpx.Response(200, json=[{"translation_text": "Muraho"}]))
+        await services.translate_to_kinyarwanda("Hello")
+        first_client = services._client
+        await services.translate_to_kinyarwanda("Hello")
+
+        assert services._client is first_client
+        await services.aclose()
+        assert services._client is None
+
+    async def test_per_endpoint_concurrency_limit(self):
+        """No more than the configured number of requests reach an endpoint at once"""
+        in_flight = 0
+        peak = 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return httpx.Response(200, json=[{"translation_text": "Muraho"}])
+
+        services = make_services(handler)
+        services.endpoint_concurrency[services.nllb_endpoint] = 2
+        results = await asyncio.gather(*[services.translate_to_kinyarwanda(f"Hello {i}") for i in range(6)])
+
+        assert all(error is None for _, error in results)
+        assert peak == 2
+        await services.aclose()
+
+    async def test_correction_cache_skips_network(self):
+        """Repeated text (modulo whitespace) is served from the correction cache"""
+        calls = 0
+
+        def handler(request):
+            nonlocal calls
+            calls += 1
+            return httpx.Response(200, json=[{"correction": "I am happy.", "feedback": "Good work!"}])
+
+        services = make_services(handler)
+        await services.get_correction_and_feedback("i am  happy")
+        correction, feedback, error = await services.get_correction_and_feedback(" i am happy\n")
+
+        assert calls == 1
+        assert (correction, feedback, error) == ("I am happy.", "Good work!", None)
+        assert services.stats()["correction_cache"]["hits"] == 1
+        await services.aclose()
+
+    async def test_errors_are_not_cached(self):
+        """Failed calls are retried on the next request"""
+        calls = 0
+
+        def handler(request):
+            nonlocal calls
+            calls += 1
+            return httpx.Response(503)
+
+        services = make_services(handler)
+        await services.get_correction_and_feedback("text")
+        await services.get_correction_and_feedback("text")
+
+        assert calls == 2
+        await services.aclose()
+
+    async def test_translation_memory_sends_only_new_sentences(self):
+        """Known sentences are served locally; unknown ones go out in one batched request"""
+        batches = []
+
+        def handler(request):
+            inputs = json.loads(request.content)["inputs"]
+            batches.append(inputs)
+            return httpx.Response(200, json=[{"translation_text": f"<{text}>"} for text in inputs])
+
+        services = make_services(handler)
+        first, error = await services.translate_to_kinyarwanda("Hello there. How are you?")
+        assert error is None
+        assert first == "<Hello there.> <How are you?>"
+
+        second, error = await services.translate_to_kinyarwanda("How are you?\n\nI am fine. Hello there.")
+        assert error is None
+        assert second == "<How are you?>\n\n<I am fine.> <Hello there.>"
+        assert batches == [["Hello there.", "How are you?"], ["I am fine."]]
+        await services.aclose()
+
+    async def test_translation_directions_are_separate(self):
+        """Memory entries are keyed by language pair"""
+        calls = 0
+
+        def handler(request):
+            nonlocal calls
+            calls += 1
+            return httpx.Response(200, json=[{"translation_text": "Muraho"}])
+
+        services = make_services(handler)
+        await services.translate_to_kinyarwanda("Hello.")
+        await services.translate_to_english("Hello.")
+
+        assert calls == 2
+        await services.aclose()
+
+    async def test_sentence_splitting_does_not_block_the_event_loop(self):
+        """A slow segmenter runs in a worker thread while other coroutines keep going"""
+        def slow_splitter(text):
+            time.sleep(0.3)  # stands in for a spaCy parse of a long text
+            return regex_sentence_spans(text)
+
+        services = AIServices(
+            transport=httpx.MockTransport(lambda request: httpx.Response(200, json=[{"translation_text": "Muraho."}])),
+            correction_cache=CorrectionCache(persistent=False),
+            translation_memory=TranslationMemory(persistent=False, splitter=slow_splitter)
+        )
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.ensure_future(ticker())
+        result = await services.translate_to_kinyarwanda("Hello.")
+        ticking.cancel()
+
+        assert result == ("Muraho.", None)
+        # Blocking the loop for the whole parse would leave the ticker at one or two ticks
+        assert ticks >= 10
+        await services.aclose()
+
+    async def test_identical_concurrent_requests_are_coalesced(self):
+        """Concurrent identical corrections share one upstream call"""
+        calls = 0
+        release = asyncio.Event()
+
+        async def handler(request):
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return httpx.Response(200, json=[{"correction": "I am happy.", "feedback": "Good work!"}])
+
+        services = make_services(handler)
+        pending = [asyncio.ensure_future(services.get_correction_and_feedback("i am  happy")) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        release.set()
+        results = await asyncio.gather(*pending)
+
+        assert calls == 1
+        assert all(result == ("I am happy.", "Good work!", None) for result in results)
+        assert services.stats()["single_flight"] == {"coalesced_calls": 4, "in_flight": 0}
+        await services.aclose()
+
+    async def test_translations_that_normalize_alike_are_coalesced(self):
+        """Whitespace and Unicode-form variants of one text share one upstream call"""
+        calls = 0
+        release = asyncio.Event()
+
+        async def handler(request):
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return httpx.Response(200, json=[{"translation_text": "Muraho."}])
+
+        services = make_services(handler)
+        variants = ["Hello café.", "Hello café. ", "  Hello\ncafe\u0301."]  # the last one is NFD
+        pending = [asyncio.ensure_future(services.translate_to_kinyarwanda(text)) for text in variants]
+        await asyncio.sleep(0.01)
+        release.set()
+        results = await asyncio.gather(*pending)
+
+        assert calls == 1
+        assert results == [("Muraho.", None)] * 3
+        assert services.stats()["single_flight"]["coalesced_calls"] == 2
+        await services.aclose()
+
+    async def test_cancelled_caller_does_not_cancel_shared_call(self):
+        """A caller that goes away leaves the shared request running for the others"""
+        release = asyncio.Event()
+
+        async def handler(request):
+            await release.wait()
+            return httpx.Response(200, json=[{"translation_text": "Muraho"}])
+
+        services = make_services(handler)
+        first = asyncio.ensure_future(services.translate_to_kinyarwanda("Hello."))
+        second = asyncio.ensure_future(services.translate_to_kinyarwanda("Hello."))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        release.set()
+
+        assert await second == ("Muraho", None)
+        await services.aclose()
+
+    async def test_corrections_are_micro_batched(self):
+        """Distinct concurrent chunks go out as one batched request and fan back out"""
+        batches = []
+
+        def handler(request):
+            inputs = json.loads(request.content)["inputs"]
+            batches.append(inputs)
+            if isinstance(inputs, str):
+                inputs = [inputs]
+            return httpx.Response(200, json=[{"correction": text.upper(), "feedback": "ok"} for text in inputs])
+
+        services = make_services(handler)
+        results = await asyncio.gather(*[services.get_correction_and_feedback(f"chunk {i}") for i in range(3)])
+
+        assert batches == [["chunk 0", "chunk 1", "chunk 2"]]
+        assert [correction for correction, _, _ in results] == ["CHUNK 0", "CHUNK 1", "CHUNK 2"]
+        stats = services.stats()["correction_batching"]
+        assert stats["batches_sent"] == 1
+        assert stats["avg_batch_size"] == 3
+        await services.aclose()
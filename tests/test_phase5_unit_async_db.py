@@ -0,0 +1,70 @@
+"""
+Phase 5: Unit Tests for the async database pool
+Tests: pool created with a connection check on checkout, one pool per event loop,
+       pool metrics (in use, waiting, mean checkout latency), /documents/db-pool-stats
+Tool: pytest, pytest-asyncio
+Run with: pytest tests/test_phase5_unit_async_db.py -v
+"""
+
+import pytest
+from psycopg_pool import AsyncConnectionPool
+import app.database.async_db as async_db_module
+from app.database.async_db import AsyncDatabase
+
+
+class RecordingPool:
+    """AsyncConnectionPool stand-in that keeps its arguments and never connects"""
+
+    check_connection = AsyncConnectionPool.check_connection
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.closed = True
+        self.stats = {"pool_min": 1, "pool_max": 4, "pool_size": 3, "pool_available": 1, "requests_waiting": 2}
+
+    def get_stats(self):
+        return self.stats
+
+    async def open(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def database(monkeypatch):
+    monkeypatch.setattr(async_db_module, "AsyncConnectionPool", RecordingPool)
+    return AsyncDatabase(min_size=1, max_size=4, timeout=2.0)
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestAsyncDatabase:
+    """Unit tests for AsyncDatabase"""
+
+    async def test_connections_are_checked_on_checkout(self, database):
+        pool = await database.get_pool()
+        assert pool.kwargs["check"] is AsyncConnectionPool.check_connection
+        assert (pool.kwargs["min_size"], pool.kwargs["max_size"], pool.kwargs["timeout"]) == (1, 4, 2.0)
+        assert not pool.closed
+
+    async def test_pool_is_reused_on_the_same_loop(self, database):
+        assert await database.get_pool() is await database.get_pool()
+        await database.close()
+        assert database.stats() == {}
+
+    async def test_stats_report_in_use_waiting_and_checkout_latency(self, database):
+        pool = await database.get_pool()
+        assert database.stats() == {
+            "pool_size": 3, "max_size": 4, "in_use": 2, "available": 1, "waiting": 2,
+            "checkouts": 0, "avg_checkout_ms": 0.0, "checkout_timeouts": 0, "connections_lost": 0,
+        }
+        pool.stats.update(requests_num=8, requests_wait_ms=20, requests_errors=1, connections_lost=2)
+        stats = database.stats()
+        assert (stats["checkouts"], stats["avg_checkout_ms"]) == (8, 2.5)
+        assert (stats["checkout_timeouts"], stats["connections_lost"]) == (1, 2)
+
+    def test_stats_route(self, client, monkeypatch):
+        monkeypatch.setattr(async_db_module.async_db, "stats", lambda: {"in_use": 2, "waiting": 0})
+        assert client.get("/documents/db-pool-stats").json() == {"in_use": 2, "waiting": 0}
@@ -0,0 +1,70 @@
+"""
+Phase 5: Unit Tests for the micro-batching scheduler
+Tests: batch size limit, time window, queue depth limit, error fan-out
+Tool: pytest, pytest-asyncio
+Run with: pytest tests/test_phase5_unit_batch_scheduler.py -v
+"""
+
+import asyncio
+import pytest
+from app.utils.batch_scheduler import MicroBatcher, QueueFullError
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestMicroBatcher:
+    """Unit tests for MicroBatcher"""
+
+    async def test_full_batches_are_sent_immediately(self):
+        """Reaching max_batch_size dispatches without waiting for the window"""
+        batches = []
+
+        async def send(items):
+            batches.append(list(items))
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher(send, max_batch_size=2, window_ms=10_000)
+        results = await asyncio.wait_for(asyncio.gather(*[batcher.submit(i) for i in range(4)]), timeout=1)
+
+        assert results == [0, 2, 4, 6]
+        assert batches == [[0, 1], [2, 3]]
+
+    async def test_window_flushes_partial_batch(self):
+        """A lone request is sent once the window elapses"""
+        async def send(items):
+            return items
+
+        batcher = MicroBatcher(send, max_batch_size=8, window_ms=5)
+        assert await asyncio.wait_for(batcher.submit("x"), timeout=1) == "x"
+        assert batcher.stats()["batches_sent"] == 1
+
+    async def test_queue_depth_limit(self):
+        """Requests beyond max_queue_depth are rejected"""
+        release = asyncio.Event()
+
+        async def send(items):
+            await release.wait()
+            return items
+
+        batcher = MicroBatcher(send, max_batch_size=8, window_ms=1000, max_queue_depth=2)
+        pending = [asyncio.ensure_future(batcher.submit(i)) for i in range(2)]
+        await asyncio.sleep(0)
+
+        with pytest.raises(QueueFullError):
+            await batcher.submit(3)
+        assert batcher.stats()["rejected"] == 1
+
+        release.set()
+        batcher.window_ms = 0
+        batcher._wakeup.set()
+        assert await asyncio.wait_for(asyncio.gather(*pending), timeout=1) == [0, 1]
+
+    async def test_errors_reach_every_caller(self):
+        """A failed batch fails all of its callers"""
+        async def send(items):
+            raise RuntimeError("endpoint down")
+
+        batcher = MicroBatcher(send, max_batch_size=2, window_ms=5)
+        results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+        assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,212 @@
+"""
+Phase 5: Unit Tests for bulk document import
+Tests: ZIP entry extraction and validation, title collision resolution (shortened long titles included),
+       size-bounded insert batches, per-file results, retry after a concurrent title conflict
+Tool: pytest, FastAPI TestClient (in-memory fake async database connection)
+Run with: pytest tests/test_phase5_unit_bulk_upload.py -v
+"""
+
+import io
+import re
+import zipfile
+import pytest
+from psycopg.errors import UniqueViolation
+import app.routes.documents as documents_routes
+from app.utils.upload_utils import insert_batches, read_zip_texts, resolve_titles, title_stem
+from tests.conftest import FakeAsyncConnection
+
+
+def make_zip(entries):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in entries.items():
+            zf.writestr(name, data)
+    return buffer.getvalue()
+
+
+def like(pattern, text):
+    """PostgreSQL LIKE with its default backslash escape"""
+    regex = "".join(
+        re.escape(part[1]) if part.startswith("\\") else ".*" if part == "%" else "." if part == "_" else re.escape(part)
+        for part in re.findall(r"\\.|[%_]|[^\\%_]+", pattern)
+    )
+    return re.fullmatch(regex, text, re.DOTALL) is not None
+
+
+class DocumentsDatabase(FakeAsyncConnection):
+    """The user's titles, with the unique (user_id, title) index"""
+
+    def __init__(self, titles=()):
+        super().__init__()
+        self.titles = list(titles)
+        self.lookups = []
+        self.inserted = []
+        self.conflicts = 0  # INSERTs that fail as if a concurrent request took a title
+
+    def respond(self, query, params):
+        if query.startswith("SELECT title FROM documents"):
+            _, names, patterns = params
+            self.lookups.append((names, patterns))
+            return [(title,) for title in self.titles if title in names or any(like(p, title) for p in patterns)]
+        if query.startswith("INSERT INTO documents"):
+            _, titles, contents = params
+            if self.conflicts or any(title in self.titles for title in titles):
+                self.conflicts = max(self.conflicts - 1, 0)
+                raise UniqueViolation("duplicate key value violates unique constraint")
+            self.inserted.append(list(zip(titles, contents)))
+            rows = []
+            for title in titles:
+                self.titles.append(title)
+                rows.append((len(self.titles), title))
+            return rows
+        return []
+
+    async def rollback(self):
+        # The transaction's INSERTs are undone
+        await super().rollback()
+        for batch in self.inserted:
+            for title, _ in batch:
+                self.titles.remove(title)
+        self.inserted = []
+
+
+@pytest.fixture
+def db():
+    return DocumentsDatabase(titles=["Essay.txt"])
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestImportHelpers:
+    """Unit tests for read_zip_texts and resolve_titles"""
+
+    def test_zip_entries_are_read_and_validated(self):
+        archive = make_zip({
+            "class 4B/Amani.txt": "Muraho ☕".encode("utf-8"),
+            "class 4B/": b"",
+            "__MACOSX/class 4B/._Amani.txt": b"\x00\x01",
+            ".DS_Store": b"\x00",
+            "photo.png": b"\x89PNG",
+            "broken.txt": b"\xff\xfe",
+            "huge.txt": b"x" * (1024 * 1024 + 1),
+        })
+        files = read_zip_texts(io.BytesIO(archive), max_entries=10, block_size=3)
+
+        assert [(f.filename, f.text, f.error) for f in files] == [
+            ("Amani.txt", "Muraho ☕", None),
+            ("photo.png", None, "Only .txt files are allowed"),
+            ("broken.txt", None, "File must be a valid UTF-8 text file"),
+            ("huge.txt", None, "File size exceeds 1MB limit"),
+        ]
+
+    def test_not_a_zip(self):
+        with pytest.raises(ValueError, match="Not a valid ZIP archive"):
+            read_zip_texts(io.BytesIO(b"plain text"), max_entries=10)
+
+    def test_too_many_entries(self):
+        archive = make_zip({f"{i}.txt": b"x" for i in range(3)})
+        with pytest.raises(ValueError, match="more than 2 files"):
+            read_zip_texts(io.BytesIO(archive), max_entries=2)
+
+    def test_titles_get_the_first_free_copy_number(self):
+        taken = {"Essay.txt", "Essay (2).txt"}
+        assert resolve_titles(["Essay.txt", "Essay.txt", "Poem.txt", "Poem.txt"], taken) == [
+            "Essay (3).txt", "Essay (4).txt", "Poem.txt", "Poem (2).txt"
+        ]
+        assert title_stem("Essay (12).txt") == "Essay"
+        assert len(resolve_titles(["x" * 251 + ".txt"], {"x" * 251 + ".txt"})[0]) == 255
+
+    def test_inserts_are_split_by_size(self):
+        titles = ["a.txt", "b.txt", "c.txt", "d.txt"]
+        texts = ["x" * 6, "é" * 3, "y" * 9, "z" * 20]  # "é" is 2 bytes
+        assert insert_batches(titles, texts, max_bytes=12) == [
+            (["a.txt", "b.txt"], ["x" * 6, "é" * 3]),
+            (["c.txt"], ["y" * 9]),
+            (["d.txt"], ["z" * 20]),
+        ]
+        assert insert_batches([], [], max_bytes=12) == []
+
+    def test_copy_patterns_match_shortened_copies(self):
+        stem = "x" * 250
+        pattern = documents_routes.copies_pattern(stem + ".TXT")
+        assert like(pattern, stem[:247] + " (2).TXT")
+        assert like(pattern, stem[:238] + " (1234567890).TXT")
+        assert not like(pattern, stem[:247] + " (2).txt")
+        assert documents_routes.copies_pattern("50%_off.txt") == "50\\%\\_off (%).txt"
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestBulkUploadRoute:
+    """Unit tests for POST /documents/bulk-upload"""
+
+    def test_files_and_archive_in_one_batch(self, client, db):
+        archive = make_zip({"Essay.txt": b"From the archive.", "Story.txt": b"Once upon a time."})
+        response = client.post("/documents/bulk-upload", files=[
+            ("files", ("Essay.txt", b"First essay.", "text/plain")),
+            ("files", ("class.zip", archive, "application/zip")),
+            ("files", ("notes.docx", b"PK", "application/octet-stream")),
+        ])
+
+        assert response.status_code == 201
+        body = response.json()
+        assert (body["created"], body["failed"]) == (3, 1)
+        assert [(r["filename"], r["status"], r.get("title")) for r in body["results"]] == [
+            ("Essay.txt", "created", "Essay (2).txt"),
+            ("Essay.txt", "created", "Essay (3).txt"),
+            ("Story.txt", "created", "Story.txt"),
+            ("notes.docx", "failed", None),
+        ]
+        # One lookup, one INSERT, one commit
+        assert [q.split()[0] for q in db.queries] == ["SELECT", "INSERT"]
+        assert db.inserted == [[
+            ("Essay (2).txt", "First essay."), ("Essay (3).txt", "From the archive."), ("Story.txt", "Once upon a time.")
+        ]]
+        assert db.commits == 1
+        assert db.lookups[0][1] == ["Essay (%).txt", "Essay (%).txt", "Story (%).txt"]
+
+    def test_long_name_skips_its_shortened_copies(self, client, db):
+        stem = "Report on climate change in Rwanda " * 7 + "x" * 5  # 250 characters
+        name = stem + ".txt"
+        db.titles += [name, stem[:247] + " (2).txt"]
+        response = client.post("/documents/bulk-upload", files=[("files", (name, b"Text.", "text/plain"))])
+
+        assert response.status_code == 201
+        title = response.json()["results"][0]["title"]
+        assert title == stem[:247] + " (3).txt" and len(title) == 255
+        assert db.rollbacks == 0
+
+    def test_large_import_is_inserted_in_batches(self, client, db, monkeypatch):
+        monkeypatch.setattr(documents_routes, "BULK_UPLOAD_INSERT_BATCH_BYTES", 10)
+        response = client.post("/documents/bulk-upload", files=[
+            ("files", (f"Essay {i}.txt", b"Six b.", "text/plain")) for i in range(5)
+        ])
+
+        assert response.status_code == 201
+        assert [len(batch) for batch in db.inserted] == [1, 1, 1, 1, 1]
+        assert [q.split()[0] for q in db.queries] == ["SELECT"] + ["INSERT"] * 5
+        assert db.commits == 1
+        assert [r["title"] for r in response.json()["results"]] == [f"Essay {i}.txt" for i in range(5)]
+
+    def test_nothing_importable(self, client, db):
+        response = client.post("/documents/bulk-upload", files=[
+            ("files", ("bad.txt", b"\xff", "text/plain")),
+            ("files", ("archive.zip", b"not a zip", "application/zip")),
+        ])
+        assert response.status_code == 400
+        assert [r["error"] for r in response.json()["results"]] == [
+            "File must be a valid UTF-8 text file", "Not a valid ZIP archive"
+        ]
+        assert db.queries == []
+
+    def test_concurrent_title_conflict_is_retried(self, client, db):
+        db.conflicts = 1
+        response = client.post("/documents/bulk-upload", files=[("files", ("New.txt", b"Text.", "text/plain"))])
+        assert response.status_code == 201
+        assert db.rollbacks == 1
+        assert len(db.lookups) == 2
+
+    def test_repeated_conflicts_give_up(self, client, db):
+        db.conflicts = 2
+        response = client.post("/documents/bulk-upload", files=[("files", ("New.txt", b"Text.", "text/plain"))])
+        assert response.status_code == 409
@@ -0,0 +1,80 @@
+"""
+Phase 5: Unit Tests for in-process caches
+Tests: LRU eviction, TTL expiry, hit/miss stats, correction cache keys
+Tool: pytest
+Run with: pytest tests/test_phase5_unit_caches.py -v
+"""
+
+import pytest
+from app.utils.cache import LRUCache
+from app.utils.correction_cache import CorrectionCache, make_cache_key
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestLRUCache:
+    """Unit tests for LRUCache"""
+
+    def test_evicts_least_recently_used(self):
+        """The entry that was used longest ago is evicted first"""
+        cache = LRUCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry(self, monkeypatch):
+        """Entries older than the TTL are treated as misses"""
+        now = [100.0]
+        monkeypatch.setattr("app.utils.cache.time.monotonic", lambda: now[0])
+        cache = LRUCache(max_entries=10, ttl_seconds=5)
+        cache.set("a", 1)
+
+        now[0] += 4
+        assert cache.get("a") == 1
+        now[0] += 2
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_hit_ratio(self):
+        """Stats track hits and misses"""
+        cache = LRUCache(max_entries=10)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("missing")
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestCorrectionCache:
+    """Unit tests for the correction cache"""
+
+    def test_key_ignores_whitespace_differences(self):
+        """Normalized text gives the same key"""
+        assert make_cache_key("I  am\nhappy ", "endpoint") == make_cache_key("I am happy", "endpoint")
+
+    def test_key_depends_on_model_version_and_parameters(self):
+        """Changing the model or generation parameters invalidates entries"""
+        base = make_cache_key("text", "endpoint", "v1", {"max_new_tokens": 600})
+        assert base != make_cache_key("text", "endpoint", "v2", {"max_new_tokens": 600})
+        assert base != make_cache_key("text", "endpoint", "v1", {"max_new_tokens": 300})
+        assert base != make_cache_key("Text", "endpoint", "v1", {"max_new_tokens": 600})
+
+    async def test_memory_tier_round_trip(self):
+        """Stored results are returned without touching the persistent tier"""
+        cache = CorrectionCache(max_entries=10, ttl_seconds=60, persistent=False)
+        key = make_cache_key("text", "endpoint")
+        assert await cache.get(key) is None
+
+        await cache.set(key, "Text.", "Nice.")
+        assert await cache.get(key) == ("Text.", "Nice.")
+        assert cache.stats()["hit_ratio"] == 0.5
@@ -0,0 +1,122 @@
+"""
+Phase 5: Unit Tests for the chunk result cache
+Tests: LRU eviction by entry count and memory, hit ratio, reopening a document without re-chunking,
+       segmenter version in the cache key
+Tool: pytest, pytest-asyncio, spaCy (blank English pipeline + sentencizer)
+Run with: pytest tests/test_phase5_unit_chunk_cache.py -v
+"""
+
+import json
+import pytest
+from app.utils.chunking_pool import ChunkingExecutor
+from app.utils.text_processor import ChunkCache, ChunkingState, estimate_state_size
+from app.utils.websocket_manager import WebSocketManager
+
+
+class CountingChunking(ChunkingExecutor):
+    """Inline executor that records every spaCy parse"""
+
+    def __init__(self, processor, **kwargs):
+        super().__init__(mode="inline", processor_factory=lambda: processor, **kwargs)
+        self.parsed = []
+
+    async def parse_sentences(self, text, start=0, end=None):
+        self.parsed.append(text[start:end])
+        return await super().parse_sentences(text, start, end)
+
+
+class RecordingWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, data):
+        self.sent.append(json.loads(data))
+
+
+def state_for(text):
+    return ChunkingState(text=text, target_words=200)
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestChunkCache:
+    """Unit tests for ChunkCache"""
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ChunkCache(max_entries=2)
+        cache.put(("a", 200, "v"), state_for("a"))
+        cache.put(("b", 200, "v"), state_for("b"))
+        cache.get(("a", 200, "v"))
+        cache.put(("c", 200, "v"), state_for("c"))
+
+        assert cache.get(("b", 200, "v")) is None
+        assert cache.get(("a", 200, "v")).text == "a"
+        assert cache.stats()["evictions"] == 1
+
+    def test_memory_bound(self):
+        big = state_for("x" * 10000)
+        cache = ChunkCache(max_entries=10, max_bytes=estimate_state_size(big) * 2 + 100)
+        for name in "abc":
+            cache.put((name, 200, "v"), state_for(name * 10000))
+
+        assert len(cache) == 2
+        assert cache.stats()["memory_bytes"] <= cache.max_bytes
+
+        cache.put(("huge", 200, "v"), state_for("y" * 100000))
+        assert cache.get(("huge", 200, "v")) is None
+
+    def test_hit_ratio(self):
+        cache = ChunkCache()
+        cache.put(("a", 200, "v"), state_for("a"))
+        cache.get(("a", 200, "v"))
+        cache.get(("a", 200, "v"))
+        cache.get(("a", 100, "v"))
+        cache.get(("a", 200, "other-segmenter"))
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (2, 2)
+        assert stats["hit_ratio"] == 0.5
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestCachedChunking:
+    """Unit tests for cached chunking in ChunkingExecutor and WebSocketManager"""
+
+    async def test_same_content_is_parsed_once(self, text_processor):
+        chunking = CountingChunking(text_processor)
+        first = await chunking.chunk_document("One sentence. Two sentences.")
+        second = await chunking.chunk_document("One sentence. Two sentences.")
+
+        assert second is first
+        assert len(chunking.parsed) == 1
+        await chunking.chunk_document("One sentence. Two sentences.", target_words=1)
+        assert len(chunking.parsed) == 2
+
+    async def test_segmenter_version_separates_results(self, text_processor):
+        cache = ChunkCache()
+        await CountingChunking(text_processor, cache=cache, version="sentencizer").chunk_document("Some text.")
+        parser = CountingChunking(text_processor, cache=cache, version="parser")
+        await parser.chunk_document("Some text.")
+
+        assert len(parser.parsed) == 1
+        assert len(cache) == 2
+
+    async def test_reopening_edited_document_uses_cache(self, text_processor):
+        """Switching documents caches the edited state; switching back sends it without a parse"""
+        chunking = CountingChunking(text_processor)
+        manager = WebSocketManager(chunking=chunking)
+        websocket = RecordingWebSocket()
+        await manager.connect(websocket, "1")
+
+        await manager.process_text_chunking("1", "Draft one.", 3)
+        await manager.process_text_chunking("1", "Draft one. Edited.", 3)
+        await manager.process_text_chunking("1", "Another document.", 4)
+        parses = len(chunking.parsed)
+
+        await manager.process_text_chunking("1", "Draft one. Edited.", 3)
+
+        assert len(chunking.parsed) == parses
+        assert websocket.sent[-1]["type"] == "chunks_updated"
+        assert websocket.sent[-1]["chunks"][0]["text"] == "Draft one. Edited."
+        assert chunking.cache.stats()["hits"] == 1
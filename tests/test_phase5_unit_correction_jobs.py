@@ -0,0 +1,162 @@
+"""
+Phase 5: Unit Tests for whole-document correction jobs
+Tests: streamed chunk results, corrections starting while chunking, per-document de-duplication,
+       cancel and resume, reconnect replay
+Tool: pytest, pytest-asyncio
+Run with: pytest tests/test_phase5_unit_correction_jobs.py -v
+"""
+
+import asyncio
+import pytest
+from app.utils.correction_jobs import CorrectionJobManager
+from app.utils.text_processor import TextChunk, html_to_text
+
+
+async def paragraph_chunker(text, target_words):
+    """One chunk per paragraph, streamed one at a time, so tests don't need the spaCy model"""
+    paragraphs = [p for p in text.split("\n") if p.strip()]
+    for i, p in enumerate(paragraphs):
+        yield [TextChunk(index=i, source=p, start_position=0, end_position=len(p), word_count=len(p.split()))]
+
+
+class FakeAI:
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = set(fail)
+        self.release = None
+
+    async def get_correction_and_feedback(self, text):
+        self.calls.append(text)
+        if self.release is not None:
+            await self.release.wait()
+        if text in self.fail:
+            return None, None, "Service unavailable: Model is loading"
+        return text.upper(), "ok", None
+
+
+class Outbox:
+    def __init__(self):
+        self.messages = []
+
+    async def send(self, message, user_id):
+        self.messages.append((user_id, message))
+
+    def types(self):
+        return [message["type"] for _, message in self.messages]
+
+
+def make_manager(ai, outbox):
+    return CorrectionJobManager(ai, outbox.send, chunker=paragraph_chunker, concurrency=2)
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestCorrectionJobs:
+    """Unit tests for CorrectionJobManager"""
+
+    async def test_results_stream_per_chunk(self):
+        """Every chunk produces its own result message, then a finished message"""
+        ai, outbox = FakeAI(), Outbox()
+        manager = make_manager(ai, outbox)
+        job = await manager.start(1, 10, "first one\nsecond one\nthird one")
+        await job.task
+
+        assert job.status == "completed"
+        assert outbox.types() == ["correction_job_started"] + ["correction_chunk_result"] * 3 + ["correction_job_finished"]
+        results = [message for _, message in outbox.messages if message["type"] == "correction_chunk_result"]
+        assert sorted(r["corrected_text"] for r in results) == ["FIRST ONE", "SECOND ONE", "THIRD ONE"]
+        assert all(user_id == "1" for user_id, _ in outbox.messages)
+
+    async def test_first_chunks_are_corrected_while_chunking(self):
+        """Model calls start as soon as the chunker yields, not after the whole document"""
+        ai, outbox = FakeAI(), Outbox()
+        rest_chunked = asyncio.Event()
+
+        async def slow_chunker(text, target_words):
+            async for batch in paragraph_chunker(text, target_words):
+                yield batch
+                if batch[0].index == 0:
+                    await rest_chunked.wait()
+
+        manager = CorrectionJobManager(ai, outbox.send, chunker=slow_chunker, concurrency=2)
+        job = await manager.start(1, 10, "first\nsecond")
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+        assert ai.calls == ["first"]
+        assert not job.chunking_done
+        rest_chunked.set()
+        await job.task
+        assert job.status == "completed"
+        assert outbox.messages[-1][1]["total_chunks"] == 2
+
+    async def test_chunking_failure_fails_job(self):
+        ai, outbox = FakeAI(), Outbox()
+
+        async def broken_chunker(text, target_words):
+            raise RuntimeError("model missing")
+            yield
+
+        manager = CorrectionJobManager(ai, outbox.send, chunker=broken_chunker)
+        job = await manager.start(1, 10, "text")
+        await job.task
+
+        assert job.status == "failed"
+        assert outbox.types()[-1] == "correction_job_failed"
+
+    async def test_running_job_is_reused(self):
+        """Starting the same document twice doesn't double the model calls"""
+        ai, outbox = FakeAI(), Outbox()
+        ai.release = asyncio.Event()
+        manager = make_manager(ai, outbox)
+        first = await manager.start(1, 10, "a\nb")
+        second = await manager.start(1, 10, "a\nb")
+        ai.release.set()
+        await first.task
+
+        assert first is second
+        assert sorted(ai.calls) == ["a", "b"]
+
+    async def test_cancel_then_resume_skips_finished_chunks(self):
+        """Cancelled jobs keep their results; a restart only runs what is left"""
+        ai, outbox = FakeAI(fail={"b"}), Outbox()
+        manager = make_manager(ai, outbox)
+        job = await manager.start(1, 10, "a\nb\nc")
+        await job.task
+        assert job.status == "completed_with_errors"
+        assert set(job.results) == {0, 2}
+
+        ai.fail.clear()
+        ai.calls.clear()
+        resumed = await manager.start(1, 10, "a\nb\nc")
+        await resumed.task
+
+        assert resumed is job
+        assert ai.calls == ["b"]
+        assert job.status == "completed"
+        assert set(job.results) == {0, 1, 2}
+
+        ai.release = asyncio.Event()
+        await manager.start(1, 10, "x\ny")
+        cancelled = await manager.cancel(1, 10)
+        assert cancelled.status == "cancelled"
+        assert "correction_job_cancelled" in outbox.types()
+
+    async def test_replay_after_reconnect(self):
+        """Finished results are re-sent to a reconnecting client"""
+        ai, outbox = FakeAI(), Outbox()
+        manager = make_manager(ai, outbox)
+        job = await manager.start(1, 10, "a\nb")
+        await job.task
+        outbox.messages.clear()
+
+        await manager.replay("1")
+        assert outbox.types() == ["correction_job_status", "correction_chunk_result", "correction_chunk_result"]
+        await manager.replay("2")
+        assert len(outbox.messages) == 3
+
+    def test_html_to_text(self):
+        """Stored Quill HTML is flattened to text with paragraph breaks"""
+        assert html_to_text("<p>Hello &amp; bye</p><p>Next<br>line</p>").split() == ["Hello", "&", "bye", "Next", "line"]
+        assert html_to_text("<p>One</p><p>Two</p>").strip().split("\n") == ["One", "Two"]
+        assert html_to_text("plain < text") == "plain < text"
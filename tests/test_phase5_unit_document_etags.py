@@ -0,0 +1,137 @@
+"""
+Phase 5: Unit Tests for document ETags and conditional requests
+Tests: ETag on GET /documents/{doc_id} and /documents/list, If-None-Match -> 304,
+       If-Match -> 412 on update and rename, version bump on every write path
+Tool: pytest, FastAPI TestClient (in-memory fake async database connection)
+Run with: pytest tests/test_phase5_unit_document_etags.py -v
+"""
+
+import re
+from datetime import datetime, timezone
+import pytest
+from app.routes.documents import document_etag, etag_matches
+from tests.conftest import TEST_USER_ID, FakeAsyncConnection
+
+CREATED = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+class DocumentsDatabase(FakeAsyncConnection):
+    """Understands just the document queries the routes issue"""
+
+    def __init__(self):
+        super().__init__()
+        self.documents = {1: {"title": "Essay.txt", "content": "First draft.", "version": 1}}
+        self.concurrent_write = False
+
+    def respond(self, query, params):
+        docs = self.documents
+        if query.startswith("SELECT version FROM documents"):
+            doc = docs.get(params[0])
+            return [(doc["version"],)] if doc and params[1] == TEST_USER_ID else []
+        if query.startswith("SELECT id, title, content, created_at, last_updated, version"):
+            doc = docs.get(params[0])
+            return [(params[0], doc["title"], doc["content"], CREATED, CREATED, doc["version"])] if doc else []
+        if query.startswith("SELECT id, title, content_size"):
+            return [
+                (doc_id, doc["title"], len(doc["content"]), CREATED, CREATED, doc["version"])
+                for doc_id, doc in sorted(docs.items())
+            ]
+        if query.startswith("UPDATE documents"):
+            field = "content" if "SET content" in query else "title"
+            value, doc_id, _, *expected = params
+            doc = docs.get(doc_id)
+            if self.concurrent_write:
+                doc["version"] += 1
+            if doc is None or (expected and doc["version"] != expected[0]):
+                return []
+            doc[field] = value
+            doc["version"] += 1
+            return [(doc["version"],)]
+        return []
+
+
+@pytest.fixture
+def db():
+    return DocumentsDatabase()
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestDocumentETags:
+    """Unit tests for conditional document reads and writes"""
+
+    def test_etag_comparison(self):
+        etag = document_etag(1, 3)
+        assert etag_matches('"1-2", "1-3"', etag)
+        assert etag_matches("*", etag)
+        assert etag_matches('W/"1-3"', etag)
+        assert not etag_matches('W/"1-3"', etag, weak=False)
+        assert not etag_matches(None, etag)
+
+    def test_unchanged_document_is_not_sent_again(self, client, db):
+        first = client.get("/documents/1")
+        assert first.status_code == 200
+        assert first.headers["ETag"] == '"1-1"'
+        assert first.json()["version"] == 1
+        assert "no-cache" in first.headers["Cache-Control"]
+
+        reads = len(db.queries)
+        second = client.get("/documents/1", headers={"If-None-Match": first.headers["ETag"]})
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["ETag"] == '"1-1"'
+        # Revalidation reads only the version
+        assert db.queries[reads:] == ["SELECT version FROM documents WHERE id = %s AND user_id = %s"]
+
+    def test_changed_document_is_sent_with_new_etag(self, client, db):
+        etag = client.get("/documents/1").headers["ETag"]
+        db.documents[1]["version"] += 1  # e.g. an auto-save was flushed
+
+        response = client.get("/documents/1", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] == '"1-2"'
+
+    def test_update_and_rename_bump_the_version(self, client, db):
+        updated = client.put("/documents/1", json={"content": "Second draft."})
+        assert updated.headers["ETag"] == '"1-2"'
+        renamed = client.put("/documents/1/rename", json={"title": "Final.txt"})
+        assert renamed.json()["version"] == 3
+        assert renamed.headers["ETag"] == '"1-3"'
+        assert all("version = version + 1" in q for q in db.queries if q.startswith("UPDATE"))
+
+    def test_if_match_with_current_version_writes(self, client, db):
+        response = client.put("/documents/1", json={"content": "Edited."}, headers={"If-Match": '"1-1"'})
+        assert response.status_code == 200
+        assert db.documents[1]["content"] == "Edited."
+        update = next(q for q in db.queries if q.startswith("UPDATE"))
+        assert re.search(r"AND version = %s", update)
+
+    def test_stale_if_match_is_rejected(self, client, db):
+        db.documents[1]["version"] = 5
+        response = client.put("/documents/1", json={"content": "Lost update"}, headers={"If-Match": '"1-4"'})
+        assert response.status_code == 412
+        assert db.documents[1]["content"] == "First draft."
+
+        response = client.put("/documents/1/rename", json={"title": "New.txt"}, headers={"If-Match": '"1-4"'})
+        assert response.status_code == 412
+        assert db.documents[1]["title"] == "Essay.txt"
+
+    def test_write_racing_the_check_is_rejected(self, client, db):
+        db.concurrent_write = True
+        response = client.put("/documents/1", json={"content": "Edited."}, headers={"If-Match": '"1-1"'})
+        assert response.status_code == 412
+        assert db.documents[1]["content"] == "First draft."
+
+    def test_if_match_on_missing_document_is_404(self, client):
+        response = client.put("/documents/2", json={"content": "x"}, headers={"If-Match": '"2-1"'})
+        assert response.status_code == 404
+
+    def test_list_etag(self, client, db):
+        first = client.get("/documents/list")
+        etag = first.headers["ETag"]
+        assert client.get("/documents/list", headers={"If-None-Match": etag}).status_code == 304
+
+        db.documents[1]["version"] += 1
+        changed = client.get("/documents/list", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["ETag"] != etag
@@ -0,0 +1,88 @@
+"""
+Phase 5: Unit Tests for the paginated document listing
+Tests: metadata-only query with database-computed size, keyset cursor round trip and
+       X-Next-Cursor header, title prefix filtering with LIKE escaping, invalid cursors
+Tool: pytest, FastAPI TestClient (fake async database connection)
+Run with: pytest tests/test_phase5_unit_document_listing.py -v
+"""
+
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.routes.documents import decode_cursor, encode_cursor, escape_like
+from tests.conftest import FakeAsyncConnection
+
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def document_row(doc_id, size=11):
+    created = NOW - timedelta(minutes=doc_id)
+    return (doc_id, f"Essay {doc_id}.txt", size, created, created, 1)
+
+
+class ListingDatabase(FakeAsyncConnection):
+    """Answers the listing query with the first LIMIT rows"""
+
+    def __init__(self, rows):
+        super().__init__()
+        self.rows = rows
+
+    def respond(self, query, params):
+        return self.rows[:params[-1]]
+
+
+@pytest.fixture
+def db():
+    return ListingDatabase([document_row(i) for i in range(1, 4)])
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestDocumentListing:
+    """Unit tests for GET /documents/list"""
+
+    def test_cursor_round_trip(self):
+        created = NOW - timedelta(microseconds=123)
+        assert decode_cursor(encode_cursor(created, 42)) == (created, 42)
+
+    def test_metadata_only_with_database_size(self, client, db):
+        response = client.get("/documents/list")
+
+        assert response.status_code == 200
+        assert "X-Next-Cursor" not in response.headers
+        assert [doc["id"] for doc in response.json()] == [1, 2, 3]
+        assert response.json()[0]["size"] == 11
+        query, params = db.executed[0]
+        assert "content_size" in query and "content," not in query
+        assert "ORDER BY created_at DESC, id DESC" in query
+        assert params == (7, 101)
+
+    def test_next_cursor_continues_after_last_row(self, client, db):
+        first = client.get("/documents/list", params={"limit": 2})
+
+        assert [doc["id"] for doc in first.json()] == [1, 2]
+        cursor = first.headers["X-Next-Cursor"]
+        assert decode_cursor(cursor) == (document_row(2)[3], 2)
+
+        db.rows = db.rows[2:]
+        second = client.get("/documents/list", params={"limit": 2, "cursor": cursor})
+        query, params = db.executed[-1]
+        assert "(created_at, id) < (%s, %s)" in query
+        assert params == (7, document_row(2)[3], 2, 3)
+        assert [doc["id"] for doc in second.json()] == [3]
+        assert "X-Next-Cursor" not in second.headers
+
+    def test_title_prefix_is_escaped(self, client, db):
+        client.get("/documents/list", params={"title_prefix": "50%_off"})
+        query, params = db.executed[0]
+        assert "title ILIKE %s" in query
+        assert params[1] == "50\\%\\_off%"
+        assert escape_like("a\\b") == "a\\\\b"
+
+    def test_invalid_cursor_is_rejected(self, client, db):
+        response = client.get("/documents/list", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+        assert db.queries == []
+
+    def test_limit_is_bounded(self, client):
+        assert client.get("/documents/list", params={"limit": 0}).status_code == 422
+        assert client.get("/documents/list", params={"limit": 10000}).status_code == 422
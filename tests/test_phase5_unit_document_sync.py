@@ -0,0 +1,120 @@
+"""
+Phase 5: Unit Tests for the delta-based WebSocket document sync
+Tests: applying retain/insert/delete ops in UTF-16 units, revision checks, resync, delta auto-save
+Tool: pytest, pytest-asyncio
+Run with: pytest tests/test_phase5_unit_document_sync.py -v
+"""
+
+import json
+import pytest
+import app.utils.text_processor as text_processor_module
+from app.utils.chunking_pool import ChunkingExecutor
+from app.utils.document_sync import DeltaError, DocumentBuffer, apply_ops, utf16_length
+from app.utils.websocket_manager import WebSocketManager
+
+
+class RecordingWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, data):
+        self.sent.append(json.loads(data))
+
+    def types(self):
+        return [message["type"] for message in self.sent]
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestApplyOps:
+    """Unit tests for apply_ops and DocumentBuffer"""
+
+    def test_insert_delete_retain(self):
+        """Ops apply in order and the rest of the text is kept"""
+        assert apply_ops("Hello world", [{"retain": 6}, {"delete": 5}, {"insert": "there"}]) == "Hello there"
+        assert apply_ops("abc", [{"insert": ">"}]) == ">abc"
+        assert apply_ops("abc", []) == "abc"
+
+    def test_offsets_are_utf16_units(self):
+        """An emoji counts as two units, like in JavaScript"""
+        text = "a😀b"
+        assert utf16_length(text) == 4
+        assert apply_ops(text, [{"retain": 3}, {"insert": "!"}]) == "a😀!b"
+        with pytest.raises(DeltaError):
+            apply_ops(text, [{"retain": 2}, {"insert": "!"}])
+
+    def test_invalid_ops_are_rejected(self):
+        """Malformed or out-of-range operations raise DeltaError"""
+        for ops in ([{"retain": 10}], [{"delete": -1}], [{"insert": 5}], [{"move": 1}], "ops", [{"retain": True}]):
+            with pytest.raises(DeltaError):
+                apply_ops("abc", ops)
+
+    def test_buffer_revisions(self):
+        """Deltas must be based on the buffer's revision and match the client's length"""
+        buffer = DocumentBuffer(1, "abc", revision=3)
+        assert buffer.apply(3, 4, [{"retain": 3}, {"insert": "d"}], length=4) == "abcd"
+
+        with pytest.raises(DeltaError):
+            buffer.apply(3, 5, [{"insert": "x"}])
+        with pytest.raises(DeltaError):
+            buffer.apply(4, 5, [{"insert": "x"}], length=99)
+        assert (buffer.text, buffer.revision) == ("abcd", 4)
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestWebSocketDeltaSync:
+    """WebSocketManager handling of delta messages"""
+
+    async def test_text_delta_is_acked_and_rechunked(self, text_processor, monkeypatch):
+        monkeypatch.setattr(text_processor_module, "_text_processor", text_processor)
+        manager = WebSocketManager(ChunkingExecutor(mode="inline", processor_factory=lambda: text_processor))
+        websocket = RecordingWebSocket()
+        await manager.connect(websocket, "1")
+
+        await manager.handle_message("1", {"type": "text_changed", "document_id": 5, "text": "One here. Two there.", "revision": 1})
+        await manager.wait_for_chunking("1")
+        await manager.handle_message("1", {
+            "type": "text_changed", "document_id": 5, "base_revision": 1, "revision": 2,
+            "ops": [{"retain": 20}, {"insert": " Three."}], "length": 27
+        })
+        await manager.wait_for_chunking("1")
+
+        assert websocket.types() == ["delta_ack", "chunks_updated", "delta_ack", "chunks_patch"]
+        assert websocket.sent[2]["revision"] == 2
+        assert manager.document_buffers["1"]["text"].text == "One here. Two there. Three."
+        assert websocket.sent[3]["chunks"][0]["text"] == "One here. Two there. Three."
+
+    async def test_revision_gap_requires_resync(self):
+        manager = WebSocketManager()
+        websocket = RecordingWebSocket()
+        await manager.connect(websocket, "1")
+
+        await manager.handle_message("1", {
+            "type": "manual_save", "document_id": 5, "base_revision": 7, "revision": 8, "ops": [{"insert": "x"}]
+        })
+
+        assert websocket.types() == ["resync_required"]
+        assert websocket.sent[0]["channel"] == "content"
+        assert websocket.sent[0]["message_type"] == "manual_save"
+
+    async def test_auto_save_delta_saves_full_content(self, monkeypatch):
+        saved = []
+
+        async def fake_save(user_id, document_id, content):
+            saved.append(content)
+
+        manager = WebSocketManager()
+        monkeypatch.setattr(manager.autosave_buffer, "write", fake_save)
+        websocket = RecordingWebSocket()
+        await manager.connect(websocket, "1")
+
+        await manager.handle_message("1", {"type": "auto_save", "document_id": 5, "content": "<p>Hi</p>", "revision": 1})
+        await manager.handle_message("1", {
+            "type": "auto_save", "document_id": 5, "base_revision": 1, "revision": 2,
+            "ops": [{"retain": 5}, {"insert": " there"}], "length": 15
+        })
+        await manager.autosave_buffer.flush("1", 5)
+
+        assert saved == ["<p>Hi there</p>"]
+        assert websocket.types() == ["delta_ack", "delta_ack", "auto_saved"]
@@ -0,0 +1,131 @@
+"""
+Phase 5: Unit Tests for warm-up and health endpoints
+Tests: /healthz liveness, /readyz readiness per dependency, warm-up steps, AI endpoint warm-up retries
+Tool: pytest, pytest-asyncio, FastAPI TestClient, httpx.MockTransport
+Run with: pytest tests/test_phase5_unit_health.py -v
+"""
+
+import asyncio
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import app.routes.health as health
+from app.routes.health import router as health_router
+from app.utils.ai_services import AIServices
+from app.utils.correction_cache import CorrectionCache
+from app.utils.readiness import ReadinessTracker
+from app.utils.translation_memory import TranslationMemory
+from app.utils.warmup import start_warm_up
+
+
+@pytest.fixture
+def tracker(monkeypatch):
+    tracker = ReadinessTracker()
+    monkeypatch.setattr(health, "readiness", tracker)
+    return tracker
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(health_router)
+    with TestClient(app) as client:
+        yield client
+
+
+async def database_up():
+    pass
+
+
+async def database_down():
+    raise OSError("connection refused")
+
+
+class FakeChunking:
+    def __init__(self):
+        self.warmed = asyncio.Event()
+
+    async def warm_up(self):
+        self.warmed.set()
+
+
+def make_services(handler):
+    return AIServices(
+        transport=httpx.MockTransport(handler),
+        correction_cache=CorrectionCache(persistent=False),
+        translation_memory=TranslationMemory(persistent=False, splitter=lambda text: [(0, len(text))])
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestHealthEndpoints:
+    """Unit tests for /healthz and /readyz"""
+
+    def test_healthz_is_always_ok(self, client, tracker):
+        tracker.register("spacy")
+        assert client.get("/healthz").json() == {"status": "ok"}
+
+    def test_readyz_waits_for_required_steps(self, client, tracker, monkeypatch):
+        monkeypatch.setattr(health, "ping_database", database_up)
+        tracker.register("spacy")
+        tracker.register("nllb_endpoint", required=False)
+
+        response = client.get("/readyz")
+        assert response.status_code == 503
+        assert response.json()["components"]["spacy"]["status"] == "pending"
+
+        tracker.components["spacy"]["status"] = "ready"
+        response = client.get("/readyz")
+        assert response.status_code == 200
+        assert response.json()["components"]["database"]["status"] == "ready"
+
+    def test_readyz_reports_database_outage(self, client, tracker, monkeypatch):
+        monkeypatch.setattr(health, "ping_database", database_down)
+        response = client.get("/readyz")
+
+        assert response.status_code == 503
+        assert response.json()["components"]["database"]["error"] == "OSError: connection refused"
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestWarmUp:
+    """Unit tests for start_warm_up and AIServices.warm_up_endpoint"""
+
+    async def test_steps_are_pending_until_done(self):
+        tracker, chunking = ReadinessTracker(), FakeChunking()
+        task = start_warm_up(tracker, chunking=chunking, warm_ai=False, open_pool=database_up)
+
+        assert set(tracker.components) == {"spacy", "database_pool"}
+        assert not tracker.ready
+        await task
+        assert tracker.ready and chunking.warmed.is_set()
+
+    async def test_ai_endpoints_are_optional(self):
+        services = make_services(lambda request: httpx.Response(401))
+        tracker = ReadinessTracker()
+        await start_warm_up(tracker, chunking=FakeChunking(), ai=services, warm_ai=True, open_pool=database_up)
+
+        assert tracker.components["mistral_endpoint"]["status"] == "failed"
+        assert tracker.components["nllb_endpoint"]["error"] == "RuntimeError: Unauthorized: Invalid or missing HF_TOKEN"
+        assert tracker.ready
+        await services.aclose()
+
+    async def test_endpoint_warm_up_retries_while_model_loads(self):
+        responses = [httpx.Response(503), httpx.Response(503), httpx.Response(200, json=[{"generated_text": "ok"}])]
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return responses.pop(0)
+
+        services = make_services(handler)
+        await services.warm_up_endpoint(services.mistral_endpoint, retry_interval=0.01)
+        assert len(requests) == 3
+
+        responses[:] = [httpx.Response(503)] * 10
+        with pytest.raises(RuntimeError, match="Model is loading"):
+            await services.warm_up_endpoint(services.nllb_endpoint, retry_interval=0.01, timeout=0.03)
+        await services.aclose()
@@ -0,0 +1,126 @@
+"""
+Phase 5: Unit Tests for the schema migration runner
+Tests: pending migrations applied in order and recorded, already applied versions skipped,
+       failed migration rolled back, migration list well-formed, duplicate title renaming (SQL snapshot)
+Tool: pytest
+Run with: pytest tests/test_phase5_unit_migrations.py -v
+"""
+
+import pytest
+from app.database.migrations import MIGRATIONS, Migration, check_migrations, migrate
+from app.utils.upload_utils import TITLE_MAX_LENGTH
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        query = " ".join(query.split())
+        if query == "FAIL":
+            raise RuntimeError("syntax error")
+        self.conn.pending.append(query)
+        if query.startswith("SELECT version FROM schema_migrations"):
+            self.rows = [(version,) for version in self.conn.versions]
+        elif query.startswith("INSERT INTO schema_migrations"):
+            self.conn.new_versions.append(params[0])
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeConnection:
+    """psycopg2-like connection; `with conn:` commits or rolls back the statements it saw"""
+
+    def __init__(self, versions=()):
+        self.versions = set(versions)
+        self.committed = []
+        self.rollbacks = 0
+        self.pending = []
+        self.new_versions = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.committed.extend(self.pending)
+            self.versions.update(self.new_versions)
+        else:
+            self.rollbacks += 1
+        self.pending, self.new_versions = [], []
+        return False
+
+
+MIGRATIONS_UNDER_TEST = [
+    Migration(1, "tables", ["CREATE TABLE a (id INT)"]),
+    Migration(2, "indexes", ["CREATE INDEX idx_a ON a (id)"]),
+    Migration(3, "more", ["ALTER TABLE a ADD COLUMN b INT"]),
+]
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestMigrations:
+    """Unit tests for migrate()"""
+
+    def test_fresh_database_applies_everything_in_order(self):
+        conn = FakeConnection()
+        assert migrate(conn, MIGRATIONS_UNDER_TEST) == [1, 2, 3]
+        statements = [q for q in conn.committed if not q.startswith(("SELECT", "INSERT", "CREATE TABLE IF"))]
+        assert statements == ["CREATE TABLE a (id INT)", "CREATE INDEX idx_a ON a (id)", "ALTER TABLE a ADD COLUMN b INT"]
+        assert conn.versions == {1, 2, 3}
+
+    def test_applied_versions_are_skipped(self):
+        conn = FakeConnection(versions={1, 2})
+        assert migrate(conn, MIGRATIONS_UNDER_TEST) == [3]
+        assert "CREATE TABLE a (id INT)" not in conn.committed
+        assert migrate(conn, MIGRATIONS_UNDER_TEST) == []
+
+    def test_each_migration_takes_the_advisory_lock(self):
+        conn = FakeConnection()
+        migrate(conn, MIGRATIONS_UNDER_TEST)
+        locks = [q for q in conn.committed if q.startswith("SELECT pg_advisory_xact_lock")]
+        assert len(locks) == len(MIGRATIONS_UNDER_TEST)
+
+    def test_failed_migration_is_rolled_back_and_raised(self):
+        conn = FakeConnection()
+        broken = MIGRATIONS_UNDER_TEST[:1] + [Migration(2, "broken", ["CREATE INDEX ok ON a (id)", "FAIL"])]
+        with pytest.raises(RuntimeError):
+            migrate(conn, broken)
+        assert conn.versions == {1}
+        assert "CREATE INDEX ok ON a (id)" not in conn.committed
+        assert conn.rollbacks == 1
+
+    def test_out_of_order_versions_are_rejected(self):
+        with pytest.raises(ValueError):
+            check_migrations([MIGRATIONS_UNDER_TEST[1], MIGRATIONS_UNDER_TEST[0]])
+        with pytest.raises(ValueError):
+            check_migrations(MIGRATIONS_UNDER_TEST + [Migration(3, "again", [])])
+
+    def test_shipped_migrations(self):
+        check_migrations(MIGRATIONS)
+        statements = [" ".join(s.split()) for s in MIGRATIONS[1].statements]
+        dedupe = next(i for i, s in enumerate(statements) if "ROW_NUMBER() OVER (PARTITION BY user_id, title" in s)
+        unique = next(i for i, s in enumerate(statements) if "idx_documents_user_title" in s)
+        # Duplicate titles have to be renamed before the unique index can be built
+        assert dedupe < unique
+        assert statements[unique].startswith("CREATE UNIQUE INDEX")
+
+    @pytest.mark.sql_snapshot
+    def test_duplicate_titles_get_a_free_title_that_fits(self):
+        dedupe = " ".join(MIGRATIONS[1].statements[0].split())
+        # Same naming as copy_title: any case of .txt, stem cut to fit the column, first unused copy number
+        assert "substring(duplicate.title FROM '\\.[tT][xX][tT]$')" in dedupe
+        assert f"left(stem, {TITLE_MAX_LENGTH} - length(suffix)) || suffix" in dedupe
+        assert "EXIT WHEN NOT EXISTS" in dedupe
@@ -0,0 +1,34 @@
+"""
+Phase 5: Unit Tests for sentence segmentation backends
+Tests: backend selection, rule-based sentencizer pipeline, unknown backends and missing models
+Tool: pytest, spaCy (blank English pipeline + sentencizer)
+Run with: pytest tests/test_phase5_unit_segmentation.py -v
+"""
+
+import pytest
+from app.utils.text_processor import IntelligentTextProcessor, load_segmentation_pipeline
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestSegmentationBackends:
+    """Test the configurable sentence segmentation pipeline"""
+
+    def test_sentencizer_pipeline_has_no_trained_components(self):
+        nlp = load_segmentation_pipeline("sentencizer")
+        assert nlp.pipe_names == ["sentencizer"]
+
+    def test_sentencizer_processor_splits_sentences(self):
+        processor = IntelligentTextProcessor(segmenter="sentencizer")
+        sentences = processor.parse_sentences("I goes to school .  She like it! Do you?")
+        assert processor.segmenter == "sentencizer"
+        assert [s.text for s in sentences] == ["I goes to school.", "She like it!", "Do you?"]
+
+    def test_unknown_segmenter_is_rejected(self):
+        with pytest.raises(ValueError, match="Unknown sentence segmenter"):
+            IntelligentTextProcessor(segmenter="regex")
+
+    @pytest.mark.parametrize("segmenter", ["parser", "senter"])
+    def test_missing_model_names_download_command(self, segmenter):
+        with pytest.raises(Exception, match="python -m spacy download no_such_model"):
+            IntelligentTextProcessor(segmenter=segmenter, model="no_such_model")
@@ -0,0 +1,283 @@
+"""
+Phase 5: Unit Tests for incremental re-chunking
+Tests: offset-preserving cleaning, rechunk == full chunking after edits, minimal chunk patches,
+       chunk offsets into the raw text, streamed chunking, batched nlp.pipe chunking, background chunking jobs superseded by newer edits
+Tool: pytest, pytest-asyncio, spaCy (blank English pipeline + sentencizer)
+Run with: pytest tests/test_phase5_unit_text_chunking.py -v
+"""
+
+import asyncio
+import json
+import random
+import pytest
+from app.utils.chunking_pool import ChunkingExecutor
+from app.utils.text_processor import _clean_with_offsets
+from app.utils.websocket_manager import WebSocketManager
+
+
+WORDS = "the cat sat on a mat and it was happy , really . Why ? Yes ! ok ; then : fine".split()
+
+
+def random_text(rng, words):
+    parts = []
+    for _ in range(words):
+        parts.append(rng.choice(WORDS))
+        parts.append(rng.choice([" ", " ", "  ", "\n", " \n\n "]))
+    return "".join(parts)
+
+
+def as_dicts(chunks):
+    return [chunk.to_wire() for chunk in chunks]
+
+
+def apply_patch(chunks, patch):
+    """What the client does with a chunks_patch message"""
+    tail = [
+        dict(chunk, index=chunk["index"] + patch.index_shift,
+             start=chunk["start"] + patch.position_shift,
+             end=chunk["end"] + patch.position_shift)
+        for chunk in chunks[patch.start + patch.removed:]
+    ]
+    return chunks[:patch.start] + as_dicts(patch.chunks) + tail
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestIncrementalChunking:
+    """Unit tests for IntelligentTextProcessor.rechunk"""
+
+    def test_clean_with_offsets_matches_clean_spacing(self, text_processor):
+        """Offset-tracking cleaner produces exactly clean_spacing's output"""
+        rng = random.Random(3)
+        for _ in range(20):
+            text = random_text(rng, 200)
+            cleaned, cleaned_starts, raw_starts = _clean_with_offsets(text)
+            assert cleaned == text_processor.clean_spacing(text)
+            for cleaned_start, raw_start in zip(cleaned_starts, raw_starts):
+                assert cleaned[cleaned_start] == text[raw_start]
+
+    def test_sentence_spans_point_into_raw_text(self, text_processor):
+        """Sentence offsets are raw offsets even when whitespace was collapsed"""
+        text = "  Hello   there .\n\nHow  are you?"
+        sentences = text_processor.parse_sentences(text)
+        assert [s.text for s in sentences] == ["Hello there.", "How are you?"]
+        assert [text[s.start:s.end] for s in sentences] == ["Hello   there .", "How  are you?"]
+
+    def test_rechunk_matches_full_chunking(self, text_processor):
+        """Random edits re-chunked incrementally give the same chunks as a full pass"""
+        rng = random.Random(1)
+        text = random_text(rng, 2000)
+        state = text_processor.chunk_document(text, target_words=40)
+
+        for _ in range(150):
+            position = rng.randrange(len(text) + 1)
+            choice = rng.random()
+            if choice < 0.4:
+                edited = text[:position] + rng.choice(["a", " ", ".", "x. Y", "\n", " ,"]) + text[position:]
+            elif choice < 0.8:
+                edited = text[:position] + text[position + rng.randint(1, 30):]
+            else:
+                edited = text[:position] + random_text(rng, rng.randint(1, 50)) + text[position + rng.randint(0, 50):]
+
+            previous_chunks = as_dicts(state.chunks)
+            state, patch = text_processor.rechunk(state, edited)
+            expected = text_processor.chunk_document(edited, target_words=40)
+
+            assert as_dicts(state.chunks) == as_dicts(expected.chunks)
+            assert state.sentences == expected.sentences
+            assert apply_patch(previous_chunks, patch) == as_dicts(expected.chunks)
+            text = edited
+
+    def test_single_edit_sends_one_chunk(self, text_processor):
+        """A same-length edit inside one chunk only resends that chunk"""
+        text = " ".join(f"Sentence number {i} is here." for i in range(100))
+        state = text_processor.chunk_document(text, target_words=50)
+        position = text.index("number 42") + len("number ")
+
+        state, patch = text_processor.rechunk(state, text[:position] + "X" + text[position + 1:])
+
+        assert len(patch.chunks) == 1
+        assert patch.removed == 1
+        assert "Sentence number X2 is here." in patch.chunks[0].text
+        assert (patch.index_shift, patch.position_shift) == (0, 0)
+
+    def test_unchanged_text_sends_nothing(self, text_processor):
+        """Identical text produces an empty patch; a whitespace edit only moves offsets"""
+        text = "One sentence here. Another one there."
+        state = text_processor.chunk_document(text)
+        state, patch = text_processor.rechunk(state, text)
+        assert patch.chunks == [] and patch.removed == 0
+
+        state, patch = text_processor.rechunk(state, "One sentence here.  Another one there.")
+        assert patch.removed == 1
+        assert patch.chunks[0].text == text
+        assert patch.chunks[0].end_position == len(text) + 1
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestChunkOffsets:
+    """Test that chunks are offset views into the document text"""
+
+    def test_positions_are_offsets_into_raw_text(self, text_processor):
+        rng = random.Random(5)
+        text = "\n  " + random_text(rng, 1500)
+        chunks = text_processor.create_intelligent_chunks(text, target_words=30)
+
+        assert chunks[0].start_position == len(text) - len(text.lstrip())
+        assert chunks[-1].end_position == len(text.rstrip())
+        for chunk, following in zip(chunks, chunks[1:]):
+            assert chunk.end_position <= following.start_position
+            assert not text[chunk.end_position:following.start_position].strip()
+        for chunk in chunks:
+            assert chunk.text == text_processor.clean_spacing(text[chunk.start_position:chunk.end_position])
+
+    def test_chunks_share_the_document_text(self, text_processor):
+        text = " ".join(f"Sentence number {i} is here." for i in range(100))
+        state = text_processor.chunk_document(text, target_words=50)
+        state, _ = text_processor.rechunk(state, "New start. " + text)
+
+        assert all(chunk.source is state.text for chunk in state.chunks)
+        assert not hasattr(state.chunks[0], "__dict__")
+
+    def test_wire_format(self, text_processor):
+        chunk = text_processor.create_intelligent_chunks("Intro.  Hello   there .")[0]
+        assert chunk.to_wire() == {"index": 0, "text": "Intro. Hello there.", "wordCount": 5, "start": 0, "end": 23}
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestStreamingChunking:
+    """Test iter_chunks / ChunkStream against one-pass chunking"""
+
+    def test_iter_chunks_matches_full_chunking(self, text_processor):
+        rng = random.Random(11)
+        for window in (40, 300, 5000):
+            text = random_text(rng, 1500)
+            streamed = list(text_processor.iter_chunks(text, target_words=30, window=window))
+            assert streamed == text_processor.create_intelligent_chunks(text, 30)
+
+    def test_first_chunk_before_whole_document_is_parsed(self, text_processor, monkeypatch):
+        text = " ".join(f"Sentence number {i} is here." for i in range(2000))
+        parsed = []
+        parse = text_processor.parse_sentences
+        monkeypatch.setattr(text_processor, "parse_sentences",
+                            lambda text, start=0, end=None: parsed.append(end - start) or parse(text, start, end))
+
+        first = next(text_processor.iter_chunks(text, target_words=50, window=1000))
+        assert first.text.startswith("Sentence number 0 is here.")
+        assert sum(parsed) < len(text) / 10
+
+    async def test_large_document_is_sent_in_parts(self, text_processor):
+        chunking = ChunkingExecutor(mode="inline", processor_factory=lambda: text_processor, stream_window=500)
+        manager = WebSocketManager(chunking=chunking)
+        websocket = RecordingWebSocket()
+        await manager.connect(websocket, "1")
+        text = " ".join(f"Sentence number {i} is here." for i in range(300))
+
+        await manager.process_text_chunking("1", text, 3)
+
+        parts = [message for message in websocket.sent if message["type"] == "chunks_appended"]
+        assert len(parts) > 2 and parts[-1]["done"]
+        received = []
+        for part in parts:
+            assert part["start"] == len(received)
+            received += part["chunks"]
+        assert received == as_dicts(text_processor.create_intelligent_chunks(text))
+        assert parts[-1]["total_chunks"] == len(received)
+        assert manager.chunking_states["1"][1].chunks == text_processor.create_intelligent_chunks(text)
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestBatchChunking:
+    """Test pipe_chunks against one-at-a-time chunking"""
+
+    def test_pipe_chunks_matches_single_documents(self, text_processor):
+        rng = random.Random(3)
+        texts = [random_text(rng, rng.randrange(0, 300)) for _ in range(40)] + ["", "   \n "]
+        batched = list(text_processor.pipe_chunks(texts, target_words=25, batch_size=8))
+        assert batched == [text_processor.create_intelligent_chunks(text, 25) for text in texts]
+
+    def test_pipe_chunks_consumes_input_lazily(self, text_processor):
+        consumed = []
+
+        def texts():
+            for number in range(100):
+                consumed.append(number)
+                yield f"Document {number} has one sentence. And another."
+
+        results = text_processor.pipe_chunks(texts(), batch_size=4)
+        first = next(results)
+        assert first[0].text == "Document 0 has one sentence. And another."
+        assert len(consumed) < 100
+
+    def test_pipe_chunks_with_worker_processes(self, text_processor):
+        texts = [f"Essay {number}. It has {number} words in it? Yes!" for number in range(20)]
+        batched = list(text_processor.pipe_chunks(texts, target_words=5, batch_size=4, n_process=2))
+        assert batched == [text_processor.create_intelligent_chunks(text, 5) for text in texts]
+
+
+class SlowChunking(ChunkingExecutor):
+    """Inline executor whose parse takes a while, so newer edits arrive mid-job"""
+
+    def __init__(self, processor):
+        super().__init__(mode="inline", processor_factory=lambda: processor)
+        self.parsed = []
+
+    async def parse_sentences(self, text, start=0, end=None):
+        await asyncio.sleep(0.02)
+        self.parsed.append(text)
+        return await super().parse_sentences(text, start, end)
+
+
+class RecordingWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, data):
+        self.sent.append(json.loads(data))
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestBackgroundChunking:
+    """Unit tests for WebSocketManager.schedule_text_chunking"""
+
+    async def test_newer_edit_supersedes_pending_job(self, text_processor):
+        """Only the latest text is chunked and sent; stale jobs are dropped"""
+        chunking = SlowChunking(text_processor)
+        manager = WebSocketManager(chunking=chunking)
+        websocket = RecordingWebSocket()
+        await manager.connect(websocket, "1")
+
+        for i in range(5):
+            await manager.handle_message("1", {"type": "text_changed", "document_id": 3, "text": f"Version {i} here."})
+        await manager.wait_for_chunking("1")
+
+        assert chunking.parsed == ["Version 4 here."]
+        assert [message["type"] for message in websocket.sent] == ["delta_ack"] * 5 + ["chunks_updated"]
+        assert websocket.sent[-1]["chunks"][0]["text"] == "Version 4 here."
+
+    async def test_full_request_survives_cancellation(self, text_processor):
+        """A superseded job that owed the client the full chunk list passes that on"""
+        manager = WebSocketManager(chunking=SlowChunking(text_processor))
+        websocket = RecordingWebSocket()
+        await manager.connect(websocket, "1")
+        await manager.process_text_chunking("1", "First one.", 3)
+
+        manager.schedule_text_chunking("1", "First one. Second.", 3, full=True)
+        manager.schedule_text_chunking("1", "First one. Second one.", 3)
+        await manager.wait_for_chunking("1")
+
+        assert websocket.sent[-1]["type"] == "chunks_updated"
+
+    async def test_disconnect_cancels_job(self, text_processor):
+        manager = WebSocketManager(chunking=SlowChunking(text_processor))
+        await manager.connect(RecordingWebSocket(), "1")
+        task = manager.schedule_text_chunking("1", "Some text.", 3)
+        manager.disconnect("1")
+        await asyncio.gather(task, return_exceptions=True)
+
+        assert task.cancelled()
+        assert "1" not in manager.chunking_states
@@ -0,0 +1,85 @@
+"""
+Phase 5: Unit Tests for Untitled document numbering
+Tests: one counter upsert per request, distinct numbers for back-to-back requests,
+       Untitled title pattern of the counter migration, its seed and trigger statements (SQL snapshot)
+Tool: pytest, FastAPI TestClient (fake async database connection)
+Run with: pytest tests/test_phase5_unit_untitled_numbers.py -v
+"""
+
+import re
+import pytest
+from app.database.migrations import MIGRATIONS
+from tests.conftest import FakeAsyncConnection
+
+COUNTER_MIGRATION = next(m for m in MIGRATIONS if m.name == "untitled document counter")
+
+
+class CounterDatabase(FakeAsyncConnection):
+    """Applies the counter upsert to an in-memory table"""
+
+    def __init__(self):
+        super().__init__()
+        self.counters = {}
+
+    def respond(self, query, params):
+        if not query.startswith("INSERT INTO untitled_counters"):
+            return []
+        user_id = params[0]
+        if user_id in self.counters:
+            self.counters[user_id] += 1
+        else:
+            self.counters[user_id] = 2
+        return [(self.counters[user_id] - 1,)]
+
+
+@pytest.fixture
+def db():
+    return CounterDatabase()
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestUntitledNumbers:
+    """Unit tests for /documents/get-next-untitled-number"""
+
+    def test_first_number_is_one(self, client, db):
+        response = client.post("/documents/get-next-untitled-number")
+        assert response.json()["nextNumber"] == 1
+        assert len(db.queries) == 1
+        assert db.queries[0].startswith("INSERT INTO untitled_counters")
+        assert "ON CONFLICT (user_id) DO UPDATE" in db.queries[0]
+        assert db.commits == 1
+
+    def test_reading_does_not_reserve(self, client, db):
+        assert client.get("/documents/get-next-untitled-number").status_code != 200
+        assert not any(query.startswith("INSERT INTO untitled_counters") for query in db.queries)
+        assert db.commits == 0
+
+    def test_each_request_reserves_a_new_number(self, client, db):
+        db.counters[7] = 12  # e.g. "Untitled 11.txt" exists
+        numbers = [client.post("/documents/get-next-untitled-number").json()["nextNumber"] for _ in range(3)]
+        assert numbers == [12, 13, 14]
+
+    def test_counter_follows_untitled_titles_only(self):
+        # The patterns of the seed and the trigger, run against titles (plain POSIX regexes read the same in re)
+        patterns = {
+            match for statement in COUNTER_MIGRATION.statements
+            for match in re.findall(r"'(\^Untitled [^']*)'", statement)
+        }
+        titles = [
+            "Untitled 11.txt", "Untitled 1.txt", "untitled 3.txt", "Untitled 3.txt.bak",
+            "My Untitled 3.txt", "Untitled 1234567890.txt", "Untitled .txt", "Untitled 4 (2).txt",
+        ]
+        matched = {pattern: [t for t in titles if re.match(pattern, t)] for pattern in patterns}
+        assert len(patterns) == 2
+        assert all(found == ["Untitled 11.txt", "Untitled 1.txt"] for found in matched.values())
+        numbered = next(pattern for pattern in patterns if "(" in pattern)
+        assert [int(re.match(numbered, t).group(1)) for t in matched[numbered]] == [11, 1]
+
+    @pytest.mark.sql_snapshot
+    def test_counter_migration(self):
+        statements = [" ".join(s.split()) for s in COUNTER_MIGRATION.statements]
+        # Existing titles seed the counter, the trigger follows uploads and renames and never lowers it
+        assert any(s.startswith("INSERT INTO untitled_counters") and "GROUP BY user_id" in s for s in statements)
+        assert any("AFTER INSERT OR UPDATE OF title ON documents" in s for s in statements)
+        assert any("GREATEST(untitled_counters.next_number, EXCLUDED.next_number)" in s for s in statements)
@@ -0,0 +1,110 @@
+"""
+Phase 5: Unit Tests for streaming text uploads
+Tests: block-wise reading, early abort past the size limit, UTF-8 characters split across blocks,
+       invalid UTF-8, size known up front, upload route error messages
+Tool: pytest, pytest-asyncio, FastAPI TestClient
+Run with: pytest tests/test_phase5_unit_upload_streaming.py -v
+"""
+
+import pytest
+from app.utils.upload_utils import NotUtf8, TextAccumulator, TooLarge, read_text_upload
+from tests.conftest import FakeAsyncConnection
+
+
+class BlockFile:
+    """UploadFile stand-in that records every read"""
+
+    def __init__(self, data: bytes, size=None):
+        self.data = data
+        self.offset = 0
+        self.size = size
+        self.reads = []
+
+    async def read(self, size=-1):
+        self.reads.append(size)
+        end = len(self.data) if size < 0 else self.offset + size
+        block = self.data[self.offset:end]
+        self.offset += len(block)
+        return block
+
+
+class InsertDatabase(FakeAsyncConnection):
+    """Every INSERT gets document id 1"""
+
+    @property
+    def inserted(self):
+        return [params for query, params in self.executed if query.startswith("INSERT")]
+
+    def respond(self, query, params):
+        return [(1,)]
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestStreamingUpload:
+    """Unit tests for read_text_upload and TextAccumulator"""
+
+    async def test_reads_in_blocks(self):
+        file = BlockFile(b"abcdefghij")
+        assert await read_text_upload(file, block_size=4) == "abcdefghij"
+        assert file.reads == [4, 4, 4, 4]
+
+    async def test_stops_at_first_block_over_the_limit(self):
+        file = BlockFile(b"x" * 100)
+        with pytest.raises(TooLarge):
+            await read_text_upload(file, max_bytes=10, block_size=8)
+        assert len(file.reads) == 2
+        assert file.offset == 16
+
+    async def test_known_size_is_rejected_without_reading(self):
+        file = BlockFile(b"x" * 100, size=100)
+        with pytest.raises(TooLarge):
+            await read_text_upload(file, max_bytes=10)
+        assert file.reads == []
+
+    async def test_exactly_the_limit_is_accepted(self):
+        assert await read_text_upload(BlockFile(b"x" * 10), max_bytes=10, block_size=3) == "x" * 10
+
+    async def test_character_split_across_blocks(self):
+        text = "Muraho, café ☕ naïve 😀"
+        for block_size in range(1, 6):
+            assert await read_text_upload(BlockFile(text.encode("utf-8")), block_size=block_size) == text
+
+    async def test_invalid_utf8_is_rejected(self):
+        with pytest.raises(NotUtf8):
+            await read_text_upload(BlockFile(b"valid \xff invalid"), block_size=4)
+
+    def test_truncated_character_at_end_is_rejected(self):
+        text = TextAccumulator()
+        text.feed("é".encode("utf-8")[:1])
+        with pytest.raises(NotUtf8):
+            text.finish()
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestUploadRoute:
+    """Upload route errors keep their messages"""
+
+    @pytest.fixture
+    def db(self):
+        return InsertDatabase()
+
+    def upload(self, client, data: bytes):
+        return client.post("/documents/upload", files={"file": ("essay.txt", data, "text/plain")})
+
+    def test_valid_upload_is_stored_as_text(self, client, db):
+        response = self.upload(client, "Muraho ☕".encode("utf-8"))
+        assert response.status_code == 201
+        assert db.inserted == [(7, "essay.txt", "Muraho ☕")]
+
+    def test_too_large(self, client, db):
+        response = self.upload(client, b"x" * (1024 * 1024 + 1))
+        assert response.status_code == 400
+        assert response.json()["detail"] == "File size exceeds 1MB limit"
+        assert db.inserted == []
+
+    def test_not_utf8(self, client, db):
+        response = self.upload(client, b"\xff\xfe")
+        assert response.status_code == 400
+        assert response.json()["detail"] == "File must be a valid UTF-8 text file"
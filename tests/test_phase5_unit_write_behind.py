@@ -0,0 +1,194 @@
+"""
+Phase 5: Unit Tests for the write-behind auto-save buffer
+Tests: coalescing, interval flush, manual-save flush, retry after failure, per-document write ordering,
+       discard during a write, shutdown flush, metrics
+Tool: pytest, pytest-asyncio
+Run with: pytest tests/test_phase5_unit_write_behind.py -v
+"""
+
+import asyncio
+import json
+import pytest
+from app.utils.websocket_manager import WebSocketManager
+from app.utils.write_behind import WriteBehindBuffer
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.writes = []
+        self.fail = False
+        self.delay = 0.0
+        self.active = 0
+        self.peak_active = 0
+
+    async def write(self, user_id, document_id, content):
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            if self.fail:
+                raise ConnectionError("database unavailable")
+            self.writes.append((user_id, document_id, content))
+        finally:
+            self.active -= 1
+
+
+class RecordingWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, data):
+        self.sent.append(json.loads(data))
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestWriteBehindBuffer:
+    """Unit tests for WriteBehindBuffer"""
+
+    async def test_versions_collapse_into_one_write(self):
+        """Only the latest content is written once the interval passes"""
+        database = FakeDatabase()
+        buffer = WriteBehindBuffer(database.write, flush_interval=0.05)
+        for i in range(5):
+            buffer.put(1, 9, f"version {i}")
+        assert database.writes == []
+
+        await asyncio.sleep(0.15)
+
+        assert database.writes == [("1", "9", "version 4")]
+        stats = buffer.stats()
+        assert stats["saves_received"] == 5
+        assert stats["writes"] == 1
+        assert stats["writes_avoided"] == 4
+        assert stats["dirty_documents"] == 0
+        await buffer.close()
+
+    async def test_flush_writes_immediately(self):
+        """Manual saves don't wait for the interval"""
+        database = FakeDatabase()
+        buffer = WriteBehindBuffer(database.write, flush_interval=60)
+        buffer.put(1, 9, "draft")
+
+        assert await buffer.flush(1, 9) is True
+        assert database.writes == [("1", "9", "draft")]
+        assert await buffer.flush(1, 9) is True  # nothing left to write
+        assert len(database.writes) == 1
+        await buffer.close()
+
+    async def test_failed_write_is_retried(self):
+        """A failed flush keeps the content for the next attempt"""
+        database = FakeDatabase()
+        database.fail = True
+        buffer = WriteBehindBuffer(database.write, flush_interval=60)
+        buffer.put(1, 9, "draft")
+
+        assert await buffer.flush(1, 9) is False
+        assert buffer.is_dirty(1, 9)
+
+        database.fail = False
+        buffer.put(1, 9, "newer draft")
+        assert await buffer.flush(1, 9) is True
+        assert database.writes == [("1", "9", "newer draft")]
+        assert buffer.stats()["failures"] == 1
+        await buffer.close()
+
+    async def test_writes_for_a_document_are_ordered(self):
+        """A newer version is never overwritten by an older in-flight write"""
+        database = FakeDatabase()
+        database.delay = 0.02
+        buffer = WriteBehindBuffer(database.write, flush_interval=60)
+        buffer.put(1, 9, "old")
+        first = asyncio.ensure_future(buffer.flush(1, 9))
+        await asyncio.sleep(0)
+        buffer.put(1, 9, "new")
+        await asyncio.gather(first, buffer.flush(1, 9))
+
+        assert [content for _, _, content in database.writes] == ["old", "new"]
+        await buffer.close()
+
+    async def test_lock_is_kept_for_a_waiting_flush(self):
+        """A flush started while the lock passes to a waiter still queues behind that waiter"""
+        database = FakeDatabase()
+        database.delay = 0.01
+        later = []
+
+        async def save_newest():
+            buffer.put(1, 9, "newest")
+            await buffer.flush(1, 9)
+
+        async def on_flushed(user_id, document_id, content, error):
+            if content == "old":
+                # The first flush has released the lock with nothing left to write; the waiting
+                # flush picks up this save next, then save_newest starts a third flush
+                buffer.put(1, 9, "new")
+                later.append(asyncio.ensure_future(save_newest()))
+
+        buffer = WriteBehindBuffer(database.write, on_flushed, flush_interval=60)
+        buffer.put(1, 9, "old")
+        first = asyncio.ensure_future(buffer.flush(1, 9))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(buffer.flush(1, 9))
+        await asyncio.gather(first, second)
+        await asyncio.gather(*later)
+
+        assert database.peak_active == 1
+        assert [content for _, _, content in database.writes] == ["old", "new", "newest"]
+        assert buffer._locks == {} and buffer._lock_users == {}
+        await buffer.close()
+
+    async def test_discard_waits_for_the_write_in_progress(self):
+        """After discard returns nothing buffered can land, and a failed discarded write isn't retried"""
+        database = FakeDatabase()
+        database.delay = 0.02
+        buffer = WriteBehindBuffer(database.write, flush_interval=60)
+        buffer.put(1, 9, "auto-save")
+        writing = asyncio.ensure_future(buffer.flush(1, 9))
+        await asyncio.sleep(0)
+        buffer.put(1, 9, "queued auto-save")
+        waiting = asyncio.ensure_future(buffer.flush(1, 9))
+        await asyncio.sleep(0)
+
+        await buffer.discard(1, 9)
+        assert writing.done()
+        await database.write("1", "9", "manual save")  # e.g. the PUT that discarded the buffer
+        await asyncio.gather(writing, waiting)
+
+        assert [content for _, _, content in database.writes] == ["auto-save", "manual save"]
+        assert not buffer.is_dirty(1, 9)
+
+        database.fail = True
+        buffer.put(1, 9, "draft of a deleted document")
+        failing = asyncio.ensure_future(buffer.flush(1, 9))
+        await asyncio.sleep(0)
+        await buffer.discard(1, 9)
+
+        assert await failing is False
+        assert not buffer.is_dirty(1, 9)
+        await buffer.close()
+
+    async def test_close_flushes_every_dirty_document(self):
+        """Graceful shutdown writes everything still buffered"""
+        database = FakeDatabase()
+        buffer = WriteBehindBuffer(database.write, flush_interval=60)
+        buffer.put(1, 9, "a")
+        buffer.put(2, 10, "b")
+
+        await buffer.close()
+
+        assert sorted(database.writes) == [("1", "9", "a"), ("2", "10", "b")]
+
+    async def test_disconnect_flushes_users_documents(self):
+        """Closing the WebSocket persists the user's pending auto-save"""
+        database = FakeDatabase()
+        manager = WebSocketManager()
+        manager.autosave_buffer.write = database.write
+        await manager.connect(RecordingWebSocket(), "1")
+
+        await manager.handle_message("1", {"type": "auto_save", "document_id": 9, "content": "<p>draft</p>"})
+        assert database.writes == []
+        manager.disconnect("1")
+        await manager.autosave_buffer.close()
+
+        assert database.writes == [("1", "9", "<p>draft</p>")]
@@ -0,0 +1,184 @@
+"""
+CBC Feedback Coach - Document Query Benchmark
+Seeds a scratch schema with users and documents (1M documents by default) and times
+the hot document queries with only the baseline schema, then again after the index
+migrations; a single user with 10k documents then compares the old full-content
+/documents/list query with the paginated metadata-only one. The real tables are never
+touched and the scratch schema is dropped at the end
+
+Needs the PostgreSQL database configured for the app (DB_* settings or DATABASE_URL)
+Usage: python utils/document_query_benchmark.py [--documents 1000000] [--users 2000] [--runs 200]
+       [--listing-documents 10000] [--listing-kb 20] [--page-size 100]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import psycopg2
+from app.database.db_config import DB_CONFIG
+from app.database.migrations import MIGRATIONS, migrate
+
+SCHEMA = "document_query_benchmark"
+
+# name -> (query, parameter factory taking (rng, users, documents))
+QUERIES = {
+    "list documents": (
+        "SELECT id, title, created_at, last_updated FROM documents WHERE user_id = %s ORDER BY created_at DESC",
+        lambda rng, users, documents: (rng.randint(1, users),),
+    ),
+    "check filename": (
+        "SELECT id FROM documents WHERE title = %s AND user_id = %s",
+        lambda rng, users, documents: (f"Essay {rng.randint(1, documents)}.txt", rng.randint(1, users)),
+    ),
+    "get document": (
+        "SELECT id, title, content FROM documents WHERE id = %s AND user_id = %s",
+        lambda rng, users, documents: (rng.randint(1, documents), rng.randint(1, users)),
+    ),
+    "reset token": (
+        "SELECT id FROM users WHERE reset_token = %s",
+        lambda rng, users, documents: (f"token-{rng.randint(1, users)}",),
+    ),
+}
+
+
+def seed(conn, users, documents):
+    """Users with a pending reset token every 10th row; documents spread evenly over users"""
+    with conn, conn.cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO users (email, first_name, last_name, reset_token)
+            SELECT 'user' || n || '@example.com', 'First', 'Last',
+                   CASE WHEN n %% 10 = 0 THEN 'token-' || n END
+            FROM generate_series(1, %s) AS n
+        """, (users,))
+        cursor.execute("""
+            INSERT INTO documents (user_id, title, content, created_at, last_updated)
+            SELECT (n %% %s) + 1, 'Essay ' || n || '.txt', repeat('The students wrote their essays. ', 8),
+                   now() - n * interval '1 second', now()
+            FROM generate_series(1, %s) AS n
+        """, (users, documents))
+        cursor.execute("ANALYZE users")
+        cursor.execute("ANALYZE documents")
+
+
+def time_queries(conn, users, documents, runs):
+    rng = random.Random(42)
+    results = {}
+    with conn.cursor() as cursor:
+        for name, (query, params) in QUERIES.items():
+            timings = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                cursor.execute(query, params(rng, users, documents))
+                cursor.fetchall()
+                timings.append(time.perf_counter() - started)
+            cursor.execute("EXPLAIN " + query, params(rng, users, documents))
+            plan = cursor.fetchone()[0]
+            results[name] = (statistics.mean(timings) * 1000, sorted(timings)[int(runs * 0.95) - 1] * 1000, plan)
+    conn.rollback()
+    return results
+
+
+def listing_benchmark(conn, documents, kb, page_size):
+    """Old listing (every row's content, size computed client-side) vs keyset pages of metadata"""
+    with conn, conn.cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO users (email, first_name, last_name)
+            VALUES ('listing@example.com', 'Big', 'Class') RETURNING id
+        """)
+        user_id = cursor.fetchone()[0]
+        cursor.execute("""
+            INSERT INTO documents (user_id, title, content, created_at)
+            SELECT %s, 'Class essay ' || n || '.txt', repeat('x', %s), now() - n * interval '1 second'
+            FROM generate_series(1, %s) AS n
+        """, (user_id, kb * 1024, documents))
+        cursor.execute("ANALYZE documents")
+
+    with conn.cursor() as cursor:
+        started = time.perf_counter()
+        cursor.execute("""
+            SELECT id, title, content, created_at, last_updated FROM documents
+            WHERE user_id = %s ORDER BY created_at DESC
+        """, (user_id,))
+        sizes = [len(row[2].encode("utf-8")) for row in cursor.fetchall()]
+        full_content = time.perf_counter() - started
+
+        page_query = """
+            SELECT id, title, content_size, created_at, last_updated FROM documents
+            WHERE user_id = %s {after} ORDER BY created_at DESC, id DESC LIMIT %s
+        """
+        started = time.perf_counter()
+        cursor.execute(page_query.format(after=""), (user_id, page_size + 1))
+        page = cursor.fetchall()[:page_size]
+        first_page = time.perf_counter() - started
+
+        rows = list(page)
+        while len(page) == page_size:
+            last = page[-1]
+            cursor.execute(page_query.format(after="AND (created_at, id) < (%s, %s)"),
+                           (user_id, last[3], last[0], page_size + 1))
+            page = cursor.fetchall()[:page_size]
+            rows.extend(page)
+        all_pages = time.perf_counter() - started
+    conn.rollback()
+
+    assert sorted(row[2] for row in rows) == sorted(sizes)
+    print(f"\n/documents/list for one user with {documents} documents of {kb} KB")
+    print("-" * 100)
+    print(f"{'full content, size in Python':<36} {full_content * 1000:>9.1f} ms")
+    print(f"{'metadata, first page of ' + str(page_size):<36} {first_page * 1000:>9.1f} ms")
+    print(f"{'metadata, all pages':<36} {all_pages * 1000:>9.1f} ms")
+
+
+def print_results(label, results):
+    print(f"\n{label}")
+    print("-" * 100)
+    print(f"{'query':<16} {'mean ms':>9} {'p95 ms':>9}  plan")
+    for name, (mean, p95, plan) in results.items():
+        print(f"{name:<16} {mean:>9.3f} {p95:>9.3f}  {plan.strip()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the hot document queries with and without indexes")
+    parser.add_argument("--documents", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=200, help="Executions per query")
+    parser.add_argument("--listing-documents", type=int, default=10_000, help="Documents owned by the listing user")
+    parser.add_argument("--listing-kb", type=int, default=20, help="Size of each listing document in KB")
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        with conn, conn.cursor() as cursor:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+            cursor.execute(f"CREATE SCHEMA {SCHEMA}")
+            cursor.execute(f"SET search_path TO {SCHEMA}")
+
+        migrate(conn, MIGRATIONS[:1])
+        started = time.perf_counter()
+        seed(conn, args.users, args.documents)
+        print(f"Seeded {args.documents} documents for {args.users} users in {time.perf_counter() - started:.1f}s")
+        print_results("Baseline schema (no indexes)", time_queries(conn, args.users, args.documents, args.runs))
+
+        started = time.perf_counter()
+        migrate(conn)
+        with conn, conn.cursor() as cursor:
+            cursor.execute("ANALYZE documents")
+        print(f"\nIndex migrations applied in {time.perf_counter() - started:.1f}s")
+        print_results("After index migrations", time_queries(conn, args.users, args.documents, args.runs))
+        listing_benchmark(conn, args.listing_documents, args.listing_kb, args.page_size)
+    finally:
+        with conn, conn.cursor() as cursor:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
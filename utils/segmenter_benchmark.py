@@ -0,0 +1,163 @@
+"""
+CBC Feedback Coach - Sentence Segmenter Benchmark
+Compares the sentence segmentation backends of IntelligentTextProcessor on the
+learner sentences in cbc_dataset.jsonl: per-call latency, resident memory of the
+loaded pipeline and boundary agreement with the full dependency parser
+
+Each backend is measured in a fresh process so memory numbers don't overlap
+Usage: python utils/segmenter_benchmark.py [--dataset cbc_dataset.jsonl] [--limit 1000] [--model en_core_web_sm]
+"""
+
+import argparse
+import json
+import multiprocessing
+import resource
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+SEGMENTERS = ["parser", "senter", "sentencizer"]
+
+
+def load_inputs(dataset_path, limit):
+    """Learner texts from the "input" field of the JSONL dataset"""
+    texts = []
+    with open(dataset_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            text = json.loads(line).get("input", "")
+            if text and text.strip():
+                texts.append(text)
+            if limit and len(texts) >= limit:
+                break
+    return texts
+
+
+def rss_mb():
+    """Current resident set size of this process in MB (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(segmenter, model, texts, queue):
+    """Worker process: load one backend, time it over all texts and report boundaries"""
+    try:
+        from app.utils.text_processor import IntelligentTextProcessor
+
+        baseline = rss_mb()
+        started = time.perf_counter()
+        processor = IntelligentTextProcessor(segmenter=segmenter, model=model)
+        load_seconds = time.perf_counter() - started
+        loaded = rss_mb()
+
+        latencies = []
+        boundaries = []
+        for text in texts:
+            started = time.perf_counter()
+            sentences = processor.parse_sentences(text)
+            latencies.append(time.perf_counter() - started)
+            boundaries.append([sentence.end for sentence in sentences[:-1]])
+
+        queue.put({
+            "segmenter": segmenter,
+            "components": list(processor.nlp.pipe_names),
+            "load_seconds": load_seconds,
+            "pipeline_rss_mb": loaded - baseline,
+            "process_rss_mb": rss_mb(),
+            "latencies": latencies,
+            "boundaries": boundaries,
+        })
+    except Exception as e:
+        queue.put({"segmenter": segmenter, "error": str(e)})
+
+
+def run_backend(segmenter, model, texts):
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=measure, args=(segmenter, model, texts, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def agreement(reference, candidate):
+    """Boundary precision / recall against the reference plus the share of texts split identically"""
+    true_positive = predicted = expected = identical = 0
+    for ref, cand in zip(reference, candidate):
+        ref_set, cand_set = set(ref), set(cand)
+        true_positive += len(ref_set & cand_set)
+        predicted += len(cand_set)
+        expected += len(ref_set)
+        identical += ref_set == cand_set
+    precision = true_positive / predicted if predicted else 1.0
+    recall = true_positive / expected if expected else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "identical_texts": identical / len(reference) if reference else 1.0,
+    }
+
+
+def print_report(results, text_count):
+    print(f"\nSentence segmentation benchmark ({text_count} texts)")
+    print("=" * 90)
+    print(f"{'backend':<12} {'load s':>7} {'RSS MB':>8} {'mean ms':>8} {'p95 ms':>8} {'texts/s':>9}  components")
+    print("-" * 90)
+    for result in results:
+        if "error" in result:
+            print(f"{result['segmenter']:<12} skipped: {result['error']}")
+            continue
+        latencies = sorted(result["latencies"])
+        mean = statistics.mean(latencies)
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0]
+        print(f"{result['segmenter']:<12} {result['load_seconds']:>7.2f} {result['pipeline_rss_mb']:>8.1f} "
+              f"{mean * 1000:>8.3f} {p95 * 1000:>8.3f} {1 / mean:>9.0f}  {', '.join(result['components'])}")
+
+    reference = next((r for r in results if r["segmenter"] == "parser" and "error" not in r), None)
+    print("\nBoundary agreement with the parser")
+    print("-" * 90)
+    if reference is None:
+        print("parser backend unavailable - install the model to compare boundaries")
+        return
+    for result in results:
+        if "error" in result or result is reference:
+            continue
+        scores = agreement(reference["boundaries"], result["boundaries"])
+        print(f"{result['segmenter']:<12} precision {scores['precision']:.3f}  recall {scores['recall']:.3f}  "
+              f"F1 {scores['f1']:.3f}  identical texts {scores['identical_texts']:.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark spaCy sentence segmentation backends")
+    parser.add_argument("--dataset", default="cbc_dataset.jsonl", help="JSONL file with an 'input' field per line")
+    parser.add_argument("--limit", type=int, default=0, help="Only use the first N texts (0 = all)")
+    parser.add_argument("--model", default="en_core_web_sm", help="spaCy model for the parser and senter backends")
+    parser.add_argument("--segmenters", nargs="+", default=SEGMENTERS, choices=SEGMENTERS)
+    args = parser.parse_args()
+
+    texts = load_inputs(args.dataset, args.limit)
+    if not texts:
+        print(f"No input texts found in {args.dataset}")
+        return 1
+
+    results = [run_backend(segmenter, args.model, texts) for segmenter in args.segmenters]
+    print_report(results, len(texts))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())